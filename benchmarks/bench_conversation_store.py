@@ -0,0 +1,64 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.conversation_store import ConversationStore
+from src.data_types import TVRequest, TVResponse
+from src.metrics import percentile
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Conversation store: append latency on the response path and lazy session loading.")
+    parser.add_argument("--turns", type=int, default=20000, help="Turns written to one session")
+    parser.add_argument("--answer-chars", type=int, default=2000, help="Length of each synthetic answer")
+    parser.add_argument("--budget-tokens", type=int, default=8000, help="Memory budget when reopening the session")
+    return parser.parse_args()
+
+def make_turn(i, answer):
+    return TVResponse(generated_at="2024-01-01T00:00:00", request=TVRequest(query=f"question {i}", prompt="p", as_json=True),
+                      raw_response={"Answer": answer}, model_name="bench", model_provider="bench", time_in_seconds=1.0)
+
+def main():
+    args = parse_arguments()
+    answer = ("Grade the log footage with a Rec.709 LUT. " * (args.answer_chars // 42 + 1))[:args.answer_chars]
+    turns = [make_turn(i, answer) for i in range(args.turns)]
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = ConversationStore(store_dir)
+        latencies = []
+        start = time.perf_counter()
+        for turn in turns:
+            append_start = time.perf_counter()
+            store.append("session", turn)
+            latencies.append((time.perf_counter() - append_start) * 1000)
+        queued = time.perf_counter() - start
+        store.flush()
+        durable = time.perf_counter() - start
+        store.close()
+
+        start = time.perf_counter()
+        reopened = ConversationStore(store_dir)
+        memory = reopened.open_memory("session", budget_tokens=args.budget_tokens)
+        open_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        page = reopened.page("session", before=args.turns // 2, size=50)
+        page_seconds = time.perf_counter() - start
+        reopened.close()
+
+        print(json.dumps({
+            "turns": args.turns,
+            "append_p50_ms": round(percentile(latencies, 50), 4),
+            "append_p99_ms": round(percentile(latencies, 99), 4),
+            "queue_seconds": round(queued, 3),
+            "durable_seconds": round(durable, 3),
+            "reopen_seconds": round(open_seconds, 4),
+            "turns_loaded": len(memory),
+            "page_of_50_seconds": round(page_seconds, 4),
+            "page_loaded": len(page),
+        }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.entity_index import AvailableEntitiesCache, EntityIndexCache
+from src.extract_entities import link_entities
+from src.metrics import percentile
+from src.search import ProjectIndex
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Per-query cost of getting a project's entities to the linker: rebuild + model_dump vs the versioned view cache.")
+    parser.add_argument("--contributors", type=int, default=20000, help="Contributors in the synthetic catalogue")
+    parser.add_argument("--locations", type=int, default=2000, help="Locations in the synthetic catalogue")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per mode")
+    return parser.parse_args()
+
+def synthetic_index(args):
+    data = {
+        "name": "synthetic",
+        "contributors": [{"id": f"contributor_{i}", "name": f"Contributor {i}"} for i in range(args.contributors)],
+        "locations": [{"id": f"location_{i}", "name": f"Location {i}"} for i in range(args.locations)],
+        "cameras": [{"id": f"camera_{i}", "name": f"Camera {i}"} for i in range(8)],
+        "shoot_dates": [f"2024-01-{day:02d}" for day in range(1, 29)],
+        "clip_types": ["rush", "review"],
+    }
+    return ProjectIndex.from_json("synthetic", data, version="1")
+
+def time_mode(per_query, queries):
+    latencies = []
+    for _ in range(queries):
+        start = time.perf_counter()
+        per_query()
+        latencies.append((time.perf_counter() - start) * 1000)
+    return {"p50_ms": round(percentile(latencies, 50), 4), "p95_ms": round(percentile(latencies, 95), 4)}
+
+def main():
+    args = parse_arguments()
+    index = synthetic_index(args)
+    spans = [("CONTRIBUTOR", "Contributor 42"), ("LOCATION", "Location 7")]
+
+    # What callers did before: rebuild the pydantic model and hand a model_dump() dict to the extractor
+    index_cache = EntityIndexCache()
+    def rebuild_and_dump():
+        link_entities(spans, index_cache.get(index.available_entities().model_dump()))
+
+    entities_cache = AvailableEntitiesCache()
+    def cached_view():
+        link_entities(spans, index_cache.get(entities_cache.get("synthetic", index.version, index.available_entities)))
+
+    results = {
+        "rebuild_and_model_dump": time_mode(rebuild_and_dump, args.queries),
+        "versioned_view_cache": time_mode(cached_view, args.queries),
+    }
+    print(json.dumps({
+        "contributors": args.contributors,
+        "locations": args.locations,
+        "modes": results,
+        "cache_hit_rate": round(entities_cache.stats.hit_rate, 4),
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
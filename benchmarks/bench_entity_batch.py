@@ -0,0 +1,61 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extract_entities import entity_extraction_factory, batch_entity_extraction_factory
+from src.data_types import AvailableEntities
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+PROJECT_INDEX = os.path.join(ROOT, "training", "entity_recognition", "indexes", "project_123", "index.json")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure batch entity extraction throughput as worker processes are added.")
+    parser.add_argument("--model-path", type=str, default="./tmp/models/ner_model", help="Path to the NER model")
+    parser.add_argument("--repeat", type=int, default=200, help="How many times to repeat the fixture queries")
+    parser.add_argument("--batch-size", type=int, default=256, help="Queries per worker batch")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to sweep")
+    return parser.parse_args()
+
+def load_project_entities() -> AvailableEntities:
+    with open(PROJECT_INDEX) as f:
+        index = json.load(f)
+    return AvailableEntities(
+        project_id="project_123",
+        contributors={item["id"]: item["name"] for item in index["contributors"]},
+        locations={item["id"]: item["name"] for item in index["locations"]},
+        cameras={item["id"]: item["name"] for item in index["cameras"]},
+        clip_types=set(index["clip_types"]),
+        shoot_dates=set(index["shoot_dates"]),
+        version="benchmark"
+    )
+
+def main():
+    args = parse_arguments()
+    with open(os.path.join(FIXTURES, "json_entity_files", "clip_search.json")) as f:
+        queries = json.load(f) * args.repeat
+    available_entities = load_project_entities()
+    pairs = [(query, available_entities.project_id) for query in queries]
+
+    extract_entities = entity_extraction_factory(args.model_path)
+    start = time.perf_counter()
+    expected = [extract_entities(query, available_entities) for query in queries]
+    loop_seconds = time.perf_counter() - start
+    print(f"Queries: {len(queries)}")
+    print(f"{'mode':<18}{'seconds':>10}{'queries/s':>12}{'speedup':>10}")
+    print(f"{'single-query loop':<18}{loop_seconds:>10.3f}{len(queries) / loop_seconds:>12,.0f}{1.0:>10.2f}")
+
+    extract_entities_batch = batch_entity_extraction_factory(lambda _: available_entities, args.model_path)
+    for n_process in args.processes:
+        start = time.perf_counter()
+        results = list(extract_entities_batch(pairs, batch_size=args.batch_size, n_process=n_process))
+        seconds = time.perf_counter() - start
+        assert results == expected, "Batch extraction diverged from single-query extraction"
+        print(f"{f'batch n_process={n_process}':<18}{seconds:>10.3f}{len(queries) / seconds:>12,.0f}{loop_seconds / seconds:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.fuzzy import FuzzyMatcher, brute_force_best
+from src.metrics import percentile
+
+SYLLABLES = ["an", "ber", "ca", "da", "el", "fi", "go", "ha", "is", "jo", "ka", "li", "mo", "na", "or", "pe",
+             "qu", "ri", "sa", "to", "ul", "vi", "wa", "xe", "yo", "za", "th", "sh", "ch", "ry"]
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Fuzzy entity lookup: trigram-indexed FuzzyMatcher vs a brute-force edit-distance scan.")
+    parser.add_argument("--names", type=int, nargs="+", default=[1000, 10000, 100000], help="Catalogue sizes to sweep")
+    parser.add_argument("--queries", type=int, default=200, help="Misspelt queries per size")
+    parser.add_argument("--brute-force-queries", type=int, default=20, help="Queries timed with the full scan (it is slow)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+def synthetic_names(rng, count):
+    names = set()
+    while len(names) < count:
+        first = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3)))
+        last = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        names.add(f"{first} {last}")
+    return sorted(names)
+
+def misspell(rng, name):
+    """Apply one or two random substitutions, deletions, insertions or adjacent swaps."""
+    chars = list(name)
+    for _ in range(rng.randint(1, 2)):
+        position = rng.randrange(len(chars) - 1)
+        edit = rng.choice(("substitute", "delete", "insert", "swap"))
+        if edit == "substitute":
+            chars[position] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+        elif edit == "delete":
+            del chars[position]
+        elif edit == "insert":
+            chars.insert(position, rng.choice("abcdefghijklmnopqrstuvwxyz"))
+        else:
+            chars[position], chars[position + 1] = chars[position + 1], chars[position]
+    return "".join(chars)
+
+def time_lookups(lookup, queries):
+    latencies, results = [], []
+    for query in queries:
+        start = time.perf_counter()
+        results.append(lookup(query))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return results, {"p50_ms": round(percentile(latencies, 50), 4), "p95_ms": round(percentile(latencies, 95), 4)}
+
+def main():
+    args = parse_arguments()
+    rng = random.Random(args.seed)
+    report = []
+    for size in args.names:
+        names = synthetic_names(rng, size)
+        start = time.perf_counter()
+        matcher = FuzzyMatcher(names)
+        build = time.perf_counter() - start
+
+        targets = [rng.choice(names) for _ in range(args.queries)]
+        queries = [misspell(rng, target) for target in targets]
+        indexed, indexed_timing = time_lookups(matcher.best, queries)
+        scanned, scan_timing = time_lookups(lambda query: brute_force_best(names, query), queries[:args.brute_force_queries])
+
+        report.append({
+            "names": size,
+            "build_seconds": round(build, 3),
+            "fuzzy_matcher": indexed_timing,
+            "brute_force": scan_timing,
+            # Same edit distance as the exhaustive scan (ties may pick a different, equally close name)
+            "agrees_with_brute_force": sum(
+                (a and a.distance) == (b and b.distance) for a, b in zip(indexed, scanned)
+            ) / len(scanned),
+            "recovered_target": sum(match is not None and match.name == target
+                                    for match, target in zip(indexed, targets)) / len(targets),
+        })
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
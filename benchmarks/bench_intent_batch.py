@@ -0,0 +1,61 @@
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.intent import intent_recognition, batch_intent_recognition
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "json_intent_files")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare detect_agent in a loop against detect_agents_batch.")
+    parser.add_argument("--model-path", type=str, default="./tmp/models/agent_model", help="Path to the intent model")
+    parser.add_argument("--repeat", type=int, default=50, help="How many times to repeat the fixture queries")
+    parser.add_argument("--batch-size", type=int, default=256, help="nlp.pipe batch size")
+    parser.add_argument("--n-process", type=int, default=1, help="nlp.pipe worker processes")
+    return parser.parse_args()
+
+def load_fixture_queries():
+    queries = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, "r") as f:
+            queries.extend(json.load(f))
+    return queries
+
+def main():
+    args = parse_arguments()
+    texts = load_fixture_queries() * args.repeat
+
+    detect_agent = intent_recognition(args.model_path)
+    detect_agents_batch = batch_intent_recognition(args.model_path)
+
+    # Warm both paths so neither pays for lazy initialisation inside the timed region
+    detect_agent(texts[0])
+    detect_agents_batch(texts[:8])
+
+    start = time.perf_counter()
+    for text in texts:
+        detect_agent(text)
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = detect_agents_batch(texts, batch_size=args.batch_size, n_process=args.n_process)
+    batch_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores.to_agent_results()
+    materialise_seconds = time.perf_counter() - start
+
+    print(f"Queries:                {len(texts)}")
+    print(f"detect_agent loop:      {loop_seconds:.3f}s ({len(texts) / loop_seconds:,.0f} queries/s)")
+    print(f"detect_agents_batch:    {batch_seconds:.3f}s ({len(texts) / batch_seconds:,.0f} queries/s)")
+    print(f"  + to_agent_results:   {materialise_seconds:.3f}s")
+    print(f"Speedup (scores only):  {loop_seconds / batch_seconds:.1f}x")
+    print(f"Speedup (with results): {loop_seconds / (batch_seconds + materialise_seconds):.1f}x")
+
+if __name__ == "__main__":
+    main()
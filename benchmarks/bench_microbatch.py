@@ -0,0 +1,69 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.intent import intent_recognition, batch_intent_recognition
+from src.metrics import percentile
+from src.microbatch import create_async_intent
+
+FIXTURES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "fixtures", "json_intent_files")
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Latency/throughput of micro-batched vs per-call intent detection under concurrent load.")
+    parser.add_argument("--model-path", type=str, default="./tmp/models/agent_model", help="Path to the intent model")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16, 64, 256], help="Concurrent callers to sweep")
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Micro-batch size cap")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0, help="Micro-batch collection window")
+    return parser.parse_args()
+
+def load_fixture_queries():
+    queries = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, "*.json"))):
+        with open(path, "r") as f:
+            queries.extend(json.load(f))
+    return queries
+
+async def load_test(call, queries, total, concurrency):
+    """Run `total` calls with `concurrency` callers in flight; return throughput and latencies."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            await call(queries[i % len(queries)])
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(total)))
+    return total / (time.perf_counter() - start), latencies
+
+async def main():
+    args = parse_arguments()
+    queries = load_fixture_queries()
+    detect_agent = intent_recognition(args.model_path)
+    detect_agent_async = create_async_intent(batch_intent_recognition(args.model_path),
+                                             max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms)
+    loop = asyncio.get_running_loop()
+
+    async def per_call(text):
+        return await loop.run_in_executor(None, detect_agent, text)
+
+    print(f"{'mode':<12}{'callers':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for concurrency in args.concurrency:
+        for name, call in (("per-call", per_call), ("micro-batch", detect_agent_async)):
+            throughput, latencies = await load_test(call, queries, args.requests, concurrency)
+            p50, p95, p99 = (1000 * percentile(latencies, q) for q in (50, 95, 99))
+            print(f"{name:<12}{concurrency:>8}{throughput:>10.0f}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}")
+
+    await detect_agent_async.batcher.aclose()
+
+if __name__ == "__main__":
+    asyncio.run(main())
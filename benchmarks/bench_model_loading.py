@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+MODELS = {
+    "intent": ("./tmp/models/agent_model", "textcat_multilabel"),
+    "ner": ("./tmp/models/ner_model", "ner"),
+}
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Report cold-start time and RSS for full vs lean model loading, "
+                                                 "and for both models loaded separately vs against one shared Vocab.")
+    parser.add_argument("--intent-model", type=str, default=MODELS["intent"][0], help="Path to the intent model")
+    parser.add_argument("--ner-model", type=str, default=MODELS["ner"][0], help="Path to the NER model")
+    parser.add_argument("--child", nargs=3, metavar=("MODEL_PATH", "COMPONENT", "MODE"), help=argparse.SUPPRESS)
+    parser.add_argument("--pair-child", nargs=3, metavar=("INTENT_PATH", "NER_PATH", "MODE"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and kilobytes on Linux
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def rss_mb() -> float:
+    """Current RSS, falling back to the peak where /proc is unavailable (macOS)."""
+    from src.models import current_rss_mb
+    current = current_rss_mb()
+    return peak_rss_mb() if current is None else current
+
+def measure_in_child(model_path: str, component: str, mode: str) -> dict:
+    """Load a single model in this (fresh) process and report the cost of doing so."""
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+
+    import spacy  # noqa: F401 - imported inside the timed region on purpose
+    from src.models import load_pipeline
+    nlp = load_pipeline(model_path, component, lean=(mode == "lean"))
+    nlp("warm up the pipeline")
+
+    return {
+        "load_seconds": round(time.perf_counter() - start, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "rss_delta_mb": round(peak_rss_mb() - baseline_rss, 1),
+        "pipes": nlp.pipe_names,
+        "vectors": list(nlp.vocab.vectors.shape),
+    }
+
+def measure_pair_in_child(intent_path: str, ner_path: str, mode: str) -> dict:
+    """Load both models in this (fresh) process, with two spacy.load calls or through the registry."""
+    import spacy
+    from src.models import ModelRegistry
+    baseline_rss = rss_mb()
+    start = time.perf_counter()
+
+    if mode == "shared":
+        registry = ModelRegistry()
+        intent = registry.get(intent_path, "textcat_multilabel")
+        ner = registry.get(ner_path, "ner")
+    else:
+        intent, ner = spacy.load(intent_path), spacy.load(ner_path)
+    intent("warm up the pipeline")
+    ner("warm up the pipeline")
+
+    return {
+        "load_seconds": round(time.perf_counter() - start, 3),
+        "rss_mb": round(rss_mb(), 1),
+        "rss_delta_mb": round(rss_mb() - baseline_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "shared_vocab": intent.vocab is ner.vocab,
+    }
+
+def run_child(flag: str, *child_args: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), flag, *child_args],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+def main():
+    args = parse_arguments()
+    if args.child:
+        print(json.dumps(measure_in_child(*args.child)))
+        return
+    if args.pair_child:
+        print(json.dumps(measure_pair_in_child(*args.pair_child)))
+        return
+
+    paths = {"intent": args.intent_model, "ner": args.ner_model}
+    print(f"{'model':<8}{'mode':<6}{'load (s)':>10}{'peak RSS (MB)':>15}{'vectors':>16}  pipes")
+    for name, (_, component) in MODELS.items():
+        for mode in ("full", "lean"):
+            result = run_child("--child", paths[name], component, mode)
+            vectors = "x".join(str(dim) for dim in result["vectors"])
+            print(f"{name:<8}{mode:<6}{result['load_seconds']:>10.3f}{result['peak_rss_mb']:>15.1f}{vectors:>16}  {', '.join(result['pipes'])}")
+
+    # Both models in one process: today's two spacy.load calls vs the registry's shared Vocab
+    print(f"\n{'both models':<12}{'load (s)':>10}{'RSS (MB)':>10}{'loaded (MB)':>13}{'peak RSS (MB)':>15}  shared vocab")
+    pair = {}
+    for mode in ("separate", "shared"):
+        pair[mode] = result = run_child("--pair-child", args.intent_model, args.ner_model, mode)
+        print(f"{mode:<12}{result['load_seconds']:>10.3f}{result['rss_mb']:>10.1f}{result['rss_delta_mb']:>13.1f}"
+              f"{result['peak_rss_mb']:>15.1f}  {result['shared_vocab']}")
+    saved = pair["separate"]["rss_delta_mb"] - pair["shared"]["rss_delta_mb"]
+    print(f"RSS saved by sharing the Vocab: {saved:.1f} MB")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ollama_stub import start_stub
+from src.ollama import create_ollama_client, make_ollama_request
+from src.data_types import TVRequest
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Compare a session per request against the pooled Ollama client.")
+    parser.add_argument("--requests", type=int, default=500, help="Total generations per mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="Generations in flight at once")
+    parser.add_argument("--url", type=str, default=None, help="Existing server to hit instead of the built-in stand-in")
+    return parser.parse_args()
+
+async def run_mode(concurrency: int, total: int, generate) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await generate()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return time.perf_counter() - start
+
+async def main():
+    args = parse_arguments()
+    runner = None
+    url = args.url
+    if url is None:
+        runner, url = await start_stub()
+
+    request = TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True)
+
+    async def per_request_session():
+        # The pre-pooling behaviour: a new ClientSession, connector and connection every time
+        async for _ in make_ollama_request(url, "tv_model:latest", request.prompt, None):
+            pass
+
+    client = create_ollama_client("tv_model:latest", url=url)
+
+    async def pooled():
+        await client(request)
+
+    try:
+        await run_mode(args.concurrency, args.concurrency, pooled)  # warm up the pool
+        unpooled_seconds = await run_mode(args.concurrency, args.requests, per_request_session)
+        pooled_seconds = await run_mode(args.concurrency, args.requests, pooled)
+    finally:
+        await client.aclose()
+        if runner is not None:
+            await runner.cleanup()
+
+    print(f"Requests: {args.requests}, concurrency: {args.concurrency}")
+    print(f"{'mode':<22}{'seconds':>10}{'req/s':>10}{'ms/req':>10}")
+    for name, seconds in (("session per request", unpooled_seconds), ("pooled client", pooled_seconds)):
+        print(f"{name:<22}{seconds:>10.3f}{args.requests / seconds:>10.0f}{1000 * seconds / args.requests:>10.2f}")
+    print(f"Speedup: {unpooled_seconds / pooled_seconds:.2f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ollama_stub import start_stub
+from src.ollama import create_ollama_client, make_ollama_request
+from src.prompt import create_prompt, create_prompt_parts
+
+QUERIES = [
+    "What is ADR?",
+    "How do I keep timecode in sync across multiple cameras?",
+    "When should I pick ProRes 4444 over ProRes 422 HQ?",
+    "How do I conform an offline edit for the online?",
+]
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Measure prompt prefill with and without reuse of the static TV prompt prefix.")
+    parser.add_argument("--url", type=str, default=None, help="Ollama generate URL (defaults to a local stand-in server)")
+    parser.add_argument("--model", type=str, default="tv_model:latest", help="Model to query")
+    parser.add_argument("--keep-alive", type=str, default="30m", help="keep_alive sent with each request")
+    parser.add_argument("--num-predict", type=int, default=8, help="Tokens to generate per request; prefill is what is measured")
+    return parser.parse_args()
+
+async def prefill_stats(url, model, prompt, system=None, keep_alive=None, num_predict=8):
+    stats = {}
+    async for _ in make_ollama_request(url, model, prompt, None, system=system, keep_alive=keep_alive,
+                                       options={"num_predict": num_predict}, on_done=stats.update):
+        pass
+    return stats.get("prompt_eval_count", 0), stats.get("prompt_eval_duration", 0) / 1e6
+
+async def main():
+    args = parse_arguments()
+    runner = None
+    url = args.url
+    if url is None:
+        runner, url = await start_stub(prefill_delay=0.0005)
+
+    results = {}
+    try:
+        # Without reuse: a unique first line makes every prompt's prefix differ, so it is all prefilled
+        results["no reuse"] = [
+            await prefill_stats(url, args.model, f"Request {uuid.uuid4()}\n" + create_prompt(query),
+                                keep_alive=args.keep_alive, num_predict=args.num_predict)
+            for query in QUERIES
+        ]
+
+        # With reuse: the static preamble goes in as the system prompt, evaluated once up front
+        async with create_ollama_client(args.model, url=url, keep_alive=args.keep_alive) as client:
+            await client.warm_prefix(create_prompt_parts("")[0])
+        reuse = []
+        for query in QUERIES:
+            system, user = create_prompt_parts(query)
+            reuse.append(await prefill_stats(url, args.model, user, system=system,
+                                             keep_alive=args.keep_alive, num_predict=args.num_predict))
+        results["system prefix reuse"] = reuse
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    print(f"{'mode':<22}{'mean prompt tokens':>20}{'mean prefill (ms)':>20}")
+    for mode, rows in results.items():
+        tokens = sum(count for count, _ in rows) / len(rows)
+        millis = sum(ms for _, ms in rows) / len(rows)
+        print(f"{mode:<22}{tokens:>20.1f}{millis:>20.1f}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
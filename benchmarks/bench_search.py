@@ -0,0 +1,179 @@
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_types import ContributorFilter, SearchFilters, SearchParams, SearchSubject
+from src.metrics import percentile
+from src.clip_store import write_clip_store
+from src.delta_log import delta_log
+from src.search import ProjectIndex, compact_project, create_search_api
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Query latency and per-worker memory of the SearchAPI over a synthetic project, from index.json and from the clip store.")
+    parser.add_argument("--clips", type=int, default=1_000_000, help="Clips in the synthetic project")
+    parser.add_argument("--contributors", type=int, default=500, help="Distinct contributors")
+    parser.add_argument("--locations", type=int, default=200, help="Distinct locations")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes opening the same project")
+    parser.add_argument("--deltas", type=int, default=1000, help="New clips appended to the delta log")
+    parser.add_argument("--repeats", type=int, default=20, help="Timed runs per query")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    return parser.parse_args()
+
+def synthetic_project(args):
+    rng = random.Random(args.seed)
+    contributors = [f"contributor_{i}" for i in range(args.contributors)]
+    locations = [f"location_{i}" for i in range(args.locations)]
+    cameras = [f"camera_{i}" for i in range(8)]
+    dates = [f"2024-{month:02d}-{day:02d}" for month in range(1, 13) for day in range(1, 29)]
+    clips = []
+    for i in range(args.clips):
+        people = rng.sample(contributors, rng.randint(1, 3))
+        clips.append({
+            "id": f"clip_{i}",
+            "duration": rng.randint(5, 600),
+            "type": rng.choice(["rush", "review"]),
+            "shoot_date": rng.choice(dates),
+            "contributors": people,
+            "spoke": people[:1],
+            "locations": [rng.choice(locations)],
+            "cameras": [rng.choice(cameras)],
+        })
+    return {
+        "name": "synthetic",
+        "contributors": [{"id": c, "name": c.title()} for c in contributors],
+        "locations": [{"id": l, "name": l.title()} for l in locations],
+        "cameras": [{"id": c, "name": c.upper()} for c in cameras],
+        "shoot_dates": dates,
+        "clip_types": ["rush", "review"],
+        "clips": clips,
+    }
+
+QUERIES = {
+    "clips_one_contributor_page": (SearchSubject.CLIP, SearchFilters(contributors=["contributor_1"]), 50),
+    "clips_two_contributors_all": (SearchSubject.CLIP, SearchFilters(
+        contributors=ContributorFilter(contributors=["contributor_1", "contributor_2"], match_type="all")), 50),
+    "clips_contributor_and_location": (SearchSubject.CLIP, SearchFilters(
+        contributors=["contributor_1"], locations=["location_1"]), 50),
+    "contributors_at_location": (SearchSubject.CONTRIBUTOR, SearchFilters(locations=["location_1"]), 20),
+    "contributors_all_clips": (SearchSubject.CONTRIBUTOR, SearchFilters(), 20),
+    "shoot_dates_for_contributor": (SearchSubject.SHOOT_DATE, SearchFilters(contributors=["contributor_1"]), None),
+    "summary_rushes": (SearchSubject.SUMMARY, SearchFilters(clip_types=["rush"]), None),
+}
+
+def memory_kb():
+    """Resident and proportional set size of this process (Linux); PSS splits shared pages between processes."""
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Pss"):
+                    usage[name.lower() + "_kb"] = int(rest.split()[0])
+    except OSError:
+        pass
+    return usage
+
+def run_worker(indexes_dir, repeats, barrier):
+    """Open the project, time every query, then report memory once all workers hold the index."""
+    api = create_search_api(indexes_dir)
+    start = time.perf_counter()
+    api.get_available_entities("synthetic")
+    cold = time.perf_counter() - start
+
+    results = {}
+    for name, (subject, filters, limit) in QUERIES.items():
+        params = SearchParams(project_id="synthetic", subject=subject, filters=filters, limit=limit)
+        latencies = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            response = api.search(params)
+            latencies.append((time.perf_counter() - start) * 1000)
+        results[name] = {
+            "total": response.total,
+            "p50_ms": round(percentile(latencies, 50), 3),
+            "p95_ms": round(percentile(latencies, 95), 3),
+        }
+    barrier.wait()
+    return {"cold_load_seconds": round(cold, 3), "queries": results, **memory_kb()}
+
+def run_backend(indexes_dir, workers, repeats):
+    context = multiprocessing.get_context("spawn")
+    barrier = context.Manager().Barrier(workers)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(run_worker, indexes_dir, repeats, barrier) for _ in range(workers)]
+        reports = [future.result() for future in futures]
+    report = reports[0]
+    for key in ("rss_kb", "pss_kb"):
+        if key in report:
+            report[f"total_{key}"] = sum(r[key] for r in reports)
+    return report
+
+def measure_deltas(indexes_dir, count):
+    """Time appending new clips to the delta log until a reader sees them, then compacting."""
+    project_dir = os.path.join(indexes_dir, "synthetic")
+    api = create_search_api(indexes_dir, refresh_seconds=0)
+    api.get_available_entities("synthetic")
+    log = delta_log(project_dir)
+    clips = [{"op": "upsert_clip", "clip": {"id": f"new_clip_{i}", "duration": 60, "type": "rush",
+                                            "shoot_date": "2025-01-01", "contributors": ["contributor_1"]}}
+             for i in range(count)]
+
+    start = time.perf_counter()
+    log.append(*clips)
+    append = time.perf_counter() - start
+    start = time.perf_counter()
+    api.get_available_entities("synthetic")
+    visible = time.perf_counter() - start
+    start = time.perf_counter()
+    compact_project(project_dir)
+    compact = time.perf_counter() - start
+    return {
+        "count": count,
+        "append_seconds": round(append, 4),
+        "apply_seconds": round(visible, 4),
+        "compaction_seconds": round(compact, 3),
+    }
+
+def main():
+    args = parse_arguments()
+    data = synthetic_project(args)
+
+    start = time.perf_counter()
+    ProjectIndex.from_json("synthetic", data)
+    build = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as root:
+        json_dir, store_dir = os.path.join(root, "json"), os.path.join(root, "store")
+        os.makedirs(os.path.join(json_dir, "synthetic"))
+        with open(os.path.join(json_dir, "synthetic", "index.json"), "w") as f:
+            json.dump(data, f)
+        start = time.perf_counter()
+        write_clip_store(data, os.path.join(store_dir, "synthetic", "clips"))
+        convert = time.perf_counter() - start
+        del data
+
+        backends = {
+            "json": run_backend(json_dir, args.workers, args.repeats),
+            "clip_store": run_backend(store_dir, args.workers, args.repeats),
+        }
+        deltas = measure_deltas(store_dir, args.deltas)
+
+    print(json.dumps({
+        "clips": args.clips,
+        "workers": args.workers,
+        "index_build_seconds": round(build, 3),
+        "store_write_seconds": round(convert, 3),
+        "backends": backends,
+        "deltas": deltas,
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
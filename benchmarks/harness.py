@@ -0,0 +1,210 @@
+import argparse
+import asyncio
+import datetime
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from typing import Callable, Dict, List, Optional
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.data_types import AvailableEntities, TVRequest
+from src.metrics import percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures")
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baseline.json")
+COMPONENTS = ("intent", "entities", "ollama")
+
+# The project tests/test_entities.py extracts against
+AVAILABLE_ENTITIES = AvailableEntities(
+    project_id="project_123",
+    contributors={"john_id": "John", "david_id": "David", "sarah_id": "Sarah"},
+    locations={"beach_id": "Beach", "kitchen_id": "Kitchen"},
+    cameras={"sony_id": "Sony A7S", "canon_id": "Canon 5D"},
+    clip_types={"rush", "review"},
+    shoot_dates={"2023-10-01", "2023-10-02"},
+)
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Benchmark intent detection, entity extraction and the Ollama client on the test fixtures.")
+    parser.add_argument("--components", type=str, nargs="+", default=list(COMPONENTS), choices=COMPONENTS)
+    parser.add_argument("--intent-model-path", type=str, default="./tmp/models/agent_model")
+    parser.add_argument("--ner-model-path", type=str, default="./tmp/models/ner_model")
+    parser.add_argument("--repeat", type=int, default=5, help="Passes over the fixture queries")
+    parser.add_argument("--ollama-requests", type=int, default=200, help="Generations against the stand-in server")
+    parser.add_argument("--ollama-concurrency", type=int, default=8, help="Generations in flight at once")
+    parser.add_argument("--token-delay", type=float, default=0.002, help="Stand-in server seconds per streamed chunk")
+    parser.add_argument("--output", type=str, default=None, help="Write the results JSON here (default: stdout only)")
+    parser.add_argument("--baseline", type=str, default=BASELINE_PATH, help="Baseline results to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed fractional regression per metric")
+    parser.add_argument("--noise-floor-ms", type=float, default=1.0, help="Latency changes smaller than this never fail")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the new baseline")
+    return parser.parse_args()
+
+def load_fixture_queries(directory: str) -> List[str]:
+    queries = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES, directory, "*.json"))):
+        with open(path, "r") as f:
+            queries.extend(json.load(f))
+    return queries
+
+def summarise(latencies: List[float], seconds: float) -> Dict:
+    """Latency percentiles in milliseconds and throughput for one timed run."""
+    return {
+        "requests": len(latencies),
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 4),
+            "p95": round(percentile(latencies, 95) * 1000, 4),
+            "p99": round(percentile(latencies, 99) * 1000, 4),
+            "mean": round(sum(latencies) / len(latencies) * 1000, 4),
+        },
+        "throughput_per_second": round(len(latencies) / seconds, 2),
+    }
+
+def time_calls(call: Callable[[str], object], inputs: List[str]) -> Dict:
+    latencies = []
+    start = time.perf_counter()
+    for item in inputs:
+        call_start = time.perf_counter()
+        call(item)
+        latencies.append(time.perf_counter() - call_start)
+    return summarise(latencies, time.perf_counter() - start)
+
+def bench_intent(args) -> Dict:
+    from src.intent import intent_recognition
+    queries = load_fixture_queries("json_intent_files")
+    start = time.perf_counter()
+    detect_agent = intent_recognition(args.intent_model_path)
+    detect_agent(queries[0])
+    cold_start = time.perf_counter() - start
+    return {"cold_start_seconds": round(cold_start, 4), **time_calls(detect_agent, queries * args.repeat)}
+
+def bench_entities(args) -> Dict:
+    from src.extract_entities import entity_extraction_factory
+    queries = load_fixture_queries("json_entity_files")
+    start = time.perf_counter()
+    extract_entities = entity_extraction_factory(args.ner_model_path)
+    extract_entities(queries[0], AVAILABLE_ENTITIES)
+    cold_start = time.perf_counter() - start
+    return {"cold_start_seconds": round(cold_start, 4),
+            **time_calls(lambda query: extract_entities(query, AVAILABLE_ENTITIES), queries * args.repeat)}
+
+async def _bench_ollama(args) -> Dict:
+    from benchmarks.ollama_stub import start_stub
+    from src.ollama import create_ollama_client
+    queries = load_fixture_queries("json_intent_files")
+    runner, url = await start_stub(token_delay=args.token_delay)
+    client = create_ollama_client("tv_model:latest", url=url)
+    try:
+        start = time.perf_counter()
+        await client(TVRequest(query=queries[0], prompt=queries[0], as_json=True))
+        cold_start = time.perf_counter() - start
+
+        semaphore = asyncio.Semaphore(args.ollama_concurrency)
+        latencies, first_tokens = [], []
+
+        async def one(query: str) -> None:
+            async with semaphore:
+                call_start = time.perf_counter()
+                response = await client(TVRequest(query=query, prompt=query, as_json=True))
+                latencies.append(time.perf_counter() - call_start)
+                if response.metrics and response.metrics.time_to_first_token is not None:
+                    first_tokens.append(response.metrics.time_to_first_token)
+
+        requests = [queries[i % len(queries)] for i in range(args.ollama_requests)]
+        start = time.perf_counter()
+        await asyncio.gather(*(one(query) for query in requests))
+        result = {"cold_start_seconds": round(cold_start, 4), "concurrency": args.ollama_concurrency,
+                  **summarise(latencies, time.perf_counter() - start)}
+        if first_tokens:
+            result["time_to_first_token_ms"] = {"p50": round(percentile(first_tokens, 50) * 1000, 4),
+                                                "p95": round(percentile(first_tokens, 95) * 1000, 4)}
+        return result
+    finally:
+        await client.aclose()
+        await runner.cleanup()
+
+def bench_ollama(args) -> Dict:
+    return asyncio.run(_bench_ollama(args))
+
+BENCHMARKS = {"intent": bench_intent, "entities": bench_entities, "ollama": bench_ollama}
+
+def flatten(results: Dict, prefix: str = "") -> Dict[str, float]:
+    """{"intent": {"latency_ms": {"p95": 1.2}}} -> {"intent.latency_ms.p95": 1.2}, numbers only."""
+    flat = {}
+    for key, value in results.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, name + "."))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = float(value)
+    return flat
+
+def compare(results: Dict, baseline: Dict, tolerance: float, noise_floor_ms: float = 1.0,
+            skipped: Optional[Dict[str, str]] = None) -> List[str]:
+    """Metrics that regressed by more than `tolerance` against the baseline, as readable lines.
+
+    Throughput must not fall; latencies and cold starts must not rise. Counts and settings
+    (requests, concurrency) are not compared. A baseline component that this run `skipped`
+    (e.g. its model is missing) is a regression; one that was simply not selected is ignored.
+    """
+    regressions = [f"{name}: skipped ({reason})" for name, reason in (skipped or {}).items() if name in baseline]
+    current = flatten(results)
+    for name, expected in flatten(baseline).items():
+        actual = current.get(name)
+        if actual is None or name.endswith((".requests", ".concurrency")):
+            continue
+        if "throughput" in name:
+            if actual < expected * (1 - tolerance):
+                regressions.append(f"{name}: {actual:g} < {expected:g} (-{1 - actual / expected:.0%})")
+            continue
+        floor = noise_floor_ms / 1000 if name.endswith("_seconds") else noise_floor_ms
+        if actual > expected * (1 + tolerance) and actual - expected > floor:
+            regressions.append(f"{name}: {actual:g} > {expected:g} (+{actual / expected - 1:.0%})")
+    return regressions
+
+def main():
+    args = parse_arguments()
+    results, skipped = {}, {}
+    for name in args.components:
+        try:
+            results[name] = BENCHMARKS[name](args)
+        except (OSError, ImportError) as e:
+            # A model that has not been trained (or a missing dependency) skips its component
+            skipped[name] = str(e)
+    report = {
+        "generated_at": datetime.datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+        "skipped": skipped,
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline saved to {args.baseline}", file=sys.stderr)
+        return
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline to create one", file=sys.stderr)
+        return
+    with open(args.baseline, "r") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline["results"], args.tolerance, args.noise_floor_ms, skipped)
+    if regressions:
+        print(f"Regressions beyond {args.tolerance:.0%} of {args.baseline}:", file=sys.stderr)
+        for line in regressions:
+            print(f"  {line}", file=sys.stderr)
+        sys.exit(1)
+    print(f"No regressions beyond {args.tolerance:.0%} of {args.baseline}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.ollama_stub import add_stub_arguments, start_stub, stub_settings
+from src.data_types import OllamaPoolConfig, TVRequest
+from src.metrics import percentile
+from src.ollama import create_ollama_client
+from src.prompt import create_prompt_parts
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Sweep concurrency against an Ollama server (or the built-in stand-in) "
+                                                 "and report the client's throughput and latency at each level.")
+    parser.add_argument("--url", type=str, default=None, help="Existing server to load instead of the built-in stand-in")
+    parser.add_argument("--model", type=str, default="tv_model:latest")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32], help="Levels to sweep")
+    parser.add_argument("--requests", type=int, default=200, help="Generations per level")
+    parser.add_argument("--keep-alive", type=str, default=None, help="keep_alive sent with each request")
+    parser.add_argument("--limit-per-host", type=int, default=32, help="Client connection pool size")
+    parser.add_argument("--query", type=str, default="What is ADR?", help="Query sent with the TV system prompt")
+    parser.add_argument("--output", type=str, default=None, help="Write the sweep as JSON here")
+    add_stub_arguments(parser)
+    return parser.parse_args()
+
+def _ms(values: List[float], q: float):
+    result = percentile(values, q)
+    return None if result is None else round(result * 1000, 2)
+
+async def run_level(client, request: TVRequest, concurrency: int, total: int) -> Dict:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, first_tokens, tokens = [], [], 0
+    errors = 0
+
+    async def one() -> None:
+        nonlocal tokens, errors
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client(request)
+            if isinstance(response.raw_response, dict) and "error" in response.raw_response:
+                errors += 1
+                return
+            latencies.append(time.perf_counter() - start)
+            if response.metrics is not None:
+                tokens += response.metrics.eval_count or response.metrics.chunk_count
+                if response.metrics.time_to_first_token is not None:
+                    first_tokens.append(response.metrics.time_to_first_token)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    seconds = time.perf_counter() - start
+    return {
+        "concurrency": concurrency,
+        "requests": total,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "requests_per_second": round(len(latencies) / seconds, 2),
+        "tokens_per_second": round(tokens / seconds, 1),
+        "latency_ms": {"p50": _ms(latencies, 50), "p95": _ms(latencies, 95), "p99": _ms(latencies, 99)},
+        "time_to_first_token_ms": {"p50": _ms(first_tokens, 50), "p95": _ms(first_tokens, 95)},
+    }
+
+async def main():
+    args = parse_arguments()
+    runner, url = None, args.url
+    if url is None:
+        runner, url = await start_stub(**stub_settings(args))
+
+    system, prompt = create_prompt_parts(args.query)
+    request = TVRequest(query=args.query, prompt=prompt, as_json=True, system=system)
+    pool = OllamaPoolConfig(limit_per_host=args.limit_per_host)
+    levels = []
+    try:
+        async with create_ollama_client(args.model, url=url, pool=pool, keep_alive=args.keep_alive) as client:
+            for concurrency in args.concurrency:
+                levels.append(await run_level(client, request, concurrency, args.requests))
+    finally:
+        if runner is not None:
+            await runner.cleanup()
+
+    print(f"{'concurrency':>12}{'req/s':>10}{'tok/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ttft p50':>10}{'errors':>8}")
+    for level in levels:
+        latency, ttft = level["latency_ms"], level["time_to_first_token_ms"]
+        print(f"{level['concurrency']:>12}{level['requests_per_second']:>10}{level['tokens_per_second']:>10}"
+              f"{latency['p50']!s:>10}{latency['p95']!s:>10}{latency['p99']!s:>10}{ttft['p50']!s:>10}{level['errors']:>8}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"url": args.url or "stand-in", "settings": None if args.url else stub_settings(args),
+                       "levels": levels}, f, indent=2, default=str)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,226 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from typing import Dict, Optional
+from aiohttp import web
+
+# Ollama unloads an idle model after five minutes unless keep_alive says otherwise
+DEFAULT_KEEP_ALIVE = 300.0
+
+_DURATION = re.compile(r"^(-?\d+(?:\.\d+)?)(ms|s|m|h)?$")
+_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0, None: 1.0}
+
+def _common_prefix(a: list, b: list) -> int:
+    n = 0
+    for x, y in zip(a, b):
+        if x != y:
+            break
+        n += 1
+    return n
+
+def parse_keep_alive(value, default: float = DEFAULT_KEEP_ALIVE) -> float:
+    """Seconds a model stays loaded after a request: "5m", "30s", "24h" or a number of seconds.
+
+    Zero unloads the model as soon as the request finishes; a negative value keeps it forever.
+    """
+    if value is None:
+        return default
+    match = _DURATION.match(str(value).strip())
+    if match is None:
+        raise ValueError(f"Invalid keep_alive {value!r}")
+    seconds = float(match.group(1)) * _UNITS[match.group(2)]
+    return float("inf") if seconds < 0 else seconds
+
+class _Model:
+    """Residency of one model: loaded until `expires_at`, with a lock so it loads only once."""
+
+    def __init__(self, num_parallel: Optional[int]):
+        self.expires_at = 0.0
+        self.last_used = 0.0
+        self.load_lock = asyncio.Lock()
+        self.active = 0
+        self.slots = asyncio.Semaphore(num_parallel) if num_parallel else None
+        # Last evaluated prompt, for prefix reuse; dropped when the model is unloaded
+        self.cached_prompt: list = []
+
+    def resident(self, now: float) -> bool:
+        return self.active > 0 or now < self.expires_at
+
+def create_app(tokens: int = 20, token_delay: float = 0.0, prefill_delay: float = 0.0,
+               token_rate: Optional[float] = None, load_delay: float = 0.0,
+               default_keep_alive: float = DEFAULT_KEEP_ALIVE, max_loaded_models: Optional[int] = None,
+               num_parallel: Optional[int] = None, error_rate: float = 0.0, disconnect_rate: float = 0.0,
+               error_status: int = 500, seed: Optional[int] = None) -> web.Application:
+    """Stand-in for Ollama's /api/generate (streaming or not) and /api/ps endpoints.
+
+    Like Ollama it keeps the last evaluated prompt per model and only "prefills" the tokens
+    after the longest shared prefix; `prefill_delay` is the simulated cost per prefilled token
+    (whitespace-separated words stand in for tokens). Chunks stream every `token_delay`
+    seconds, or at `token_rate` per second when given.
+
+    Models are loaded on first use (`load_delay` seconds, once even under concurrent requests)
+    and stay resident for the request's `keep_alive` (default `default_keep_alive` seconds)
+    after their last request finishes; an unloaded model loses its cached prompt. At most
+    `max_loaded_models` stay loaded (least recently used are unloaded first) and each runs at
+    most `num_parallel` generations at once, queueing the rest, like OLLAMA_NUM_PARALLEL.
+
+    `error_rate` of requests fail with `error_status` before streaming and `disconnect_rate`
+    are cut off part way through the stream.
+    """
+    if token_rate:
+        token_delay = 1.0 / token_rate
+    rng = random.Random(seed)
+    models: Dict[str, _Model] = {}
+
+    def model_state(name: str) -> _Model:
+        if name not in models:
+            models[name] = _Model(num_parallel)
+        return models[name]
+
+    async def ensure_loaded(model: _Model) -> float:
+        """Load the model unless resident and mark it in use; returns the seconds spent loading."""
+        async with model.load_lock:
+            now = time.monotonic()
+            if model.resident(now):
+                model.active += 1
+                return 0.0
+            model.cached_prompt = []
+            if max_loaded_models is not None:
+                loaded = [other for other in models.values() if other is not model and other.resident(now)]
+                idle = sorted((other for other in loaded if other.active == 0), key=lambda other: other.last_used)
+                for other in idle[:max(0, len(loaded) + 1 - max_loaded_models)]:
+                    other.expires_at = 0.0
+            if load_delay:
+                await asyncio.sleep(load_delay)
+            model.active += 1
+            return load_delay
+
+    async def generate(request: web.Request) -> web.StreamResponse:
+        started = time.monotonic()
+        body = await request.json()
+        name = body.get("model")
+        if rng.random() < error_rate:
+            return web.json_response({"error": "injected failure"}, status=error_status)
+        try:
+            keep_alive = parse_keep_alive(body.get("keep_alive"), default_keep_alive)
+        except ValueError as e:
+            return web.json_response({"error": str(e)}, status=400)
+
+        model = model_state(name)
+        load_seconds = await ensure_loaded(model)
+        try:
+            if model.slots is not None:
+                await model.slots.acquire()
+            try:
+                return await respond(request, body, model, load_seconds, started)
+            finally:
+                if model.slots is not None:
+                    model.slots.release()
+        finally:
+            model.active -= 1
+            model.last_used = time.monotonic()
+            model.expires_at = model.last_used + keep_alive
+
+    async def respond(request: web.Request, body: dict, model: _Model, load_seconds: float,
+                      started: float) -> web.StreamResponse:
+        name = body.get("model")
+        prompt_tokens = (body.get("system", "") + "\n" + body.get("prompt", "")).split()
+        reused = _common_prefix(model.cached_prompt, prompt_tokens)
+        prompt_eval_count = len(prompt_tokens) - reused
+        if prefill_delay:
+            await asyncio.sleep(prompt_eval_count * prefill_delay)
+        model.cached_prompt = prompt_tokens
+
+        answer = json.dumps({"Answer": " ".join(["token"] * tokens)})
+        pieces = [answer[i:i + 8] for i in range(0, len(answer), 8)]
+        num_predict = (body.get("options") or {}).get("num_predict")
+        if num_predict is not None:
+            pieces = pieces[:num_predict]
+        disconnect_after = rng.randrange(len(pieces)) if pieces and rng.random() < disconnect_rate else None
+
+        def final() -> dict:
+            return {
+                "model": name,
+                "done": True,
+                "prompt_eval_count": prompt_eval_count,
+                "prompt_eval_duration": int(prompt_eval_count * prefill_delay * 1e9),
+                "eval_count": len(pieces),
+                "eval_duration": int(len(pieces) * token_delay * 1e9),
+                "load_duration": int(load_seconds * 1e9),
+                "total_duration": int((time.monotonic() - started) * 1e9),
+            }
+
+        if body.get("stream") is False:
+            await asyncio.sleep(len(pieces) * token_delay)
+            return web.json_response({**final(), "response": "".join(pieces)})
+
+        response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson"})
+        await response.prepare(request)
+        for position, piece in enumerate(pieces):
+            if position == disconnect_after:
+                # Drop the connection without finishing the chunked response
+                request.transport.close()
+                return response
+            if token_delay:
+                await asyncio.sleep(token_delay)
+            await response.write((json.dumps({"model": name, "response": piece, "done": False}) + "\n").encode())
+
+        await response.write((json.dumps({**final(), "response": ""}) + "\n").encode())
+        await response.write_eof()
+        return response
+
+    async def ps(request: web.Request) -> web.Response:
+        now = time.monotonic()
+        return web.json_response({"models": [
+            {"name": name, "active": model.active,
+              "expires_in": None if model.active or model.expires_at == float("inf") else round(model.expires_at - now, 3)}
+            for name, model in models.items() if model.resident(now)
+        ]})
+
+    app = web.Application()
+    app.router.add_post("/api/generate", generate)
+    app.router.add_get("/api/ps", ps)
+    return app
+
+async def start_stub(host: str = "127.0.0.1", port: int = 0, **settings) -> tuple[web.AppRunner, str]:
+    """Start the stand-in server in the current event loop and return its runner and generate URL."""
+    runner = web.AppRunner(create_app(**settings))
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    bound_port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://{host}:{bound_port}/api/generate"
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    """The stand-in's settings as command-line options (shared with load_generator.py)."""
+    parser.add_argument("--tokens", type=int, default=20, help="Words in each generated answer")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed chunks")
+    parser.add_argument("--token-rate", type=float, default=None, help="Streamed chunks per second (overrides --token-delay)")
+    parser.add_argument("--prefill-delay", type=float, default=0.0, help="Seconds per prefilled prompt token")
+    parser.add_argument("--load-delay", type=float, default=0.0, help="Seconds to load a model that is not resident")
+    parser.add_argument("--default-keep-alive", type=str, default="5m", help="Residency when a request sends no keep_alive")
+    parser.add_argument("--max-loaded-models", type=int, default=None, help="Models resident at once")
+    parser.add_argument("--num-parallel", type=int, default=None, help="Concurrent generations per model")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests failed before streaming")
+    parser.add_argument("--disconnect-rate", type=float, default=0.0, help="Share of streams cut off part way")
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for injected errors")
+
+def stub_settings(args: argparse.Namespace) -> dict:
+    return {
+        "tokens": args.tokens, "token_delay": args.token_delay, "token_rate": args.token_rate,
+        "prefill_delay": args.prefill_delay, "load_delay": args.load_delay,
+        "default_keep_alive": parse_keep_alive(args.default_keep_alive),
+        "max_loaded_models": args.max_loaded_models, "num_parallel": args.num_parallel,
+        "error_rate": args.error_rate, "disconnect_rate": args.disconnect_rate, "seed": args.seed,
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Ollama generate API.")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    web.run_app(create_app(**stub_settings(args)), host=args.host, port=args.port)
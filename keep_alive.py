@@ -1,17 +1,17 @@
+import argparse
 import requests
 import json
 
-def keep_model_loaded(model_name):
-    url = "http://localhost:11434/api/generate"
+def keep_model_loaded(model_name, url="http://localhost:11434/api/generate", keep_alive="24h"):
     data = {
         "model": model_name,
         "prompt": "Hello",
-        "keep_alive": "24h",
+        "keep_alive": keep_alive,
         "context_size": 4096,
         "stream": False  # This tells the API to not stream the response
     }
     response = requests.post(url, json=data, stream=True)
-    
+
     for line in response.iter_lines():
         if line:
             try:
@@ -20,5 +20,12 @@ def keep_model_loaded(model_name):
             except json.JSONDecodeError:
                 print(f"Could not parse line: {line}")
 
-# Replace "tv_model2" with your model name
-keep_model_loaded("tv_model2:latest")
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load a model into Ollama and keep it resident.")
+    # Replace "tv_model2" with your model name
+    parser.add_argument("--model", type=str, default="tv_model2:latest")
+    parser.add_argument("--url", type=str, default="http://localhost:11434/api/generate",
+                        help="Ollama generate URL (or benchmarks/ollama_stub.py's)")
+    parser.add_argument("--keep-alive", type=str, default="24h")
+    args = parser.parse_args()
+    keep_model_loaded(args.model, args.url, args.keep_alive)
@@ -0,0 +1,262 @@
+import json
+import os
+import uuid
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+import numpy as np
+
+STORE_FORMAT = 1
+# Times open_clip_store re-reads meta.json when the generation it names has been deleted
+_OPEN_ATTEMPTS = 3
+# Multi-valued clip fields; "seen" and "spoke" narrow contributor matches
+MULTI_VALUED_FIELDS = ("contributors", "locations", "cameras", "seen", "spoke")
+# Single-valued clip fields, stored the same way with at most one value per clip
+SINGLE_VALUED_FIELDS = ("type", "shoot_date")
+CATALOGUE_KEYS = ("id", "name", "contributors", "locations", "cameras", "shoot_dates", "clip_types", "delta_seq")
+
+class PostingField:
+    """A clip field stored both ways round: values per clip (CSR) and clips per value (postings).
+
+    `vocab` interns each distinct value to a dense integer code; `offsets`/`values` give each
+    clip's codes and `posting_offsets`/`posting_rows` give each code's sorted clip rows. The
+    arrays may be in memory or memory-mapped from a clip store.
+    """
+
+    def __init__(self, vocab: List[str], offsets: np.ndarray, values: np.ndarray,
+                 posting_offsets: np.ndarray, posting_rows: np.ndarray):
+        self.vocab = vocab
+        self.codes: Dict[str, int] = {value: code for code, value in enumerate(vocab)}
+        self.offsets = offsets
+        self.values = values
+        self.posting_offsets = posting_offsets
+        self.posting_rows = posting_rows
+        self._counts: Optional[np.ndarray] = None
+
+    @classmethod
+    def build(cls, per_clip: Sequence[Sequence[str]]) -> "PostingField":
+        vocab: List[str] = []
+        codes: Dict[str, int] = {}
+        counts = np.fromiter((len(items) for items in per_clip), dtype=np.int64, count=len(per_clip))
+        values = np.empty(int(counts.sum()), dtype=np.int32)
+        position = 0
+        for items in per_clip:
+            for item in items:
+                code = codes.get(item)
+                if code is None:
+                    code = codes[item] = len(vocab)
+                    vocab.append(item)
+                values[position] = code
+                position += 1
+
+        rows = np.repeat(np.arange(len(per_clip), dtype=np.int32), counts)
+        order = np.argsort(values, kind="stable")
+        return cls(
+            vocab,
+            offsets=np.concatenate(([0], np.cumsum(counts))).astype(np.int64),
+            values=values,
+            posting_offsets=np.searchsorted(values[order], np.arange(len(vocab) + 1), side="left").astype(np.int64),
+            posting_rows=rows[order],
+        )
+
+    @property
+    def counts(self) -> np.ndarray:
+        if self._counts is None:
+            self._counts = np.diff(self.offsets)
+        return self._counts
+
+    def row_values(self, row: int) -> List[str]:
+        return [self.vocab[code] for code in self.values[self.offsets[row]:self.offsets[row + 1]].tolist()]
+
+    def first(self, row: int) -> Optional[str]:
+        """The clip's first value, for single-valued fields."""
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.vocab[self.values[start]] if end > start else None
+
+    def rows(self, value: str) -> np.ndarray:
+        code = self.codes.get(value)
+        if code is None:
+            return np.empty(0, dtype=np.int32)
+        return self.posting_rows[self.posting_offsets[code]:self.posting_offsets[code + 1]]
+
+    def match(self, values: Sequence[str], match_type: str = "any") -> np.ndarray:
+        """Sorted clip rows having any (union) or all (intersection) of the values."""
+        postings = [self.rows(value) for value in values]
+        if not postings:
+            return np.empty(0, dtype=np.int32)
+        if match_type == "all":
+            postings.sort(key=len)
+            result = postings[0]
+            for posting in postings[1:]:
+                if not len(result):
+                    break
+                result = np.intersect1d(result, posting, assume_unique=True)
+            return result
+        if len(postings) == 1:
+            return postings[0]
+        return np.unique(np.concatenate(postings))
+
+    def totals(self, mask: Optional[np.ndarray], durations: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Clip count and summed duration per value, over the clips selected by `mask`."""
+        values, weights = self.values, np.repeat(durations, self.counts)
+        if mask is not None:
+            selected = np.repeat(mask, self.counts)
+            values, weights = values[selected], weights[selected]
+        size = len(self.vocab)
+        return np.bincount(values, minlength=size), np.bincount(values, weights=weights, minlength=size)
+
+class StringColumn:
+    """Clip ids as one UTF-8 blob plus offsets, with a sorted permutation for id -> row lookups."""
+
+    def __init__(self, blob: np.ndarray, offsets: np.ndarray, order: np.ndarray):
+        self.blob = blob
+        self.offsets = offsets
+        self.order = order
+
+    @classmethod
+    def build(cls, strings: Sequence[str]) -> "StringColumn":
+        encoded = [s.encode("utf-8") for s in strings]
+        lengths = np.fromiter((len(e) for e in encoded), dtype=np.int64, count=len(encoded))
+        order = sorted(range(len(encoded)), key=encoded.__getitem__)
+        return cls(
+            np.frombuffer(b"".join(encoded), dtype=np.uint8),
+            np.concatenate(([0], np.cumsum(lengths))).astype(np.int64),
+            np.array(order, dtype=np.int32),
+        )
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def _bytes(self, row: int) -> bytes:
+        return self.blob[self.offsets[row]:self.offsets[row + 1]].tobytes()
+
+    def __getitem__(self, row: int) -> str:
+        return self._bytes(row).decode("utf-8")
+
+    def get(self, value: str) -> Optional[int]:
+        """Row of `value`, or None; a binary search over the sorted permutation."""
+        target = value.encode("utf-8")
+        low, high = 0, len(self.order)
+        while low < high:
+            middle = (low + high) // 2
+            if self._bytes(self.order[middle]) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(self.order) and self._bytes(self.order[low]) == target:
+            return int(self.order[low])
+        return None
+
+class ClipColumns(NamedTuple):
+    clip_ids: StringColumn
+    durations: np.ndarray
+    fields: Dict[str, PostingField]
+
+def build_clip_columns(clips: Sequence[Dict]) -> ClipColumns:
+    """Columnar, interned form of index.json-style clip records."""
+    fields = {field: PostingField.build([clip.get(field, ()) for clip in clips]) for field in MULTI_VALUED_FIELDS}
+    for field in SINGLE_VALUED_FIELDS:
+        fields[field] = PostingField.build([(clip[field],) if clip.get(field) else () for clip in clips])
+    return ClipColumns(
+        clip_ids=StringColumn.build([clip["id"] for clip in clips]),
+        durations=np.fromiter((clip.get("duration") or 0 for clip in clips), dtype=np.int64, count=len(clips)),
+        fields=fields,
+    )
+
+def _arrays(columns: ClipColumns) -> Iterable[Tuple[str, np.ndarray]]:
+    yield "clip_ids.blob", columns.clip_ids.blob
+    yield "clip_ids.offsets", columns.clip_ids.offsets
+    yield "clip_ids.order", columns.clip_ids.order
+    yield "durations", columns.durations
+    for name, field in columns.fields.items():
+        yield f"{name}.offsets", field.offsets
+        yield f"{name}.values", field.values
+        yield f"{name}.posting_offsets", field.posting_offsets
+        yield f"{name}.posting_rows", field.posting_rows
+
+def write_clip_store(data: Dict, store_dir: str) -> str:
+    """Write an index.json-style project (catalogue plus "clips") as a memory-mappable clip store.
+
+    Every column is a separate .npy file tagged with a new generation; meta.json holds the
+    catalogue, field vocabularies and current generation. Replacing meta.json is the commit
+    point, so an existing store can be rewritten in place while readers keep using the old
+    generation's files; its modification time is the store's version. The previous generation
+    is kept until the next write, so a reader that read the old meta.json can still open it.
+    """
+    columns = build_clip_columns(data.get("clips", []))
+    generation = uuid.uuid4().hex[:12]
+    os.makedirs(store_dir, exist_ok=True)
+    previous = None
+    try:
+        with open(os.path.join(store_dir, "meta.json"), "r") as f:
+            previous = json.load(f).get("generation")
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    for name, array in _arrays(columns):
+        np.save(os.path.join(store_dir, f"{name}.{generation}.npy"), np.ascontiguousarray(array))
+
+    meta = {
+        "format": STORE_FORMAT,
+        "generation": generation,
+        "clip_count": len(columns.clip_ids),
+        "catalogue": {key: data[key] for key in CATALOGUE_KEYS if key in data},
+        "vocab": {name: field.vocab for name, field in columns.fields.items()},
+    }
+    tmp_path = os.path.join(store_dir, "meta.json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, os.path.join(store_dir, "meta.json"))
+
+    # Generations before the previous one are no longer referenced; processes that mapped them keep their pages
+    keep = {f".{generation}.npy", f".{previous}.npy"}
+    for filename in os.listdir(store_dir):
+        if filename.endswith(".npy") and not filename.endswith(tuple(keep)):
+            os.remove(os.path.join(store_dir, filename))
+    return store_dir
+
+def convert_index(index_path: str, store_dir: Optional[str] = None) -> str:
+    """Convert `<project>/index.json` into a clip store, by default at `<project>/clips`."""
+    with open(index_path, "r") as f:
+        data = json.load(f)
+    return write_clip_store(data, store_dir or os.path.join(os.path.dirname(index_path), "clips"))
+
+def open_clip_store(store_dir: str) -> Tuple[Dict, ClipColumns]:
+    """Memory-map a clip store read-only; returns its catalogue and columns.
+
+    Nothing is read until a query touches it, and the pages live in the OS page cache, so every
+    worker process that opens the same store shares one copy. If the generation named in
+    meta.json is removed by concurrent rewrites before it is mapped, the open is retried
+    against the new meta.json.
+    """
+    for attempt in range(_OPEN_ATTEMPTS):
+        try:
+            return _open_generation(store_dir)
+        except FileNotFoundError:
+            if attempt == _OPEN_ATTEMPTS - 1:
+                raise
+
+def _open_generation(store_dir: str) -> Tuple[Dict, ClipColumns]:
+    with open(os.path.join(store_dir, "meta.json"), "r") as f:
+        meta = json.load(f)
+    if meta.get("format") != STORE_FORMAT:
+        raise ValueError(f"Unsupported clip store format {meta.get('format')} in {store_dir}")
+
+    def load(name: str) -> np.ndarray:
+        return np.load(os.path.join(store_dir, f"{name}.{meta['generation']}.npy"), mmap_mode="r")
+
+    fields = {
+        name: PostingField(vocab, load(f"{name}.offsets"), load(f"{name}.values"),
+                           load(f"{name}.posting_offsets"), load(f"{name}.posting_rows"))
+        for name, vocab in meta["vocab"].items()
+    }
+    clip_ids = StringColumn(load("clip_ids.blob"), load("clip_ids.offsets"), load("clip_ids.order"))
+    return meta["catalogue"], ClipColumns(clip_ids, load("durations"), fields)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert a project's index.json into a memory-mapped clip store.")
+    parser.add_argument("--index-path", type=str, required=True, help="Project index.json to convert")
+    parser.add_argument("--output-path", type=str, default=None, help="Store directory (default: <project>/clips)")
+    args = parser.parse_args()
+
+    output = convert_index(args.index_path, args.output_path)
+    print(f"Clip store saved to {output}")
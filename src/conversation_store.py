@@ -0,0 +1,287 @@
+import bisect
+import copy
+import os
+import re
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from .data_types import ConversationMemory, LLMResponse, TVResponse
+from .memory import ConversationMemoryManager, Turn, estimate_tokens, format_turn
+
+# Session ids become directory names
+_SESSION_ID = re.compile(r"^[A-Za-z0-9_-][A-Za-z0-9_.-]*$")
+# Each index entry is (byte offset, byte length) of one turn's line in its segment
+_INDEX_ENTRY = np.dtype([("offset", "<i8"), ("length", "<i8")])
+# Turns read per step when walking back from the newest turn
+_LOAD_PAGE = 16
+
+def _check_session_id(session_id: str) -> None:
+    if not _SESSION_ID.match(session_id):
+        raise ValueError(f"Invalid session id {session_id!r}")
+
+def _encode(turn: Turn) -> bytes:
+    kind = "tv" if isinstance(turn, TVResponse) else "llm"
+    # Kind first so it is cheap to read back without a second parse
+    return f'{{"kind":"{kind}","turn":{turn.model_dump_json()}}}\n'.encode("utf-8")
+
+def _decode(line: bytes) -> Turn:
+    model = TVResponse if line.startswith(b'{"kind":"tv"') else LLMResponse
+    return model.model_validate_json(line[line.index(b'"turn":') + len(b'"turn":'):-2])
+
+class _Session:
+    """Durable layout of one session: segment start turns and their index entries."""
+
+    def __init__(self, session_dir: str):
+        self.dir = session_dir
+        self.starts: List[int] = []
+        self.counts: List[int] = []
+        self.sizes: List[int] = []
+        if os.path.isdir(session_dir):
+            starts = sorted(int(name[:-len(".jsonl")]) for name in os.listdir(session_dir) if name.endswith(".jsonl"))
+            for start in starts:
+                self._recover(start)
+
+    def path(self, start: int, suffix: str) -> str:
+        return os.path.join(self.dir, f"{start:012d}{suffix}")
+
+    def _recover(self, start: int) -> None:
+        """Drop anything written after the last complete index entry (an interrupted batch)."""
+        index_path, segment_path = self.path(start, ".idx"), self.path(start, ".jsonl")
+        index_size = os.path.getsize(index_path) if os.path.exists(index_path) else 0
+        count = index_size // _INDEX_ENTRY.itemsize
+        if count:
+            with open(index_path, "rb") as f:
+                f.seek((count - 1) * _INDEX_ENTRY.itemsize)
+                last = np.frombuffer(f.read(_INDEX_ENTRY.itemsize), dtype=_INDEX_ENTRY)[0]
+            size = int(last["offset"] + last["length"])
+        else:
+            size = 0
+        if size > os.path.getsize(segment_path):
+            # Segments are fsync'd before their index, so this is corruption rather than a crash
+            raise ValueError(f"Conversation segment {segment_path} is shorter than its index")
+        for path, expected in ((index_path, count * _INDEX_ENTRY.itemsize), (segment_path, size)):
+            if os.path.exists(path) and os.path.getsize(path) != expected:
+                os.truncate(path, expected)
+        self.starts.append(start)
+        self.counts.append(count)
+        self.sizes.append(size)
+
+    @property
+    def turn_count(self) -> int:
+        return self.starts[-1] + self.counts[-1] if self.starts else 0
+
+    def snapshot(self) -> "_Session":
+        """A copy of the layout that later appends do not change."""
+        layout = copy.copy(self)
+        layout.starts, layout.counts, layout.sizes = list(self.starts), list(self.counts), list(self.sizes)
+        return layout
+
+    def entries(self, start: int, end: int) -> List[Tuple[int, np.ndarray]]:
+        """(segment start, index entries) covering durable turns [start, end)."""
+        result = []
+        position = bisect.bisect_right(self.starts, start) - 1
+        while start < end and position < len(self.starts):
+            first = self.starts[position]
+            stop = min(end, first + self.counts[position])
+            with open(self.path(first, ".idx"), "rb") as f:
+                f.seek((start - first) * _INDEX_ENTRY.itemsize)
+                raw = f.read((stop - start) * _INDEX_ENTRY.itemsize)
+            result.append((first, np.frombuffer(raw, dtype=_INDEX_ENTRY)))
+            start = stop
+            position += 1
+        return result
+
+class ConversationStore:
+    """Durable, append-only conversation turns, kept as JSONL segments per session.
+
+    Each session is a directory under `store_dir` holding segments named after their first turn
+    number, each with a binary `.idx` sidecar of (offset, length) per turn. Reading turn n
+    touches only its index entry and its own line, so opening a long session costs the turns
+    actually loaded, not its length.
+
+    `append` only queues the turn; a background thread encodes, writes and fsyncs queued turns
+    in batches (everything queued while the previous batch was syncing goes in the next one),
+    so the response path never waits on the disk. Reads see queued turns immediately; `flush`
+    waits until they are durable. Segment data is fsync'd before its index, and anything past
+    the last index entry is dropped on open, so a crash loses at most the unsynced batch.
+    Use one ConversationStore per directory per process.
+    """
+
+    def __init__(self, store_dir: str, segment_bytes: int = 4 << 20):
+        self.store_dir = store_dir
+        self.segment_bytes = segment_bytes
+        os.makedirs(store_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._sessions: Dict[str, _Session] = {}
+        # Per session: turns appended but not yet durable; they follow the durable ones in order
+        self._pending: Dict[str, List[Turn]] = {}
+        self._queued = 0
+        self._written = 0
+        self._error: Optional[BaseException] = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="conversation-store", daemon=True)
+        self._writer.start()
+
+    def _session(self, session_id: str) -> _Session:
+        # Called with the lock held
+        session = self._sessions.get(session_id)
+        if session is None:
+            _check_session_id(session_id)
+            session = self._sessions[session_id] = _Session(os.path.join(self.store_dir, session_id))
+        return session
+
+    def sessions(self) -> List[str]:
+        with self._lock:
+            known = set(self._pending)
+        return sorted(known | {name for name in os.listdir(self.store_dir)
+                               if os.path.isdir(os.path.join(self.store_dir, name))})
+
+    def append(self, session_id: str, turn: Turn) -> int:
+        """Queue a turn for writing; returns its turn number (0-based) within the session."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ConversationStore is closed")
+            session = self._session(session_id)
+            pending = self._pending.setdefault(session_id, [])
+            pending.append(turn)
+            self._queued += 1
+            self._changed.notify_all()
+            return session.turn_count + len(pending) - 1
+
+    def turn_count(self, session_id: str) -> int:
+        with self._lock:
+            return self._session(session_id).turn_count + len(self._pending.get(session_id, ()))
+
+    def turns(self, session_id: str, start: int, end: int) -> List[Turn]:
+        """Turns [start, end) of a session, oldest first; only those lines are read and parsed."""
+        with self._lock:
+            session = self._session(session_id)
+            durable = session.turn_count
+            pending = list(self._pending.get(session_id, ()))
+            layout = session.snapshot()
+        start, end = max(0, start), min(end, durable + len(pending))
+        result: List[Turn] = []
+        for first, entries in layout.entries(start, min(end, durable)):
+            if not len(entries):
+                continue
+            base = int(entries[0]["offset"])
+            with open(layout.path(first, ".jsonl"), "rb") as f:
+                f.seek(base)
+                data = f.read(int(entries[-1]["offset"] + entries[-1]["length"]) - base)
+            result.extend(_decode(data[offset - base:offset - base + length])
+                          for offset, length in entries.tolist())
+        result.extend(pending[max(0, start - durable):max(0, end - durable)])
+        return result
+
+    def recent(self, session_id: str, count: int) -> List[Turn]:
+        """The newest `count` turns, oldest first."""
+        total = self.turn_count(session_id)
+        return self.turns(session_id, total - count, total)
+
+    def page(self, session_id: str, before: int, size: int) -> List[Turn]:
+        """Up to `size` turns immediately before turn number `before`, for paging back through history."""
+        return self.turns(session_id, before - size, before)
+
+    def open_memory(self, session_id: str, budget_tokens: Optional[int] = None,
+                    count_tokens: Callable[[str], int] = estimate_tokens, **kwargs) -> ConversationMemoryManager:
+        """A memory manager seeded with the session's most recent turns, appending new turns here.
+
+        Turns are read newest first, a page at a time, only until the budget is used up; older
+        turns stay on disk (see `page`).
+        """
+        memory = ConversationMemory(history=[])
+        budget = budget_tokens or memory.token_limit
+        loaded: List[Turn] = []
+        tokens: List[int] = []
+        total, end = 0, self.turn_count(session_id)
+        while end > 0 and total <= budget:
+            page = self.turns(session_id, end - _LOAD_PAGE, end)
+            for turn in reversed(page):
+                loaded.append(turn)
+                tokens.append(count_tokens(format_turn(turn)))
+                total += tokens[-1]
+                if total > budget:
+                    break
+            end -= len(page)
+        memory.history, memory.turn_tokens = loaded[::-1], tokens[::-1]
+        return ConversationMemoryManager(memory, budget_tokens=budget, count_tokens=count_tokens,
+                                         on_append=lambda turn: self.append(session_id, turn), **kwargs)
+
+    def flush(self, timeout: Optional[float] = None) -> None:
+        """Block until every turn appended so far is durable."""
+        with self._lock:
+            target = self._queued
+            if not self._changed.wait_for(lambda: self._written >= target or self._error is not None, timeout):
+                raise TimeoutError(f"Conversation store flush timed out after {timeout}s")
+            if self._error is not None:
+                raise RuntimeError("Conversation store writer failed") from self._error
+
+    def close(self) -> None:
+        """Write everything queued, then stop the writer."""
+        with self._lock:
+            self._closed = True
+            self._changed.notify_all()
+        self._writer.join()
+        if self._error is not None:
+            raise RuntimeError("Conversation store writer failed") from self._error
+
+    def __enter__(self) -> "ConversationStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _write_loop(self) -> None:
+        while True:
+            with self._lock:
+                self._changed.wait_for(lambda: self._queued > self._written or self._closed)
+                if self._queued == self._written:
+                    return
+                batch = {session_id: list(turns) for session_id, turns in self._pending.items() if turns}
+            try:
+                for session_id, turns in batch.items():
+                    self._write(session_id, turns)
+            except BaseException as e:
+                with self._lock:
+                    self._error = e
+                    self._changed.notify_all()
+                return
+
+    def _write(self, session_id: str, turns: List[Turn]) -> None:
+        """Append turns to the session's newest segment (starting another when it is full)."""
+        session = self._sessions[session_id]
+        lines = [_encode(turn) for turn in turns]
+        os.makedirs(session.dir, exist_ok=True)
+        position = 0
+        while position < len(lines):
+            if not session.starts or session.sizes[-1] >= self.segment_bytes:
+                start = session.turn_count
+                with self._lock:
+                    session.starts.append(start)
+                    session.counts.append(0)
+                    session.sizes.append(0)
+            size, room = session.sizes[-1], self.segment_bytes - session.sizes[-1]
+            chunk = []
+            while position < len(lines) and (not chunk or room > 0):
+                chunk.append(lines[position])
+                room -= len(lines[position])
+                position += 1
+
+            entries = np.empty(len(chunk), dtype=_INDEX_ENTRY)
+            entries["length"] = [len(line) for line in chunk]
+            entries["offset"] = size + np.concatenate(([0], np.cumsum(entries["length"][:-1])))
+            start = session.starts[-1]
+            # Data first, then the index that makes it visible after a restart
+            for suffix, data in ((".jsonl", b"".join(chunk)), (".idx", entries.tobytes())):
+                with open(session.path(start, suffix), "ab") as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+            with self._lock:
+                # Durable and pending change together so turn numbers never shift under a reader
+                session.counts[-1] += len(chunk)
+                session.sizes[-1] += int(entries["length"].sum())
+                del self._pending[session_id][:len(chunk)]
+                self._written += len(chunk)
+                self._changed.notify_all()
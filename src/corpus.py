@@ -0,0 +1,206 @@
+import hashlib
+import json
+import os
+import random
+import zlib
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+import spacy
+from spacy.tokens import Doc, DocBin
+from spacy.training import Example
+from spacy.util import filter_spans
+
+# 2: tokens are split at entity boundaries instead of contracting misaligned spans
+CORPUS_FORMAT = 2
+DEFAULT_SHARD_SIZE = 10000
+MANIFEST = "manifest.json"
+
+def read_records(path: str) -> Iterator[Dict]:
+    """Training records from a .jsonl file (streamed) or a .json list.
+
+    A record is {"text": ...} plus "cats" (text classification) and/or "entities" as
+    [start, end, label] character offsets. [text, {"cats": ...}] pairs are accepted too.
+    """
+    with open(path, "r") as f:
+        lines = f if path.endswith(".jsonl") else json.load(f)
+        for item in lines:
+            record = json.loads(item) if isinstance(item, str) else item
+            if isinstance(record, list):
+                text, annotations = record
+                record = {"text": text, **annotations}
+            yield record
+
+def _chunks(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    iterator = iter(records)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+def _shard_hash(records: Sequence[Dict], lang: str) -> str:
+    digest = hashlib.sha256(f"{CORPUS_FORMAT}:{lang}\n".encode("utf-8"))
+    for record in records:
+        digest.update(json.dumps(record, sort_keys=True).encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+def split_tokens_at(doc: Doc, offsets: Iterable[int]) -> Doc:
+    """`doc` with its tokens split at the given character offsets; the text is unchanged.
+
+    The tokenizer keeps "A7S." as one token, so an entity "Sony A7S" in "Shot on the Sony
+    A7S." only aligns once "A7S" and "." are separate tokens. Returns `doc` itself when every
+    offset already falls on a token boundary.
+    """
+    cuts = sorted(set(offsets))
+    if not any(token.idx < cut < token.idx + len(token) for token in doc for cut in cuts):
+        return doc
+    words, spaces = [], []
+    for token in doc:
+        inner = [cut - token.idx for cut in cuts if token.idx < cut < token.idx + len(token)]
+        bounds = [0, *inner, len(token)]
+        words.extend(token.text[start:end] for start, end in zip(bounds, bounds[1:]))
+        spaces.extend([False] * len(inner) + [bool(token.whitespace_)])
+    split = Doc(doc.vocab, words=words, spaces=spaces)
+    split.cats = dict(doc.cats)
+    return split
+
+def record_to_doc(nlp, record: Dict) -> Doc:
+    """Tokenise a record (tokenizer only) and attach its cats and entity spans."""
+    doc = nlp.make_doc(record["text"])
+    if "cats" in record:
+        doc.cats = dict(record["cats"])
+    if "entities" in record:
+        doc = split_tokens_at(doc, (offset for start, end, _ in record["entities"] for offset in (start, end)))
+        spans = (doc.char_span(start, end, label=label) for start, end, label in record["entities"])
+        doc.ents = filter_spans([span for span in spans if span is not None])
+    return doc
+
+def load_manifest(corpus_dir: str) -> Dict:
+    path = os.path.join(corpus_dir, MANIFEST)
+    if not os.path.exists(path):
+        return {"format": CORPUS_FORMAT, "shards": [], "total": 0}
+    with open(path, "r") as f:
+        return json.load(f)
+
+def shard_name(index: int) -> str:
+    return f"shard-{index:05d}.spacy"
+
+def write_manifest(corpus_dir: str, shards: List[Dict], lang: str) -> Dict:
+    """Atomically replace the manifest with `shards` ({"path", "hash", "count"}) and delete stale shards."""
+    manifest = {"format": CORPUS_FORMAT, "lang": lang, "shards": shards, "total": sum(s["count"] for s in shards)}
+    tmp_path = os.path.join(corpus_dir, MANIFEST + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, os.path.join(corpus_dir, MANIFEST))
+
+    current = {shard["path"] for shard in shards}
+    for filename in os.listdir(corpus_dir):
+        if filename.endswith(".spacy") and filename not in current:
+            os.remove(os.path.join(corpus_dir, filename))
+    return manifest
+
+def build_corpus(sources: Sequence[str], corpus_dir: str, shard_size: int = DEFAULT_SHARD_SIZE,
+                 lang: str = "en") -> Dict:
+    """Convert JSON/JSONL training records into sharded DocBin (.spacy) files.
+
+    Records are read as a stream and cut into shards of `shard_size` in source order. Each
+    shard is named by its position and tagged with a hash of its records, so a rebuild only
+    tokenises shards whose content changed; appending rows touches the last shard alone.
+    Only the language's tokenizer runs (the same rules as the en_core_web_* models). Returns
+    the manifest, which also reports how many shards were built and skipped.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    previous = load_manifest(corpus_dir)
+    previous_shards = previous["shards"] if previous.get("format") == CORPUS_FORMAT else []
+    nlp = None
+    shards, built, skipped = [], 0, 0
+
+    records = (record for source in sources for record in read_records(source))
+    for index, chunk in enumerate(_chunks(records, shard_size)):
+        name = shard_name(index)
+        digest = _shard_hash(chunk, lang)
+        old = previous_shards[index] if index < len(previous_shards) else None
+        if old is not None and old["hash"] == digest and os.path.exists(os.path.join(corpus_dir, name)):
+            skipped += 1
+        else:
+            if nlp is None:
+                nlp = spacy.blank(lang)
+            doc_bin = DocBin(docs=(record_to_doc(nlp, record) for record in chunk))
+            tmp_path = os.path.join(corpus_dir, name + ".tmp")
+            doc_bin.to_disk(tmp_path)
+            os.replace(tmp_path, os.path.join(corpus_dir, name))
+            built += 1
+        shards.append({"path": name, "hash": digest, "count": len(chunk)})
+
+    manifest = write_manifest(corpus_dir, shards, lang)
+    return {**manifest, "built": built, "skipped": skipped}
+
+def in_dev_split(text: str, dev_fraction: float) -> bool:
+    """Stable held-out assignment by text, so the split needs no global shuffle."""
+    return zlib.crc32(text.encode("utf-8")) % 10000 < dev_fraction * 10000
+
+def doc_to_example(doc: Doc) -> Example:
+    """Pair an annotated doc with an unannotated copy of its tokens; nothing is re-tokenised."""
+    return Example(Doc(doc.vocab, words=[token.text for token in doc], spaces=[bool(token.whitespace_) for token in doc]), doc)
+
+class ShardedCorpus:
+    """Training examples read from a built corpus one shard at a time.
+
+    Each epoch visits the shards in a random order and shuffles within a shard, so memory is
+    bounded by the shard size. Corpora of up to `max_cached_examples` are converted once and
+    kept in memory instead. Examples whose text falls in the dev split are never trained on.
+    """
+
+    def __init__(self, corpus_dir: str, dev_fraction: float = 0.0, max_cached_examples: int = 100000):
+        self.corpus_dir = corpus_dir
+        self.dev_fraction = dev_fraction
+        self.manifest = load_manifest(corpus_dir)
+        if not self.manifest["shards"]:
+            raise ValueError(f"No corpus shards in {corpus_dir}; run build_corpus first")
+        self.max_cached_examples = max_cached_examples
+        self._cached: Optional[List[List[Example]]] = None
+
+    def __len__(self) -> int:
+        return self.manifest["total"]
+
+    def _shard_docs(self, shard: Dict, vocab) -> List[Doc]:
+        return list(DocBin().from_disk(os.path.join(self.corpus_dir, shard["path"])).get_docs(vocab))
+
+    def dev_examples(self, nlp) -> List[Example]:
+        if self.dev_fraction <= 0:
+            return []
+        return [doc_to_example(doc) for shard in self.manifest["shards"]
+                for doc in self._shard_docs(shard, nlp.vocab) if in_dev_split(doc.text, self.dev_fraction)]
+
+    def _train_shard(self, shard: Dict, vocab) -> List[Example]:
+        return [doc_to_example(doc) for doc in self._shard_docs(shard, vocab)
+                if not in_dev_split(doc.text, self.dev_fraction)]
+
+    def train_examples(self, nlp, rng: Optional[random.Random] = None) -> Iterator[Example]:
+        """One epoch of training examples."""
+        rng = rng or random.Random()
+        if self._cached is None and len(self) <= self.max_cached_examples:
+            self._cached = [self._train_shard(shard, nlp.vocab) for shard in self.manifest["shards"]]
+        order = list(range(len(self.manifest["shards"])))
+        rng.shuffle(order)
+        for index in order:
+            examples = (list(self._cached[index]) if self._cached is not None
+                        else self._train_shard(self.manifest["shards"][index], nlp.vocab))
+            rng.shuffle(examples)
+            yield from examples
+
+    def sample(self, nlp, size: int = 1000) -> List[Example]:
+        """A few training examples from the first shard, for nlp.initialize."""
+        return self._train_shard(self.manifest["shards"][0], nlp.vocab)[:size]
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build sharded DocBin training corpora from JSON/JSONL records.")
+    parser.add_argument("--source", type=str, nargs="+", required=True, help="JSON or JSONL record files")
+    parser.add_argument("--output-path", type=str, required=True, help="Corpus directory")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE, help="Records per shard")
+    parser.add_argument("--lang", type=str, default="en", help="Tokenizer language")
+    args = parser.parse_args()
+
+    manifest = build_corpus(args.source, args.output_path, args.shard_size, args.lang)
+    print(f"Corpus saved to {args.output_path}: {manifest['total']} records in {len(manifest['shards'])} shards "
+          f"({manifest['built']} built, {manifest['skipped']} unchanged)")
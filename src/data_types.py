@@ -1,7 +1,8 @@
 from enum import Enum
-from typing import Callable, NamedTuple, Dict, List, Any, Optional, Set
-from pydantic import BaseModel
+from typing import Callable, NamedTuple, Dict, Iterable, Iterator, List, Any, Optional, Set
+from pydantic import BaseModel, ConfigDict
 from datetime import datetime
+import numpy as np
 
 class AgentType(str, Enum):
     TV_POST_PRODUCTION = "TV_POST_PRODUCTION"
@@ -28,6 +29,35 @@ class AgentResult(BaseModel):
     confidence: float
     all_scores: Dict[str, float]
 
+class AgentScores(BaseModel):
+    """Scores for a batch of queries, one row per text and one column per label."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    texts: List[str]
+    labels: List[str]
+    scores: np.ndarray
+    confidence_threshold: float
+    timestamp: datetime
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __getitem__(self, index: int) -> AgentResult:
+        """Build the AgentResult for a single row, matching detect_agent's output."""
+        row = self.scores[index]
+        all_scores = dict(zip(self.labels, row.tolist()))
+        agents = [AgentType(label) for label, confidence in all_scores.items() if confidence > self.confidence_threshold]
+        return AgentResult(
+            text=self.texts[index],
+            timestamp=self.timestamp,
+            agents=agents,
+            confidence=float(row.max()) if agents else 0.0,
+            all_scores=all_scores
+        )
+
+    def to_agent_results(self) -> List[AgentResult]:
+        return [self[i] for i in range(len(self.texts))]
+
 class SearchSubject(str, Enum):
     SUMMARY = "summary"
     CONTRIBUTOR = "contributor"
@@ -42,6 +72,25 @@ class ValidationError(Exception):
         self.invalid_ids = invalid_ids
         super().__init__(message)
 
+class QueueTimeoutError(Exception):
+    def __init__(self, message: str, waited_seconds: float):
+        self.message = message
+        self.waited_seconds = waited_seconds
+        super().__init__(message)
+
+class QueueFullError(Exception):
+    def __init__(self, message: str, queue_depth: int):
+        self.message = message
+        self.queue_depth = queue_depth
+        super().__init__(message)
+
+class RequestPriority(str, Enum):
+    INTERACTIVE = "interactive"
+    BATCH = "batch"
+
+    def __str__(self):
+        return self.value
+
 # Available Entities
 class AvailableEntities(BaseModel):
     project_id: str
@@ -50,6 +99,10 @@ class AvailableEntities(BaseModel):
     cameras: Dict[str, str]
     clip_types: Set[str]
     shoot_dates: Set[str]
+    # Alternative names keyed by entity id, e.g. {"david_id": ["Dave"]}
+    aliases: Dict[str, List[str]] = {}
+    # Changes whenever the project's entities change; used to invalidate compiled lookups
+    version: Optional[str] = None
 
 # Search Models
 class ContributorFilter(BaseModel):
@@ -68,9 +121,10 @@ class CameraFilter(BaseModel):
 
 class SearchFilters(BaseModel):
     clip_id: Optional[str] = None
-    contributors: Optional[List[str]] = None
-    locations: Optional[List[str]] = None
-    cameras: Optional[List[str]] = None
+    # A plain list matches clips with any of the ids; use the *Filter models for match_type "all"
+    contributors: Optional[List[str] | ContributorFilter] = None
+    locations: Optional[List[str] | LocationFilter] = None
+    cameras: Optional[List[str] | CameraFilter] = None
     clip_types: Optional[List[str]] = None
     shoot_dates: Optional[List[str]] = None
     type: Optional[List[str]] = None
@@ -79,6 +133,9 @@ class SearchParams(BaseModel):
     project_id: str
     subject: SearchSubject
     filters: SearchFilters
+    # Page of entities to return; `total` in the response always counts every match
+    limit: Optional[int] = None
+    offset: int = 0
 
 class EntityRef(BaseModel):
     type: SearchSubject
@@ -91,6 +148,26 @@ class SearchResponse(BaseModel):
     entities: List[EntityRef]
     total: int
 
+class DeltaOp(str, Enum):
+    UPSERT_ENTITY = "upsert_entity"
+    REMOVE_ENTITY = "remove_entity"
+    UPSERT_CLIP = "upsert_clip"
+    REMOVE_CLIP = "remove_clip"
+
+class IndexDelta(BaseModel):
+    """One change to a project index, as recorded in its delta log."""
+    op: DeltaOp
+    # contributors, locations, cameras, shoot_dates or clip_types (entity ops only)
+    kind: Optional[str] = None
+    # Full entity record ({"id", "name", ...}), or the value itself for shoot_dates/clip_types
+    entity: Optional[Dict[str, Any] | str] = None
+    # Full clip record in the index.json "clips" layout
+    clip: Optional[Dict[str, Any]] = None
+    # Entity, value or clip id to remove
+    id: Optional[str] = None
+    # Assigned by the log on append
+    seq: Optional[int] = None
+
 class SearchDB(NamedTuple):
     get_available_entities: Callable[[str], AvailableEntities]
     search_contributors: Callable[[str, Optional[str]], List[EntityRef]]
@@ -102,11 +179,46 @@ class SearchAPI(NamedTuple):
 
 class ExtractedEntities(BaseModel):
     entities: Dict[str, List[str]]
+    # Match score per linked entity id: 1.0 for an exact name, lower for a fuzzy (misspelt) match
+    scores: Dict[str, float] = {}
+
+class OllamaPoolConfig(BaseModel):
+    """Connection pool and timeout settings for the shared Ollama HTTP session."""
+    limit: int = 100
+    limit_per_host: int = 32
+    keepalive_timeout: float = 60.0
+    ttl_dns_cache: int = 300
+    connect_timeout: float = 5.0
+    # Longest gap allowed between streamed chunks; generation itself may take much longer
+    read_timeout: float = 120.0
+    total_timeout: Optional[float] = None
 
 class TVRequest(BaseModel):
     query: str
     prompt: str
     as_json: bool
+    # Static preamble sent as Ollama's system prompt so its evaluated context can be reused
+    system: Optional[str] = None
+    # Earlier conversation turns included in the prompt; part of the response cache key
+    context: Optional[str] = None
+
+class GenerationMetrics(BaseModel):
+    """Latency breakdown for one generation; client-side timings plus Ollama's own statistics."""
+    queue_seconds: Optional[float] = None
+    connect_seconds: Optional[float] = None
+    time_to_first_token: Optional[float] = None
+    inter_token_p50: Optional[float] = None
+    inter_token_p95: Optional[float] = None
+    inter_token_p99: Optional[float] = None
+    chunk_count: int = 0
+    tokens_per_second: Optional[float] = None
+    # Reported by Ollama in the final chunk (durations converted from nanoseconds)
+    prompt_eval_count: Optional[int] = None
+    prompt_eval_seconds: Optional[float] = None
+    eval_count: Optional[int] = None
+    eval_seconds: Optional[float] = None
+    load_seconds: Optional[float] = None
+    total_seconds: Optional[float] = None
 
 class TVResponse(BaseModel):
     generated_at: str
@@ -115,6 +227,33 @@ class TVResponse(BaseModel):
     model_name: str
     model_provider: str
     time_in_seconds: float
+    metrics: Optional[GenerationMetrics] = None
+
+class ResponseCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+    hit_seconds_total: float = 0.0
+    miss_seconds_total: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+class EntitiesCacheStats(BaseModel):
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
 
 class LLMRequest(BaseModel):
     query: str
@@ -132,9 +271,15 @@ class LLMResponse(BaseModel):
     time_in_seconds: float
 
 class ConversationMemory(BaseModel):
-    history: List[LLMResponse]
+    history: List[LLMResponse | TVResponse]
+    # Tokens of the kept turns plus the summary; maintained incrementally by memory.ConversationMemoryManager
     token_count: int = 0
     token_limit: int = 128000
+    # Tokens per turn in `history`, kept in step with it so the total never needs recounting
+    turn_tokens: List[int] = []
+    # One line per turn evicted from `history`, oldest first
+    summary: List[str] = []
+    summary_tokens: int = 0
 
 class EntityExtractionResult(BaseModel):
     query: str
@@ -144,8 +289,17 @@ class EntityExtractionResult(BaseModel):
 
 class WorkflowResult(BaseModel):
     query: str
-    entity_result: EntityExtractionResult | None
     error: str | None
+    # Deprecated: the workflow never produces an LLM extraction result; use `entities`
+    entity_result: EntityExtractionResult | None = None
+    agent_result: AgentResult | None = None
+    entities: ExtractedEntities | None = None
+    search_result: SearchResponse | None = None
+    tv_response: TVResponse | None = None
+    # Wall-clock seconds per stage ("intent", "entities", "search", "tv_generation", "total")
+    timings: Dict[str, float] = {}
+    # Per-branch failures; a failed branch does not discard the others' results
+    errors: Dict[str, str] = {}
 
 # The callback types for text and JSON updates
 OnTextFn = Callable[[str], None]
@@ -153,6 +307,8 @@ OnJsonFn = Callable[[str], None]
 
 # Function signatures
 IntentFn = Callable[[str], AgentResult]
+IntentBatchFn = Callable[[Iterable[str]], AgentScores]
 LLMGenerateFn = Callable[[str, OnTextFn], LLMResponse]
 EntityExtractionFn = Callable[[str], ExtractedEntities]
+EntityBatchExtractionFn = Callable[[Iterable[tuple[str, str]]], Iterator[ExtractedEntities]]
 Workflow = Callable[[str], WorkflowResult]
\ No newline at end of file
@@ -0,0 +1,188 @@
+import fcntl
+import json
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from .data_types import DeltaOp, IndexDelta
+
+ENTITY_KINDS = ("contributors", "locations", "cameras", "shoot_dates", "clip_types")
+
+def _segments(deltas_dir: str) -> List[Tuple[int, str]]:
+    """(first seq, path) of every log segment, oldest first."""
+    if not os.path.isdir(deltas_dir):
+        return []
+    return sorted(
+        (int(filename[:-len(".jsonl")]), os.path.join(deltas_dir, filename))
+        for filename in os.listdir(deltas_dir) if filename.endswith(".jsonl")
+    )
+
+class DeltaLogCorruptError(ValueError):
+    """A complete line in a delta segment is not a valid entry."""
+
+def _validate(delta: IndexDelta) -> None:
+    if delta.op in (DeltaOp.UPSERT_ENTITY, DeltaOp.REMOVE_ENTITY) and delta.kind not in ENTITY_KINDS:
+        raise ValueError(f"Entity deltas need a kind in {ENTITY_KINDS}, got {delta.kind!r}")
+    if delta.op == DeltaOp.UPSERT_ENTITY and delta.entity is None:
+        raise ValueError("upsert_entity needs an entity")
+    if delta.op == DeltaOp.UPSERT_CLIP and (delta.clip is None or "id" not in delta.clip):
+        raise ValueError("upsert_clip needs a clip with an id")
+    if delta.op in (DeltaOp.REMOVE_ENTITY, DeltaOp.REMOVE_CLIP) and delta.id is None:
+        raise ValueError(f"{delta.op.value} needs an id")
+
+def _drop_torn_line(f) -> None:
+    """Truncate a segment back to its last complete line, so the next append starts on a fresh one.
+
+    A torn last line was never acknowledged to its writer; only call this holding the writer lock.
+    """
+    size = f.seek(0, os.SEEK_END)
+    if size == 0:
+        return
+    f.seek(size - 1)
+    if f.read(1) == b"\n":
+        return
+    f.seek(0)
+    f.truncate(f.read().rfind(b"\n") + 1)
+    f.flush()
+    os.fsync(f.fileno())
+
+class DeltaLog:
+    """Append-only change log for one project, kept as JSONL segments under `<project>/deltas`.
+
+    Each segment is named after the sequence number of its first entry. Appends go to the
+    newest segment and are fsync'd before returning; `rotate` starts a new segment so the
+    older ones can be folded into a base snapshot and deleted (see search.compact_project).
+    Use one DeltaLog per project per process (`delta_log`) so sequence numbers stay ordered.
+
+    Appends hold an exclusive lock on `deltas/.lock`, and only a writer holding it drops a torn
+    last line (an append interrupted before it was acknowledged): opening a log never modifies
+    it, since another process may be part-way through a write.
+    """
+
+    def __init__(self, project_dir: str):
+        self.deltas_dir = os.path.join(project_dir, "deltas")
+        self._lock = threading.Lock()
+        segments = _segments(self.deltas_dir)
+        self._first_seq = segments[0][0] if segments else 1
+        self._segment_path = segments[-1][1] if segments else None
+        self.next_seq = segments[-1][0] if segments else 1
+        if self._segment_path is not None:
+            with open(self._segment_path, "rb") as f:
+                data = f.read()
+            # A line without its newline is torn or still being written; append deals with it
+            end = data.rfind(b"\n") + 1
+            position = 0
+            for line in data[:end].splitlines(keepends=True):
+                try:
+                    self.next_seq = json.loads(line)["seq"] + 1
+                except (json.JSONDecodeError, UnicodeDecodeError, KeyError, TypeError) as e:
+                    raise DeltaLogCorruptError(
+                        f"Undecodable delta in {self._segment_path} at byte {position}: {line[:80]!r}") from e
+                position += len(line)
+
+    @property
+    def pending(self) -> int:
+        """Entries still on disk, i.e. not yet folded into a base snapshot."""
+        return self.next_seq - self._first_seq
+
+    def _new_segment(self) -> str:
+        os.makedirs(self.deltas_dir, exist_ok=True)
+        path = os.path.join(self.deltas_dir, f"{self.next_seq:012d}.jsonl")
+        open(path, "ab").close()
+        return path
+
+    def append(self, *deltas: IndexDelta | Dict) -> int:
+        """Durably append the deltas in order; returns the sequence number of the last one."""
+        parsed = [delta if isinstance(delta, IndexDelta) else IndexDelta.model_validate(delta) for delta in deltas]
+        for delta in parsed:
+            _validate(delta)
+        with self._lock:
+            if self._segment_path is None:
+                self._segment_path = self._new_segment()
+            lines = []
+            for delta in parsed:
+                delta = delta.model_copy(update={"seq": self.next_seq})
+                lines.append(delta.model_dump_json(exclude_none=True) + "\n")
+                self.next_seq += 1
+            with open(os.path.join(self.deltas_dir, ".lock"), "ab") as lock_file:
+                # Released when the file is closed
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                with open(self._segment_path, "r+b") as f:
+                    _drop_torn_line(f)
+                    f.seek(0, os.SEEK_END)
+                    f.write("".join(lines).encode("utf-8"))
+                    f.flush()
+                    os.fsync(f.fileno())
+            return self.next_seq - 1
+
+    def rotate(self) -> int:
+        """Start a new segment for later appends; returns the last sequence number before it."""
+        with self._lock:
+            if self._segment_path is None or os.path.getsize(self._segment_path):
+                self._segment_path = self._new_segment()
+            return self.next_seq - 1
+
+    def truncate(self, upto_seq: int) -> None:
+        """Delete segments whose entries are all at or below `upto_seq`."""
+        with self._lock:
+            segments = _segments(self.deltas_dir)
+            for (_, path), (next_start, _) in zip(segments, segments[1:]):
+                if next_start - 1 <= upto_seq and path != self._segment_path:
+                    os.remove(path)
+            remaining = _segments(self.deltas_dir)
+            self._first_seq = remaining[0][0] if remaining else self.next_seq
+
+_logs: Dict[str, DeltaLog] = {}
+_logs_lock = threading.Lock()
+
+def delta_log(project_dir: str) -> DeltaLog:
+    """The process-wide DeltaLog for a project directory."""
+    key = os.path.abspath(project_dir)
+    with _logs_lock:
+        if key not in _logs:
+            _logs[key] = DeltaLog(project_dir)
+        return _logs[key]
+
+class DeltaCursor:
+    """Reads a project's delta log incrementally, returning only entries not seen before.
+
+    A complete line that does not parse raises DeltaLogCorruptError naming the segment and
+    byte offset; the cursor stays before it, so the entries ahead of it are not lost.
+    """
+
+    def __init__(self, project_dir: str, after_seq: int = 0):
+        self.deltas_dir = os.path.join(project_dir, "deltas")
+        self.seq = after_seq
+        self._path: Optional[str] = None
+        self._offset = 0
+
+    def read_new(self) -> List[IndexDelta]:
+        entries = []
+        for _, path in _segments(self.deltas_dir):
+            if self._path is not None and path < self._path:
+                continue
+            offset = self._offset if path == self._path else 0
+            try:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    data = f.read()
+            except FileNotFoundError:
+                continue
+            # A line without its newline is still being written; pick it up next time
+            end = data.rfind(b"\n") + 1
+            position = 0
+            for line in data[:end].splitlines(keepends=True):
+                try:
+                    entry = IndexDelta.model_validate_json(line)
+                except ValidationError as e:
+                    self._path, self._offset = path, offset + position
+                    if entries:
+                        # Hand back what came before it; the next read raises
+                        return entries
+                    raise DeltaLogCorruptError(f"Undecodable delta in {path} at byte {offset + position}: {line[:80]!r}") from e
+                position += len(line)
+                if entry.seq > self.seq:
+                    entries.append(entry)
+                    self.seq = entry.seq
+            self._path, self._offset = path, offset + end
+        return entries
@@ -0,0 +1,237 @@
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Callable, Dict, FrozenSet, List, Mapping, NamedTuple, Optional, Tuple
+from .data_types import AvailableEntities, EntitiesCacheStats
+from .fuzzy import FuzzyMatcher
+
+_NON_WORD = re.compile(r"[^\w]+")
+_POSSESSIVE = re.compile(r"['’]s\b")
+_LEADING_ARTICLES = ("the ", "a ", "an ")
+
+def normalise_name(text: str) -> str:
+    """Case-fold and normalise a name so spans and catalogue entries compare equal.
+
+    "The Beach", "the  beach." and "BEACH" all become "beach"; "John's" becomes "john".
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _POSSESSIVE.sub("", text)
+    text = " ".join(_NON_WORD.sub(" ", text).split())
+    for article in _LEADING_ARTICLES:
+        if text.startswith(article) and len(text) > len(article):
+            text = text[len(article):]
+            break
+    return text
+
+class EntityIndex(NamedTuple):
+    project_id: str | None
+    version: str | None
+    contributors: Dict[str, Tuple[str, ...]]
+    locations: Dict[str, Tuple[str, ...]]
+    cameras: Dict[str, Tuple[str, ...]]
+    clip_types: Tuple[str, ...]
+    # Typo-tolerant fallbacks over the keys of contributors, locations and cameras
+    fuzzy: "FuzzyMatchers"
+
+class FuzzyMatchers(dict):
+    """FuzzyMatcher per field, built on first use.
+
+    Only a span with no exact match needs one, so compiling an index (and exact-match linking)
+    never pays for the trigram postings; a cached index builds each field's matcher once.
+    """
+
+    def __init__(self, lookups: Dict[str, Dict[str, Tuple[str, ...]]]):
+        super().__init__()
+        self._lookups = lookups
+
+    def __missing__(self, field: str) -> FuzzyMatcher:
+        # Building twice under a race is harmless: both matchers are equal
+        matcher = self[field] = FuzzyMatcher(self._lookups[field])
+        return matcher
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FuzzyMatchers) and self._lookups == other._lookups
+
+    __hash__ = None
+
+def _compile_lookup(names: Dict[str, str], aliases: Dict[str, List[str]]) -> Dict[str, Tuple[str, ...]]:
+    """Map every normalised name and alias to the ids that carry it, preserving catalogue order."""
+    lookup: Dict[str, List[str]] = {}
+    for entity_id, name in names.items():
+        for candidate in (name, *aliases.get(entity_id, ())):
+            key = normalise_name(candidate)
+            if not key:
+                continue
+            ids = lookup.setdefault(key, [])
+            if entity_id not in ids:
+                ids.append(entity_id)
+    return {key: tuple(ids) for key, ids in lookup.items()}
+
+def _field(available_entities: Any, name: str) -> Any:
+    """Read a field from AvailableEntities, an EntitiesView or a plain dict without copying it."""
+    if isinstance(available_entities, dict):
+        return available_entities.get(name)
+    return getattr(available_entities, name, None)
+
+def compile_entity_index(available_entities: "AvailableEntities | EntitiesView | Dict") -> EntityIndex:
+    """Build the constant-time span -> ids lookups for one project's entities."""
+    aliases = _field(available_entities, "aliases") or {}
+    lookups = {
+        field: _compile_lookup(_field(available_entities, field) or {}, aliases)
+        for field in ("contributors", "locations", "cameras")
+    }
+
+    return EntityIndex(
+        project_id=_field(available_entities, "project_id"),
+        version=_field(available_entities, "version"),
+        clip_types=tuple(_field(available_entities, "clip_types") or ()),
+        fuzzy=FuzzyMatchers(lookups),
+        **lookups,
+    )
+
+class EntitiesView(NamedTuple):
+    """Read-only AvailableEntities for one project version, with its linking index compiled once.
+
+    Pass it straight to the entity extractors: no model_dump and no recompilation per query.
+    """
+    project_id: Optional[str]
+    version: Optional[str]
+    contributors: Mapping[str, str]
+    locations: Mapping[str, str]
+    cameras: Mapping[str, str]
+    clip_types: FrozenSet[str]
+    shoot_dates: FrozenSet[str]
+    aliases: Mapping[str, Tuple[str, ...]]
+    index: EntityIndex
+
+    def to_available_entities(self) -> AvailableEntities:
+        return AvailableEntities(
+            project_id=self.project_id,
+            contributors=dict(self.contributors),
+            locations=dict(self.locations),
+            cameras=dict(self.cameras),
+            clip_types=set(self.clip_types),
+            shoot_dates=set(self.shoot_dates),
+            aliases={entity_id: list(names) for entity_id, names in self.aliases.items()},
+            version=self.version,
+        )
+
+def entities_view(available_entities: "AvailableEntities | EntitiesView | Dict") -> EntitiesView:
+    if isinstance(available_entities, EntitiesView):
+        return available_entities
+    aliases = _field(available_entities, "aliases") or {}
+    return EntitiesView(
+        project_id=_field(available_entities, "project_id"),
+        version=_field(available_entities, "version"),
+        contributors=MappingProxyType(dict(_field(available_entities, "contributors") or {})),
+        locations=MappingProxyType(dict(_field(available_entities, "locations") or {})),
+        cameras=MappingProxyType(dict(_field(available_entities, "cameras") or {})),
+        clip_types=frozenset(_field(available_entities, "clip_types") or ()),
+        shoot_dates=frozenset(_field(available_entities, "shoot_dates") or ()),
+        aliases=MappingProxyType({entity_id: tuple(names) for entity_id, names in aliases.items()}),
+        index=compile_entity_index(available_entities),
+    )
+
+class EntityIndexCache:
+    """Compiled EntityIndex per project_id, rebuilt when the project's version changes.
+
+    Entities without a version (e.g. a model_dump() without one) are keyed on the object passed
+    in: passing the same catalogue object again reuses its index, any other object recompiles.
+    Checking identity is constant-time, whatever the catalogue's size. A catalogue edited in
+    place needs `invalidate`; callers that rebuild their entities per query should pass an
+    EntitiesView (see entities_view and AvailableEntitiesCache) instead.
+    """
+
+    def __init__(self, max_projects: int = 128):
+        self.max_projects = max_projects
+        # (version it was compiled from, the unversioned catalogue it was compiled from, index).
+        # Holding the catalogue keeps it alive, so its identity cannot be reused by another object.
+        self._indexes: "OrderedDict[Optional[str], Tuple[Optional[str], Any, EntityIndex]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, available_entities: AvailableEntities | EntitiesView | Dict) -> EntityIndex:
+        if isinstance(available_entities, EntitiesView):
+            return available_entities.index
+        project_id, version = _field(available_entities, "project_id"), _field(available_entities, "version")
+        source = available_entities if version is None else None
+
+        with self._lock:
+            cached = self._indexes.get(project_id)
+            if cached is not None and cached[0] == version and cached[1] is source:
+                self._indexes.move_to_end(project_id)
+                return cached[2]
+
+        index = compile_entity_index(available_entities)
+        with self._lock:
+            self._indexes[project_id] = (version, source, index)
+            self._indexes.move_to_end(project_id)
+            while len(self._indexes) > self.max_projects:
+                self._indexes.popitem(last=False)
+        return index
+
+    def invalidate(self, project_id: str) -> None:
+        with self._lock:
+            self._indexes.pop(project_id, None)
+
+class AvailableEntitiesCache:
+    """Process-wide EntitiesView per project, keyed on the project's entity version.
+
+    `get` only calls `load` (e.g. building AvailableEntities from the search index) when the
+    project's version has changed since it was cached; least recently used projects are
+    evicted beyond `max_projects`. Unversioned entities are never cached.
+    """
+
+    def __init__(self, max_projects: int = 256):
+        self.max_projects = max_projects
+        self.stats = EntitiesCacheStats()
+        # (version it was cached under, view): the loaded entities may not carry a version themselves
+        self._views: "OrderedDict[str, Tuple[str, EntitiesView]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, project_id: str, version: Optional[str],
+            load: Callable[[], "AvailableEntities | EntitiesView | Dict"]) -> EntitiesView:
+        if version is not None:
+            with self._lock:
+                cached = self._views.get(project_id)
+                if cached is not None and cached[0] == version:
+                    self._views.move_to_end(project_id)
+                    self.stats.hits += 1
+                    return cached[1]
+
+        view = entities_view(load())
+        with self._lock:
+            self.stats.misses += 1
+            if version is not None:
+                self._views[project_id] = (version, view)
+                self._views.move_to_end(project_id)
+                while len(self._views) > self.max_projects:
+                    self._views.popitem(last=False)
+                    self.stats.evictions += 1
+            self.stats.entries = len(self._views)
+        return view
+
+    def invalidate(self, project_id: str) -> None:
+        with self._lock:
+            self._views.pop(project_id, None)
+            self.stats.entries = len(self._views)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._views.clear()
+            self.stats = EntitiesCacheStats()
+
+# Shared by every SearchAPI and extractor in the process unless one is given its own
+ENTITIES_CACHE = AvailableEntitiesCache()
+
+def cached_entities_getter(get_available_entities: Callable[[str], "AvailableEntities | Dict"],
+                           get_version: Callable[[str], Optional[str]],
+                           cache: Optional[AvailableEntitiesCache] = None) -> Callable[[str], EntitiesView]:
+    """Wrap any get_available_entities with the versioned cache, given a cheap version lookup."""
+    cache = cache or ENTITIES_CACHE
+
+    def get_entities(project_id: str) -> EntitiesView:
+        return cache.get(project_id, get_version(project_id), lambda: get_available_entities(project_id))
+
+    return get_entities
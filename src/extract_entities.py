@@ -1,45 +1,152 @@
-import spacy
-from typing import Dict
-from .data_types import ExtractedEntities, EntityExtractionFn
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from .data_types import AvailableEntities, ExtractedEntities, EntityExtractionFn, EntityBatchExtractionFn
+from .entity_index import EntitiesView, EntityIndex, EntityIndexCache, normalise_name
+from .models import MODEL_REGISTRY, ModelRegistry, load_pipeline
 
-def entity_extraction_factory(model_path: str = "./tmp/models/ner_model") -> EntityExtractionFn:
-    """Factory function to create an entity extraction function with a preloaded model."""
-    nlp = spacy.load(model_path)
+# (label, text) for each span recognised by the NER model
+Span = Tuple[str, str]
 
-    def extract_entities_from_query(query: str, available_entities: Dict) -> ExtractedEntities:
+def _load(model_path: str, lean: bool, registry: Optional[ModelRegistry]):
+    if registry is None:
+        return load_pipeline(model_path, "ner", lean=lean)
+    return registry.get(model_path, "ner", lean=lean)
+
+def _resolve(index: EntityIndex, field: str, text: str, scores: Dict[str, float], fuzzy: bool) -> Tuple[str, ...]:
+    """Ids for a span: exact normalised name first, then the closest name within a few typos."""
+    key = normalise_name(text)
+    ids, score = getattr(index, field).get(key, ()), 1.0
+    if not ids and fuzzy:
+        match = index.fuzzy[field].best(key)
+        if match is not None:
+            ids, score = getattr(index, field)[match.name], match.score
+    for entity_id in ids:
+        scores[entity_id] = max(score, scores.get(entity_id, 0.0))
+    return ids
+
+def link_entities(spans: Iterable[Span], index: EntityIndex, fuzzy: bool = True) -> ExtractedEntities:
+    """Resolve recognised spans to project entity ids using the compiled index.
+
+    With `fuzzy`, a span with no exact match (e.g. "Davdi") links to the closest name within
+    one or two edits; its score in `scores` is below 1.0.
+    """
+    contributors = []
+    locations = []
+    cameras = []
+    clip_types = []
+    scores: Dict[str, float] = {}
+
+    for label, text in spans:
+        if label == "CONTRIBUTOR":
+            contributors.extend(_resolve(index, "contributors", text, scores, fuzzy))
+        elif label == "LOCATION":
+            locations.extend(_resolve(index, "locations", text, scores, fuzzy))
+        elif label == "CAMERA":
+            cameras.extend(_resolve(index, "cameras", text, scores, fuzzy))
+        elif label == "CLIP_TYPE":
+            # If a generic term like "clips" is used, include all available clip types
+            if text.lower() == "clips":
+                clip_types.extend(index.clip_types)
+            else:
+                clip_types.append(text.lower())
+
+    # Return extracted entities
+    return ExtractedEntities(
+        entities={
+            "contributors": contributors,
+            "locations": locations,
+            "cameras": cameras,
+            "clip_types": clip_types
+        },
+        scores=scores,
+    )
+
+def entity_extraction_factory(model_path: str = "./tmp/models/ner_model", lean: bool = False,
+                              fuzzy: bool = True,
+                              registry: Optional[ModelRegistry] = MODEL_REGISTRY) -> EntityExtractionFn:
+    """Factory function to create an entity extraction function with a preloaded model.
+
+    The model comes from `registry` (loaded once per process, sharing its Vocab with the intent
+    model); pass None to load a private copy.
+    """
+    nlp = _load(model_path, lean, registry)
+    index_cache = EntityIndexCache()
+
+    def extract_entities_from_query(query: str, available_entities: AvailableEntities | EntitiesView | Dict) -> ExtractedEntities:
         doc = nlp(query)
-        contributors = []
-        locations = []
-        clip_types = []
-
-        # Extract entities using spaCy's NER
-        for ent in doc.ents:
-            if ent.label_ == "CONTRIBUTOR":
-                for contrib_id, contrib_name in available_entities["contributors"].items():
-                    if ent.text.lower() == contrib_name.lower():
-                        contributors.append(contrib_id)
-            elif ent.label_ == "LOCATION":
-                for loc_id, loc_name in available_entities["locations"].items():
-                    if ent.text.lower() == loc_name.lower():
-                        locations.append(loc_id)
-            elif ent.label_ == "CLIP_TYPE":
-                # If a generic term like "clips" is used, include all available clip types
-                if ent.text.lower() == "clips":
-                    clip_types.extend(available_entities["clip_types"])
-                else:
-                    clip_types.append(ent.text.lower())
-
-        # Return extracted entities
-        return ExtractedEntities(
-            entities={
-                "contributors": contributors,
-                "locations": locations,
-                "clip_types": clip_types
-            },
-        )
+        index = index_cache.get(available_entities)
+        return link_entities(((ent.label_, ent.text) for ent in doc.ents), index, fuzzy=fuzzy)
 
     return extract_entities_from_query
 
+# Each worker process loads the NER model once, in the pool initializer
+_worker_nlp = None
+
+def _init_worker(model_path: str, lean: bool, shared: bool) -> None:
+    global _worker_nlp
+    _worker_nlp = _load(model_path, lean, MODEL_REGISTRY if shared else None)
+
+def _recognise_batch(queries: List[str]) -> List[List[Span]]:
+    """Run NER over a batch in a worker, returning only the spans to keep the IPC payload small."""
+    return [[(ent.label_, ent.text) for ent in doc.ents] for doc in _worker_nlp.pipe(queries)]
+
+def batch_entity_extraction_factory(get_available_entities: Callable[[str], AvailableEntities | EntitiesView],
+                                    model_path: str = "./tmp/models/ner_model",
+                                    lean: bool = False,
+                                    fuzzy: bool = True,
+                                    registry: Optional[ModelRegistry] = MODEL_REGISTRY) -> EntityBatchExtractionFn:
+    """Factory function to create a batch entity extraction function over (query, project_id) pairs.
+
+    NER runs in worker processes; linking happens in the calling process against one compiled
+    index per project, so the linking tables are built once and shared by every worker's output.
+    """
+    index_cache = EntityIndexCache()
+    nlp = None
+
+    def recognise_in_process(queries: List[str]) -> List[List[Span]]:
+        nonlocal nlp
+        if nlp is None:
+            nlp = _load(model_path, lean, registry)
+        return [[(ent.label_, ent.text) for ent in doc.ents] for doc in nlp.pipe(queries)]
+
+    def extract_entities_batch(pairs: Iterable[Tuple[str, str]],
+                               batch_size: int = 256,
+                               n_process: int = 1) -> Iterator[ExtractedEntities]:
+        indexes: Dict[str, EntityIndex] = {}
+
+        def index_for(project_id: str) -> EntityIndex:
+            if project_id not in indexes:
+                indexes[project_id] = index_cache.get(get_available_entities(project_id))
+            return indexes[project_id]
+
+        def link_batch(batch: List[Tuple[str, str]], batch_spans: List[List[Span]]) -> Iterator[ExtractedEntities]:
+            for (_, project_id), spans in zip(batch, batch_spans):
+                yield link_entities(spans, index_for(project_id), fuzzy=fuzzy)
+
+        pairs = iter(pairs)
+        batches = iter(lambda: list(islice(pairs, batch_size)), [])
+
+        if n_process == 1:
+            for batch in batches:
+                yield from link_batch(batch, recognise_in_process([query for query, _ in batch]))
+            return
+
+        # Keep a bounded number of batches in flight and yield them back in submission order
+        with ProcessPoolExecutor(max_workers=n_process, initializer=_init_worker, initargs=(model_path, lean, registry is not None)) as pool:
+            in_flight = deque()
+            for batch in batches:
+                in_flight.append((batch, pool.submit(_recognise_batch, [query for query, _ in batch])))
+                if len(in_flight) >= 2 * n_process:
+                    batch, future = in_flight.popleft()
+                    yield from link_batch(batch, future.result())
+            while in_flight:
+                batch, future = in_flight.popleft()
+                yield from link_batch(batch, future.result())
+
+    return extract_entities_batch
+
 # Test function
 if __name__ == "__main__":
     available_entities = {
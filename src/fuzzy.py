@@ -0,0 +1,130 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional
+import numpy as np
+
+# Character n-gram size; one edit changes at most GRAM_SIZE + 1 of a string's n-grams (an
+# adjacent swap touches two characters)
+GRAM_SIZE = 3
+
+class FuzzyMatch(NamedTuple):
+    name: str
+    distance: int
+    # 1.0 for an exact match, falling towards 0.0 as the edit distance approaches the name length
+    score: float
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """Optimal string alignment distance (Levenshtein plus adjacent swaps), capped at max_distance + 1.
+
+    Only a diagonal band of width 2 * max_distance + 1 is computed and the scan stops as soon
+    as every cell in a row exceeds the cap.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    if a == b:
+        return 0
+    over = max_distance + 1
+    previous_previous: Optional[List[int]] = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [over] * (len(b) + 1)
+        current[0] = i
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        row_min = current[0] if low == 1 else over
+        for j in range(low, high + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous_previous is not None and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > max_distance:
+            return over
+        previous_previous, previous = previous, current
+    return min(previous[len(b)], over)
+
+def default_max_distance(text: str) -> int:
+    """Typos tolerated for a span of this length: none for very short names, then one, then two."""
+    if len(text) <= 3:
+        return 0
+    return 1 if len(text) <= 6 else 2
+
+def _grams(text: str) -> List[str]:
+    padded = f"^{text}$"
+    return [padded[i:i + GRAM_SIZE] for i in range(max(1, len(padded) - GRAM_SIZE + 1))]
+
+class FuzzyMatcher:
+    """Typo-tolerant lookup over a fixed set of (already normalised) names.
+
+    Names are indexed by character trigram. A lookup only counts the postings of the query's
+    own trigrams; a name within edit distance d shares at least len(grams) - 4d of them (the
+    q-gram lemma, allowing for swaps), so only those candidates of a compatible length are
+    verified with a banded edit distance. Cost depends on the postings touched, not on the
+    number of names, except for queries so short that the bound is zero: those check every
+    name of a compatible length.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names: List[str] = list(dict.fromkeys(names))
+        self.lengths = np.fromiter((len(name) for name in self.names), dtype=np.int32, count=len(self.names))
+        postings: Dict[str, List[int]] = {}
+        for position, name in enumerate(self.names):
+            for gram in set(_grams(name)):
+                postings.setdefault(gram, []).append(position)
+        self._postings = {gram: np.array(rows, dtype=np.int32) for gram, rows in postings.items()}
+        self._by_length = {
+            int(length): np.flatnonzero(self.lengths == length).astype(np.int32) for length in np.unique(self.lengths)
+        }
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, FuzzyMatcher) and self.names == other.names
+
+    def __repr__(self) -> str:
+        return f"FuzzyMatcher({len(self.names)} names)"
+
+    def best(self, text: str, max_distance: Optional[int] = None) -> Optional[FuzzyMatch]:
+        """Closest name within `max_distance` edits (default by length), or None."""
+        max_distance = default_max_distance(text) if max_distance is None else max_distance
+        grams = set(_grams(text))
+        postings = [self._postings[gram] for gram in grams if gram in self._postings]
+        positions, shared = np.unique(np.concatenate(postings or [np.empty(0, dtype=np.int32)]), return_counts=True)
+        compatible = np.abs(self.lengths[positions] - len(text)) <= max_distance
+        positions, shared = positions[compatible], shared[compatible]
+        # Most shared trigrams first, so a close match is found early and tightens the bound
+        order = np.argsort(-shared, kind="stable")
+        positions, shared = positions[order], shared[order]
+
+        required = len(grams) - (GRAM_SIZE + 1) * max_distance
+        if required > 0:
+            positions = positions[shared >= required]
+        else:
+            # Too short for the lemma to rule anything out: also check names sharing no trigram
+            lengths = range(len(text) - max_distance, len(text) + max_distance + 1)
+            same_length = [self._by_length[length] for length in lengths if length in self._by_length]
+            if same_length:
+                positions = np.concatenate((positions, np.setdiff1d(np.concatenate(same_length), positions)))
+
+        best: Optional[FuzzyMatch] = None
+        for position in positions.tolist():
+            name = self.names[position]
+            limit = max_distance if best is None else best.distance - 1
+            if limit < 0:
+                break
+            distance = edit_distance(text, name, limit)
+            if distance <= limit:
+                best = FuzzyMatch(name, distance, 1.0 - distance / max(len(text), len(name)))
+        return best
+
+def brute_force_best(names: Iterable[str], text: str, max_distance: Optional[int] = None) -> Optional[FuzzyMatch]:
+    """Reference scan: edit distance against every name. Used to check and benchmark FuzzyMatcher."""
+    max_distance = default_max_distance(text) if max_distance is None else max_distance
+    best: Optional[FuzzyMatch] = None
+    for name in names:
+        limit = max_distance if best is None else best.distance - 1
+        if limit < 0:
+            break
+        distance = edit_distance(text, name, limit)
+        if distance <= limit:
+            best = FuzzyMatch(name, distance, 1.0 - distance / max(len(text), len(name)))
+    return best
@@ -1,11 +1,24 @@
-import spacy
+import numpy as np
 from datetime import datetime
-from src.data_types import AgentType, AgentResult, IntentFn
+from typing import Iterable, Optional
+from src.data_types import AgentType, AgentResult, AgentScores, IntentFn, IntentBatchFn
+from src.models import MODEL_REGISTRY, ModelRegistry, load_pipeline
+
+def _load(model_path: str, lean: bool, registry: Optional[ModelRegistry]):
+    if registry is None:
+        return load_pipeline(model_path, "textcat_multilabel", lean=lean)
+    return registry.get(model_path, "textcat_multilabel", lean=lean)
 
 def intent_recognition(model_path: str = "./tmp/models/agent_model", 
-                          confidence_threshold: float = 0.6) -> IntentFn:
-    """Factory function to create a detect_agent function with preloaded model and threshold."""
-    nlp = spacy.load(model_path)
+                          confidence_threshold: float = 0.6,
+                          lean: bool = False,
+                          registry: Optional[ModelRegistry] = MODEL_REGISTRY) -> IntentFn:
+    """Factory function to create a detect_agent function with preloaded model and threshold.
+
+    The model comes from `registry` (loaded once per process, sharing its Vocab with the NER
+    model); pass None to load a private copy.
+    """
+    nlp = _load(model_path, lean, registry)
     
     def detect_agent(text: str) -> AgentResult:
         """Detect which agent should handle the query and return an AgentResult."""
@@ -33,3 +46,37 @@ def intent_recognition(model_path: str = "./tmp/models/agent_model",
         )
     
     return detect_agent
+
+def batch_intent_recognition(model_path: str = "./tmp/models/agent_model",
+                             confidence_threshold: float = 0.6,
+                             lean: bool = False,
+                             registry: Optional[ModelRegistry] = MODEL_REGISTRY) -> IntentBatchFn:
+    """Factory function to create a detect_agents_batch function that scores many queries per call."""
+    nlp = _load(model_path, lean, registry)
+    labels = list(nlp.get_pipe("textcat_multilabel").labels) if "textcat_multilabel" in nlp.pipe_names else []
+
+    # Only the text categorizer (and a shared tok2vec it listens to) affect doc.cats
+    needed = {"textcat_multilabel"}
+    if "tok2vec" in nlp.pipe_names and "textcat_multilabel" in nlp.get_pipe("tok2vec").listening_components:
+        needed.add("tok2vec")
+    unused = [name for name in nlp.pipe_names if name not in needed]
+
+    def detect_agents_batch(texts: Iterable[str], batch_size: int = 256, n_process: int = 1) -> AgentScores:
+        """Score queries through nlp.pipe, keeping results in input order in a float32 array."""
+        texts = list(texts)
+        scores = np.zeros((len(texts), len(labels)), dtype=np.float32)
+
+        docs = nlp.pipe(texts, batch_size=batch_size, n_process=n_process, disable=unused)
+        for row, doc in enumerate(docs):
+            cats = doc.cats
+            scores[row] = [cats[label] for label in labels]
+
+        return AgentScores(
+            texts=texts,
+            labels=labels,
+            scores=scores,
+            confidence_threshold=confidence_threshold,
+            timestamp=datetime.now()
+        )
+
+    return detect_agents_batch
@@ -0,0 +1,137 @@
+import json
+import math
+import re
+from collections import deque
+from typing import Callable, Deque, List, Optional
+from .data_types import ConversationMemory, LLMResponse, TVResponse
+from .stream_json import ANSWER_KEY
+
+Turn = LLMResponse | TVResponse
+TokenCounter = Callable[[str], int]
+
+# Longest query or answer excerpt kept in a summary line
+SUMMARY_EXCERPT_CHARS = 160
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English); no tokenizer needed."""
+    return math.ceil(len(text) / 4)
+
+def answer_text(turn: Turn) -> str:
+    """The answer a turn gave, without the JSON envelope the model was asked to wrap it in."""
+    raw = turn.raw_response
+    if isinstance(raw, dict):
+        answer = raw.get(ANSWER_KEY)
+        return answer if isinstance(answer, str) else json.dumps(raw)
+    return raw
+
+def format_turn(turn: Turn) -> str:
+    return f"User: {turn.request.query}\nAssistant: {answer_text(turn)}"
+
+def _excerpt(text: str) -> str:
+    text = " ".join(text.split())
+    text = _SENTENCE_END.split(text, maxsplit=1)[0]
+    return text if len(text) <= SUMMARY_EXCERPT_CHARS else text[:SUMMARY_EXCERPT_CHARS - 3].rstrip() + "..."
+
+def summarise_turn(turn: Turn) -> str:
+    """Extractive one-line summary: the query and the first sentence of the answer."""
+    return f"- {_excerpt(turn.request.query)} -> {_excerpt(answer_text(turn))}"
+
+class ConversationMemoryManager:
+    """Keeps a ConversationMemory within a token budget as turns are appended.
+
+    Each turn is counted once, when it is appended, and the running total is adjusted as turns
+    enter and leave, so nothing is ever recounted. Once the total passes `budget_tokens` the
+    oldest turns are evicted and replaced by a one-line summary each (`summarise_turn`); the
+    summary itself is capped at `summary_budget_tokens` by dropping its oldest lines. The most
+    recent `min_turns` turns are always kept verbatim. `context()` renders the summary and the
+    kept turns, so the prompt it feeds stays bounded however long the conversation runs.
+    """
+
+    def __init__(self, memory: Optional[ConversationMemory] = None,
+                 budget_tokens: Optional[int] = None,
+                 summary_budget_tokens: Optional[int] = None,
+                 count_tokens: TokenCounter = estimate_tokens,
+                 summarise: Callable[[Turn], str] = summarise_turn,
+                 min_turns: int = 1,
+                 on_append: Optional[Callable[[Turn], None]] = None):
+        self.memory = memory if memory is not None else ConversationMemory(history=[])
+        self.budget_tokens = budget_tokens or self.memory.token_limit
+        self.summary_budget_tokens = (self.budget_tokens // 8 if summary_budget_tokens is None
+                                      else summary_budget_tokens)
+        self.count_tokens = count_tokens
+        self.summarise = summarise
+        self.min_turns = min_turns
+        # Called with every appended turn, e.g. to persist it (see conversation_store)
+        self.on_append = on_append
+        self.evicted = 0
+
+        # Rendered text of each kept turn and each summary line, so context() only joins strings
+        self._texts: Deque[str] = deque(format_turn(turn) for turn in self.memory.history)
+        if len(self.memory.turn_tokens) != len(self.memory.history):
+            # Loaded without accounting (or with a different history): count it once here
+            self.memory.turn_tokens = [self.count_tokens(text) for text in self._texts]
+        self._summary_tokens: Deque[int] = deque(self.count_tokens(line) for line in self.memory.summary)
+        self.memory.summary_tokens = sum(self._summary_tokens)
+        self.memory.token_count = sum(self.memory.turn_tokens) + self.memory.summary_tokens
+        self._enforce_budget()
+
+    def __len__(self) -> int:
+        return len(self.memory.history)
+
+    @property
+    def token_count(self) -> int:
+        return self.memory.token_count
+
+    def append(self, turn: Turn) -> int:
+        """Record a finished turn, evicting older ones if over budget; returns the new token count."""
+        text = format_turn(turn)
+        tokens = self.count_tokens(text)
+        self.memory.history.append(turn)
+        self.memory.turn_tokens.append(tokens)
+        self._texts.append(text)
+        self.memory.token_count += tokens
+        if self.on_append is not None:
+            self.on_append(turn)
+        self._enforce_budget()
+        return self.memory.token_count
+
+    def _enforce_budget(self) -> None:
+        memory = self.memory
+        evict = 0
+        while memory.token_count > self.budget_tokens and len(memory.history) - evict > self.min_turns:
+            turn = memory.history[evict]
+            memory.token_count -= memory.turn_tokens[evict]
+            self._texts.popleft()
+            self._add_summary_line(self.summarise(turn))
+            evict += 1
+        if evict:
+            # One slice per append rather than a pop(0) per evicted turn
+            del memory.history[:evict]
+            del memory.turn_tokens[:evict]
+            self.evicted += evict
+
+    def _add_summary_line(self, line: str) -> None:
+        memory = self.memory
+        tokens = self.count_tokens(line)
+        memory.summary.append(line)
+        self._summary_tokens.append(tokens)
+        memory.summary_tokens += tokens
+        memory.token_count += tokens
+        drop = 0
+        while memory.summary_tokens > self.summary_budget_tokens and self._summary_tokens:
+            dropped = self._summary_tokens.popleft()
+            memory.summary_tokens -= dropped
+            memory.token_count -= dropped
+            drop += 1
+        if drop:
+            del memory.summary[:drop]
+
+    def context(self) -> str:
+        """Summary of evicted turns followed by the kept turns, oldest first."""
+        parts: List[str] = []
+        if self.memory.summary:
+            parts.append("Earlier in this conversation:\n" + "\n".join(self.memory.summary))
+        parts.extend(self._texts)
+        return "\n\n".join(parts)
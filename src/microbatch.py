@@ -0,0 +1,121 @@
+import asyncio
+from concurrent.futures import Executor
+from typing import Any, Callable, Generic, List, Optional, Tuple, TypeVar
+from .data_types import AgentResult, ExtractedEntities, IntentBatchFn, EntityBatchExtractionFn
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+class MicroBatcher(Generic[T, R]):
+    """Async front for a synchronous batch function.
+
+    Concurrent `submit` calls are collected for up to `max_wait_ms` (or until `max_batch_size`
+    items are waiting), run as one `batch_fn` call in an executor so the event loop is never
+    blocked, and each caller's future is resolved with its own result. `batch_fn` must return
+    one result per input, in order; otherwise every caller in the batch gets a ValueError.
+    `aclose` fails any caller still waiting with a RuntimeError.
+    """
+
+    def __init__(self,
+                 batch_fn: Callable[[List[T]], List[R]],
+                 max_batch_size: int = 64,
+                 max_wait_ms: float = 5.0,
+                 executor: Optional[Executor] = None):
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.executor = executor
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        # The batch being collected or run, so aclose can fail its callers
+        self._batch: List[Tuple[T, asyncio.Future]] = []
+
+    def _ensure_worker(self) -> asyncio.Queue:
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.get_running_loop().create_task(self._run())
+        return self._queue
+
+    async def submit(self, item: T) -> R:
+        future = asyncio.get_running_loop().create_future()
+        self._ensure_worker().put_nowait((item, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[T, asyncio.Future]]:
+        self._batch = batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        # Anything else already queued rides along for free
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [(item, future) for item, future in batch if not future.cancelled()]
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(self.executor, self.batch_fn, [item for item, _ in batch])
+                if len(results) != len(batch):
+                    raise ValueError(f"batch_fn returned {len(results)} results for {len(batch)} inputs")
+            except Exception as e:
+                self._fail(batch, e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+            self._batch = []
+
+    @staticmethod
+    def _fail(batch: List[Tuple[T, asyncio.Future]], error: Exception) -> None:
+        for _, future in batch:
+            if not future.done():
+                future.set_exception(error)
+
+    async def aclose(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        pending = self._batch
+        while self._queue is not None and not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        self._fail(pending, RuntimeError("MicroBatcher was closed before this item ran"))
+        self._batch = []
+
+def create_async_intent(detect_agents_batch: IntentBatchFn, **settings) -> Callable[[str], Any]:
+    """Async detect_agent that micro-batches concurrent queries through detect_agents_batch."""
+    batcher: MicroBatcher[str, AgentResult] = MicroBatcher(
+        lambda texts: detect_agents_batch(texts).to_agent_results(), **settings
+    )
+
+    async def detect_agent_async(text: str) -> AgentResult:
+        return await batcher.submit(text)
+
+    detect_agent_async.batcher = batcher
+    return detect_agent_async
+
+def create_async_entity_extraction(extract_entities_batch: EntityBatchExtractionFn, **settings) -> Callable[[str, str], Any]:
+    """Async entity extraction over (query, project_id) that micro-batches concurrent callers."""
+    batcher: MicroBatcher[Tuple[str, str], ExtractedEntities] = MicroBatcher(
+        lambda pairs: list(extract_entities_batch(pairs, batch_size=len(pairs))), **settings
+    )
+
+    async def extract_entities_async(query: str, project_id: str) -> ExtractedEntities:
+        return await batcher.submit((query, project_id))
+
+    extract_entities_async.batcher = batcher
+    return extract_entities_async
@@ -0,0 +1,224 @@
+import hashlib
+import os
+import threading
+import time
+import spacy
+import srsly
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+from spacy.language import Language
+from spacy.vocab import Vocab
+
+# Bytes hashed from the start, middle and end of a vector table to fingerprint it
+_FINGERPRINT_BLOCK = 1 << 20
+
+def _find_architectures(node: Any) -> Set[str]:
+    """Collect every registered architecture name referenced by a component config."""
+    found = set()
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "@architectures":
+                found.add(value)
+            elif key == "include_static_vectors" and value:
+                found.add("include_static_vectors")
+            else:
+                found |= _find_architectures(value)
+    elif isinstance(node, (list, tuple)):
+        for value in node:
+            found |= _find_architectures(value)
+    return found
+
+def required_pipes(model_path: str, component: str) -> List[str]:
+    """Return the pipes needed to run `component`: itself plus a shared tok2vec it listens to."""
+    config = spacy.util.load_config(Path(model_path) / "config.cfg")
+    pipeline = config["nlp"]["pipeline"]
+    if component not in pipeline:
+        raise ValueError(f"Component '{component}' not found in {model_path} (pipeline: {pipeline})")
+
+    needed = [component]
+    architectures = _find_architectures(config["components"][component])
+    if "tok2vec" in pipeline and any(arch.startswith("spacy.Tok2VecListener") for arch in architectures):
+        needed.insert(0, "tok2vec")
+    return needed
+
+def uses_static_vectors(model_path: str, pipes: List[str]) -> bool:
+    """Check whether any of the given pipes reads the static vector table."""
+    config = spacy.util.load_config(Path(model_path) / "config.cfg")
+    for pipe in pipes:
+        architectures = _find_architectures(config["components"][pipe])
+        if "include_static_vectors" in architectures or any(arch.startswith("spacy.StaticVectors") for arch in architectures):
+            return True
+    return False
+
+def load_pipeline(model_path: str, component: str, lean: bool = False, vocab: Vocab | bool = True) -> Language:
+    """Load a trained pipeline, optionally keeping only what `component` needs at inference time.
+
+    In lean mode every other pipe is excluded (not just disabled), and the vector table is
+    skipped entirely when none of the kept pipes reads static vectors. Given a `vocab`, the
+    pipeline is loaded against it; a vector table it already holds is kept, not reloaded.
+    """
+    exclude = []
+    if lean:
+        config = spacy.util.load_config(Path(model_path) / "config.cfg")
+        keep = required_pipes(model_path, component)
+        exclude = [pipe for pipe in config["nlp"]["pipeline"] if pipe not in keep]
+        if not uses_static_vectors(model_path, keep):
+            exclude.append("vectors")
+    if isinstance(vocab, Vocab) and vocab.vectors.shape[0] and "vectors" not in exclude:
+        exclude.append("vectors")
+    return spacy.load(model_path, vocab=vocab, exclude=exclude)
+
+def _sample_digest(path: Path, digest) -> None:
+    size = path.stat().st_size
+    digest.update(str(size).encode())
+    with open(path, "rb") as f:
+        for offset in sorted({0, max(0, size // 2 - _FINGERPRINT_BLOCK // 2), max(0, size - _FINGERPRINT_BLOCK)}):
+            f.seek(offset)
+            digest.update(f.read(_FINGERPRINT_BLOCK))
+
+def vectors_fingerprint(model_path: str) -> Optional[str]:
+    """Identify a model's static vector table without reading all of it, or None if it has none.
+
+    Hashes the table's shape and name from meta.json and sampled blocks of the key map and
+    vector files, so two models trained from the same base vectors match.
+    """
+    model = Path(model_path)
+    info = srsly.read_json(model / "meta.json").get("vectors") or {}
+    files = [model / "vocab" / "key2row", model / "vocab" / "vectors"]
+    if not info.get("vectors") or not all(path.exists() for path in files):
+        return None
+    digest = hashlib.sha256(srsly.json_dumps(info, sort_keys=True).encode())
+    for path in files:
+        _sample_digest(path, digest)
+    return digest.hexdigest()
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB, or None where /proc is unavailable."""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+class ModelLoadStats(NamedTuple):
+    model_path: str
+    component: str
+    lean: bool
+    shared_vocab: bool
+    load_seconds: float
+    # Growth of this process's RSS across the load; None where it cannot be read
+    rss_delta_mb: Optional[float]
+
+class ModelRegistry:
+    """Loads each pipeline at most once per process, against one shared Vocab.
+
+    The intent and NER models are both trained from en_core_web_lg, so loading them with two
+    `spacy.load` calls holds two copies of the same StringStore and vector table. Pipelines
+    fetched through `get` load on first use and share the first one's Vocab. One whose
+    language differs, or whose static vectors differ and are read by the kept pipes, gets its
+    own Vocab, since sharing would change its predictions.
+    """
+
+    def __init__(self, share_vocab: bool = True):
+        self.share_vocab = share_vocab
+        # Loads are rare and all of them may write to the shared Vocab, so they are serialised
+        self._lock = threading.Lock()
+        self._pipelines: Dict[Tuple[str, str, bool], Language] = {}
+        self._stats: Dict[Tuple[str, str, bool], ModelLoadStats] = {}
+        self._vocab: Optional[Vocab] = None
+        self._lang: Optional[str] = None
+        self._vectors: Optional[str] = None
+
+    def get(self, model_path: str, component: str, lean: bool = False) -> Language:
+        key = (os.path.realpath(model_path), component, lean)
+        nlp = self._pipelines.get(key)
+        if nlp is None:
+            with self._lock:
+                nlp = self._pipelines.get(key)
+                if nlp is None:
+                    nlp = self._load(*key)
+                    self._pipelines[key] = nlp
+        return nlp
+
+    def _load(self, model_path: str, component: str, lean: bool) -> Language:
+        lang = srsly.read_json(Path(model_path) / "meta.json").get("lang")
+        vectors = vectors_fingerprint(model_path)
+        if vectors is not None and lean and not uses_static_vectors(model_path, required_pipes(model_path, component)):
+            # The lean load skips the table, so any shared one is as good as none
+            vectors = None
+        shared = self.share_vocab and (self._vocab is None or (
+            lang == self._lang and (vectors is None or self._vectors in (None, vectors))))
+
+        rss_before = current_rss_mb()
+        start = time.perf_counter()
+        nlp = load_pipeline(model_path, component, lean=lean, vocab=self._vocab if shared and self._vocab is not None else True)
+        load_seconds = time.perf_counter() - start
+        rss_after = current_rss_mb()
+
+        if shared:
+            if self._vocab is None:
+                self._vocab, self._lang = nlp.vocab, lang
+            if vectors is not None:
+                self._vectors = vectors
+        self._stats[(model_path, component, lean)] = ModelLoadStats(
+            model_path=model_path,
+            component=component,
+            lean=lean,
+            shared_vocab=shared,
+            load_seconds=round(load_seconds, 4),
+            rss_delta_mb=None if rss_before is None else round(rss_after - rss_before, 1),
+        )
+        return nlp
+
+    @property
+    def vocab(self) -> Optional[Vocab]:
+        return self._vocab
+
+    def stats(self) -> List[ModelLoadStats]:
+        """One entry per loaded pipeline, in load order."""
+        with self._lock:
+            return list(self._stats.values())
+
+    def clear(self) -> None:
+        """Forget every pipeline and the shared Vocab; the next `get` loads from disk again."""
+        with self._lock:
+            self._pipelines.clear()
+            self._stats.clear()
+            self._vocab = self._lang = self._vectors = None
+
+# Shared by the intent and entity factories, so a process holds one copy of the Vocab
+MODEL_REGISTRY = ModelRegistry()
+
+def export_lean_model(model_path: str,
+                      output_path: str,
+                      component: str,
+                      n_vectors: int = 20000) -> str:
+    """Write a copy of the model with unused pipes removed and the vector table pruned or dropped.
+
+    If the kept pipes use static vectors the table is pruned to the `n_vectors` most frequent
+    rows, with the removed words remapped to their nearest remaining vector. Otherwise it is
+    dropped entirely.
+    """
+    nlp = load_pipeline(model_path, component, lean=True)
+
+    if nlp.vocab.vectors.shape[0] > n_vectors:
+        nlp.vocab.prune_vectors(n_vectors)
+
+    output = Path(output_path)
+    output.mkdir(parents=True, exist_ok=True)
+    nlp.to_disk(output)
+    return str(output)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Export a lean copy of a trained spaCy pipeline.")
+    parser.add_argument("--model-path", type=str, required=True, help="Trained model to export")
+    parser.add_argument("--output-path", type=str, required=True, help="Where to write the lean model")
+    parser.add_argument("--component", type=str, choices=["textcat_multilabel", "ner"], required=True)
+    parser.add_argument("--n-vectors", type=int, default=20000, help="Rows to keep if the vectors are needed")
+    args = parser.parse_args()
+
+    output = export_lean_model(args.model_path, args.output_path, args.component, args.n_vectors)
+    print(f"Lean model saved to {output}")
@@ -1,53 +1,254 @@
+import asyncio
 import datetime
-from typing import AsyncIterator, Callable
+from typing import Any, AsyncIterator, Callable, Dict, Optional
 import aiohttp
 import json
-from .data_types import LLMGenerateFn, TVRequest, TVResponse
+from .data_types import GenerationMetrics, LLMGenerateFn, OllamaPoolConfig, TVRequest, TVResponse
+from .metrics import REGISTRY, MetricsRegistry, percentile
+from .stream_json import AnswerStreamParser
 import time
 import logging
 
 async def make_ollama_request(
-    url: str, 
-    model_name: str, 
+    url: str,
+    model_name: str,
     prompt: str,
-    on_chunk: Callable[[str], None]
+    on_chunk: Callable[[str], None],
+    session: Optional[aiohttp.ClientSession] = None,
+    system: Optional[str] = None,
+    keep_alive: Optional[str] = None,
+    options: Optional[Dict[str, Any]] = None,
+    on_done: Optional[Callable[[Dict[str, Any]], None]] = None,
+    on_response: Optional[Callable[[], None]] = None
 ) -> AsyncIterator[str]:
-    """Helper function to make requests to Ollama API"""
-    async with aiohttp.ClientSession() as session:
-        async with session.post(
-            url,
-            json={"model": model_name, "prompt": prompt, "stream": True}
-        ) as response:
-            if response.status != 200:
-                error_text = await response.text()
-                raise Exception(f"Ollama API error (status {response.status}): {error_text}")
-                
-            async for line in response.content:
-                if line:
-                    data = json.loads(line)
-                    if "response" in data:
-                        chunk = data["response"]
-                        if on_chunk:
-                            on_chunk(chunk)
-                        yield chunk
+    """Helper function to make requests to Ollama API
 
-def create_ollama_client(
-    model_name: str,
-    url: str = "http://localhost:11434/api/generate"
-) -> LLMGenerateFn:
-    """Creates a direct streaming connection to Ollama API"""
-    async def generate_llm_response(
-        llm_request: TVRequest, 
+    Uses the given session when one is provided, otherwise opens a throwaway session for this
+    request only. `on_response` is called once the response headers arrive and `on_done`
+    receives Ollama's final chunk, which carries the prompt evaluation and decoding statistics.
+    """
+    if session is None:
+        async with aiohttp.ClientSession() as own_session:
+            async for chunk in make_ollama_request(url, model_name, prompt, on_chunk, own_session,
+                                                   system, keep_alive, options, on_done, on_response):
+                yield chunk
+        return
+
+    payload = {"model": model_name, "prompt": prompt, "stream": True}
+    if system is not None:
+        payload["system"] = system
+    if keep_alive is not None:
+        payload["keep_alive"] = keep_alive
+    if options:
+        payload["options"] = options
+
+    async with session.post(
+        url,
+        json=payload
+    ) as response:
+        if response.status != 200:
+            error_text = await response.text()
+            raise Exception(f"Ollama API error (status {response.status}): {error_text}")
+        if on_response:
+            on_response()
+
+        async for line in response.content:
+            if line:
+                data = json.loads(line)
+                if "response" in data:
+                    chunk = data["response"]
+                    if on_chunk:
+                        on_chunk(chunk)
+                    yield chunk
+                if data.get("done") and on_done:
+                    on_done(data)
+
+def _describe_metrics(registry: MetricsRegistry) -> None:
+    registry.describe("ollama_generations_total", "counter", "Generations by model and outcome")
+    registry.describe("ollama_generation_seconds", "histogram", "Wall-clock time per generation")
+    registry.describe("ollama_connect_seconds", "histogram", "Time until Ollama's response headers arrived")
+    registry.describe("ollama_time_to_first_token_seconds", "histogram", "Time until the first generated chunk")
+    registry.describe("ollama_inter_token_seconds", "histogram", "Gap between consecutive generated chunks")
+    registry.describe("ollama_tokens_per_second", "histogram", "Decode throughput per generation",
+                      buckets=(1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 400))
+    registry.describe("ollama_prompt_eval_seconds", "histogram", "Prompt prefill time reported by Ollama")
+    registry.describe("ollama_load_seconds", "histogram", "Model load time reported by Ollama")
+    registry.describe("ollama_prompt_tokens_total", "counter", "Prompt tokens evaluated by Ollama")
+    registry.describe("ollama_generated_tokens_total", "counter", "Tokens generated by Ollama")
+
+class _GenerationTimer:
+    """Collects timestamps for one generation and turns them into GenerationMetrics."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.response_at: Optional[float] = None
+        self.chunk_times: list[float] = []
+        self.final: Dict[str, Any] = {}
+
+    def on_response(self) -> None:
+        self.response_at = time.perf_counter()
+
+    def on_chunk(self) -> None:
+        self.chunk_times.append(time.perf_counter())
+
+    def to_metrics(self) -> GenerationMetrics:
+        gaps = [later - earlier for earlier, later in zip(self.chunk_times, self.chunk_times[1:])]
+        seconds = lambda key: self.final[key] / 1e9 if key in self.final else None
+
+        eval_count, eval_seconds = self.final.get("eval_count"), seconds("eval_duration")
+        if eval_count and eval_seconds:
+            tokens_per_second = eval_count / eval_seconds
+        elif len(self.chunk_times) > 1:
+            tokens_per_second = (len(self.chunk_times) - 1) / (self.chunk_times[-1] - self.chunk_times[0])
+        else:
+            tokens_per_second = None
+
+        return GenerationMetrics(
+            connect_seconds=self.response_at - self.start if self.response_at else None,
+            time_to_first_token=self.chunk_times[0] - self.start if self.chunk_times else None,
+            inter_token_p50=percentile(gaps, 50),
+            inter_token_p95=percentile(gaps, 95),
+            inter_token_p99=percentile(gaps, 99),
+            chunk_count=len(self.chunk_times),
+            tokens_per_second=tokens_per_second,
+            prompt_eval_count=self.final.get("prompt_eval_count"),
+            prompt_eval_seconds=seconds("prompt_eval_duration"),
+            eval_count=eval_count,
+            eval_seconds=eval_seconds,
+            load_seconds=seconds("load_duration"),
+            total_seconds=seconds("total_duration"),
+        )
+
+    def record(self, registry: MetricsRegistry, model_name: str, metrics: GenerationMetrics, status: str) -> None:
+        labels = {"model": model_name}
+        registry.inc("ollama_generations_total", labels={**labels, "status": status})
+        registry.observe("ollama_generation_seconds", time.perf_counter() - self.start, labels)
+        for name, value in (("ollama_connect_seconds", metrics.connect_seconds),
+                            ("ollama_time_to_first_token_seconds", metrics.time_to_first_token),
+                            ("ollama_tokens_per_second", metrics.tokens_per_second),
+                            ("ollama_prompt_eval_seconds", metrics.prompt_eval_seconds),
+                            ("ollama_load_seconds", metrics.load_seconds)):
+            if value is not None:
+                registry.observe(name, value, labels)
+        for earlier, later in zip(self.chunk_times, self.chunk_times[1:]):
+            registry.observe("ollama_inter_token_seconds", later - earlier, labels)
+        if metrics.prompt_eval_count:
+            registry.inc("ollama_prompt_tokens_total", metrics.prompt_eval_count, labels)
+        if metrics.eval_count:
+            registry.inc("ollama_generated_tokens_total", metrics.eval_count, labels)
+
+class OllamaClient:
+    """Streaming Ollama client that owns a long-lived, pooled aiohttp session.
+
+    Call it like the function returned by create_ollama_client always was. The session is
+    created lazily on first use and reused by every generation until `aclose()` is awaited
+    (or the client is used as an async context manager).
+
+    With `stream_answer` set, JSON generations pass `on_chunk` the decoded text of the answer
+    field as it streams in, rather than raw JSON fragments.
+
+    Requests that carry a `system` prompt send it separately from the per-query prompt. Ollama
+    reuses the evaluated context of the longest matching prompt prefix while the model stays
+    loaded, so with a fixed system prompt and `keep_alive` set, prefill only covers the query.
+    """
+
+    def __init__(self,
+                 model_name: str,
+                 url: str,
+                 pool: OllamaPoolConfig,
+                 stream_answer: bool = True,
+                 keep_alive: Optional[str] = None,
+                 registry: Optional[MetricsRegistry] = None):
+        self.model_name = model_name
+        self.url = url
+        self.pool = pool
+        self.stream_answer = stream_answer
+        self.keep_alive = keep_alive
+        self.registry = registry or REGISTRY
+        _describe_metrics(self.registry)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is not None and not self._session.closed:
+            return self._session
+        async with self._session_lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool.limit,
+                    limit_per_host=self.pool.limit_per_host,
+                    keepalive_timeout=self.pool.keepalive_timeout,
+                    ttl_dns_cache=self.pool.ttl_dns_cache,
+                )
+                timeout = aiohttp.ClientTimeout(
+                    total=self.pool.total_timeout,
+                    connect=self.pool.connect_timeout,
+                    sock_read=self.pool.read_timeout,
+                )
+                self._session = aiohttp.ClientSession(connector=connector, timeout=timeout)
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the pooled session and its connections."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    async def __aenter__(self) -> "OllamaClient":
+        await self._get_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def warm_prefix(self, system: str) -> Dict[str, Any]:
+        """Evaluate a system prompt once so later generations that share it skip its prefill.
+
+        Returns Ollama's final-chunk statistics for the warm-up request.
+        """
+        stats: Dict[str, Any] = {}
+        session = await self._get_session()
+        async for _ in make_ollama_request(self.url, self.model_name, ".", None, session,
+                                           system=system, keep_alive=self.keep_alive,
+                                           options={"num_predict": 1}, on_done=stats.update):
+            pass
+        return stats
+
+    async def __call__(
+        self,
+        llm_request: TVRequest,
         on_chunk: Callable[[str], None] = None,
         json_response: bool = True
     ) -> TVResponse:
         start_time = time.time()
         chunks = []
-        
+        timer = _GenerationTimer()
+        status = "ok"
+
+        parser = None
+        emit = on_chunk
+        if on_chunk and json_response and self.stream_answer:
+            parser = AnswerStreamParser()
+
+            def emit(chunk: str) -> None:
+                delta = parser.feed(chunk)
+                if delta:
+                    on_chunk(delta)
+
         try:
-            async for chunk in make_ollama_request(url, model_name, llm_request.prompt, on_chunk):
+            session = await self._get_session()
+            async for chunk in make_ollama_request(self.url, self.model_name, llm_request.prompt, emit, session,
+                                                   system=llm_request.system, keep_alive=self.keep_alive,
+                                                   on_done=timer.final.update, on_response=timer.on_response):
+                if chunk:
+                    timer.on_chunk()
                 chunks.append(chunk)
-            
+
+            if parser is not None:
+                remainder = parser.finish()
+                if remainder:
+                    on_chunk(remainder)
+
             response = ''.join(chunks)
 
             if json_response and response.strip():
@@ -58,14 +259,28 @@ def create_ollama_client(
 
         except Exception as e:
             response = {"error": str(e)}
+            status = "error"
+
+        metrics = timer.to_metrics()
+        timer.record(self.registry, self.model_name, metrics, status)
 
         return TVResponse(
             generated_at=datetime.datetime.now().isoformat(),
             request=llm_request,
             raw_response=response,
             time_in_seconds=round(time.time() - start_time, 2),
-            model_name=model_name,
-            model_provider="ollama"
+            model_name=self.model_name,
+            model_provider="ollama",
+            metrics=metrics
         )
-    
-    return generate_llm_response
+
+def create_ollama_client(
+    model_name: str,
+    url: str = "http://localhost:11434/api/generate",
+    pool: Optional[OllamaPoolConfig] = None,
+    stream_answer: bool = True,
+    keep_alive: Optional[str] = None,
+    registry: Optional[MetricsRegistry] = None
+) -> OllamaClient:
+    """Creates a direct streaming connection to Ollama API over a shared connection pool"""
+    return OllamaClient(model_name, url, pool or OllamaPoolConfig(), stream_answer, keep_alive, registry)
@@ -1,12 +1,17 @@
 import json
 
+# Bump whenever TV_PROMPT or RESPONSE_FORMAT changes so cached generations are not reused
+PROMPT_VERSION = "1"
+
 # Define the response format with only the "Answer" field.
 RESPONSE_FORMAT = {
     "Answer": ""
 }
 
-# Improved Prompt Template with Enhanced Standardized Structure
-TV_PROMPT = """You are interacting with a fine-tuned LLaMA 3.2 3B Instruct model, an expert in all things post-production for film and television. This model specializes in:
+# Improved Prompt Template with Enhanced Standardized Structure.
+# The static preamble is kept separate so it can be sent as the system prompt and its
+# evaluated context reused across generations; only TV_USER_PROMPT changes per query.
+TV_SYSTEM_PROMPT = """You are interacting with a fine-tuned LLaMA 3.2 3B Instruct model, an expert in all things post-production for film and television. This model specializes in:
 
 - Codec workflows
 - Editing techniques
@@ -69,12 +74,21 @@ You MUST explain the WHY behind the recommendations, supported by technical reas
 
 ---
 
-**Query:** {query}
+"""
+
+TV_USER_PROMPT = """**Query:** {query}
 
 Provide your response in the following JSON format:
 {response_format}
 """
 
+TV_CONTEXT_PROMPT = """**Conversation so far:**
+{context}
+
+"""
+
+TV_PROMPT = TV_SYSTEM_PROMPT + TV_USER_PROMPT
+
 # Function to create a formatted prompt
 def create_prompt(query: str) -> str:
     """Create a formatted prompt with only the query."""
@@ -82,3 +96,17 @@ def create_prompt(query: str) -> str:
         query=query,
         response_format=json.dumps(RESPONSE_FORMAT, indent=2)
     )
+
+def create_prompt_parts(query: str, context: str | None = None) -> tuple[str, str]:
+    """Create the (system, user) halves of the prompt; joined they equal create_prompt(query).
+
+    `context` (earlier turns of the conversation) goes in the user half, after the system
+    prompt, so the system prompt's evaluated prefix is still reused.
+    """
+    user = TV_USER_PROMPT.format(
+        query=query,
+        response_format=json.dumps(RESPONSE_FORMAT, indent=2)
+    )
+    if context:
+        user = TV_CONTEXT_PROMPT.format(context=context) + user
+    return TV_SYSTEM_PROMPT, user
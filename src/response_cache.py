@@ -0,0 +1,191 @@
+import asyncio
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Optional
+from .data_types import ResponseCacheStats, TVRequest, TVResponse
+from .prompt import PROMPT_VERSION
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!]+$")
+
+def normalise_query(query: str) -> str:
+    """Fold case, unicode forms, whitespace and trailing punctuation so trivially different
+    phrasings of the same question share a cache entry."""
+    query = unicodedata.normalize("NFKC", query).casefold()
+    query = _WHITESPACE.sub(" ", query).strip()
+    return _TRAILING_PUNCTUATION.sub("", query)
+
+def cache_key(model_name: str, query: str, json_response: bool, prompt_version: str = PROMPT_VERSION,
+              context: Optional[str] = None) -> str:
+    """Key for one question; a follow-up asked with conversation `context` only matches the same context."""
+    parts = [model_name, prompt_version, normalise_query(query), json_response]
+    if context:
+        parts.append(hashlib.sha256(context.encode("utf-8")).hexdigest())
+    payload = json.dumps(parts)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class CachedLLMClient:
+    """Disk-backed cache in front of an LLM client such as the one from create_ollama_client.
+
+    Each entry is one JSON file holding the serialised TVResponse plus the chunks that were
+    streamed to on_chunk, so a hit replays the same stream. Entries expire after `ttl_seconds`
+    and the least recently used are evicted once `max_entries` or `max_bytes` is exceeded.
+    Error responses, and answers the client could not parse as JSON, are never cached.
+    Reads, writes and evictions run in the default executor so a slow disk never blocks the
+    event loop.
+    """
+
+    def __init__(self,
+                 client: Callable,
+                 cache_dir: str,
+                 model_name: Optional[str] = None,
+                 max_entries: int = 10000,
+                 max_bytes: int = 256 * 1024 * 1024,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.client = client
+        self.model_name = model_name or getattr(client, "model_name")
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.stats = ResponseCacheStats()
+        # key -> size in bytes, ordered least to most recently used
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        # Guards _entries and stats: reads and writes run on executor threads
+        self._lock = threading.Lock()
+        self._load_index()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU order from disk; file mtimes record the last time each entry was used."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        found = []
+        for path in self.cache_dir.glob("*.json"):
+            stat = path.stat()
+            found.append((stat.st_mtime, path.stem, stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.stats.size_bytes += size
+        self.stats.entries = len(self._entries)
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        size = self._entries.pop(key)
+        self.stats.size_bytes -= size
+        self.stats.entries = len(self._entries)
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def _evict(self) -> None:
+        while self._entries and (len(self._entries) > self.max_entries or self.stats.size_bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def _read(self, key: str) -> Optional[dict]:
+        with self._lock:
+            if key not in self._entries:
+                return None
+            try:
+                with open(self._path(key), "r") as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._remove(key)
+                return None
+
+            if self.ttl_seconds is not None and time.time() - entry["created_at"] > self.ttl_seconds:
+                self._remove(key)
+                self.stats.expirations += 1
+                return None
+
+            self._entries.move_to_end(key)
+            os.utime(self._path(key))
+            return entry
+
+    def _write(self, key: str, response: TVResponse, chunks: list[str]) -> None:
+        entry = {"created_at": time.time(), "chunks": chunks, "response": response.model_dump(mode="json")}
+        data = json.dumps(entry).encode("utf-8")
+        with self._lock:
+            tmp_path = self._path(key).with_suffix(".tmp")
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, self._path(key))
+
+            self.stats.size_bytes += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self.stats.entries = len(self._entries)
+            self._evict()
+
+    async def __call__(self,
+                       llm_request: TVRequest,
+                       on_chunk: Callable[[str], None] = None,
+                       json_response: bool = True) -> TVResponse:
+        start_time = time.perf_counter()
+        key = cache_key(self.model_name, llm_request.query, json_response, context=llm_request.context)
+
+        loop = asyncio.get_running_loop()
+        entry = await loop.run_in_executor(None, self._read, key)
+        if entry is not None:
+            if on_chunk:
+                for chunk in entry["chunks"]:
+                    on_chunk(chunk)
+            elapsed = time.perf_counter() - start_time
+            self.stats.hits += 1
+            self.stats.hit_seconds_total += elapsed
+            return TVResponse.model_validate({
+                **entry["response"],
+                "request": llm_request.model_dump(),
+                "time_in_seconds": round(elapsed, 2),
+                # The stored metrics describe the original generation, not this replay
+                "metrics": None,
+            })
+
+        chunks = []
+
+        def record(chunk: str) -> None:
+            chunks.append(chunk)
+            if on_chunk:
+                on_chunk(chunk)
+
+        response = await self.client(llm_request, on_chunk=record, json_response=json_response)
+        self.stats.misses += 1
+        self.stats.miss_seconds_total += time.perf_counter() - start_time
+
+        # The Ollama client reports failures as {"error": ...} and unparseable JSON as {"raw_text": ...}
+        if not (isinstance(response.raw_response, dict) and ("error" in response.raw_response
+                                                             or "raw_text" in response.raw_response)):
+            await loop.run_in_executor(None, self._write, key, response, chunks)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            for key in list(self._entries):
+                self._remove(key)
+
+    async def aclose(self) -> None:
+        if hasattr(self.client, "aclose"):
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "CachedLLMClient":
+        if hasattr(self.client, "__aenter__"):
+            await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+def create_cached_client(client: Callable,
+                         cache_dir: str = "./tmp/response_cache",
+                         **settings) -> CachedLLMClient:
+    """Wrap an LLM client so repeated (normalised) questions are answered from disk."""
+    return CachedLLMClient(client, cache_dir, **settings)
@@ -0,0 +1,191 @@
+import asyncio
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Optional
+from .data_types import QueueFullError, QueueTimeoutError, RequestPriority, TVRequest, TVResponse
+from .metrics import REGISTRY, MetricsRegistry
+
+# How many interactive grants are made for each batch grant while both classes are waiting
+DEFAULT_WEIGHTS = {RequestPriority.INTERACTIVE: 4, RequestPriority.BATCH: 1}
+
+class _Waiter:
+    __slots__ = ("future", "priority", "tenant")
+
+    def __init__(self, future: asyncio.Future, priority: RequestPriority, tenant: str):
+        self.future = future
+        self.priority = priority
+        self.tenant = tenant
+
+class LLMScheduler:
+    """Admission control in front of one model's LLM client.
+
+    At most `max_in_flight` generations run at once. Callers beyond that wait in a queue split
+    by priority class and, within a class, by tenant: classes are served by weighted round
+    robin (so batch work is slowed down but never starved) and tenants within a class take
+    turns. Callers that wait longer than `queue_timeout` get a QueueTimeoutError, and new
+    callers are rejected with QueueFullError once `max_queue` are already waiting.
+    """
+
+    def __init__(self,
+                 client: Callable,
+                 max_in_flight: int = 2,
+                 max_queue: int = 256,
+                 queue_timeout: Optional[float] = 30.0,
+                 weights: Optional[Dict[RequestPriority, int]] = None,
+                 model_name: Optional[str] = None,
+                 registry: Optional[MetricsRegistry] = None):
+        self.client = client
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.weights = {priority: max(1, weight) for priority, weight in (weights or DEFAULT_WEIGHTS).items()}
+        self.model_name = model_name or getattr(client, "model_name", "unknown")
+        self.registry = registry or REGISTRY
+        self.in_flight = 0
+        self._queues: Dict[RequestPriority, "OrderedDict[str, Deque[_Waiter]]"] = {
+            priority: OrderedDict() for priority in RequestPriority
+        }
+        self._depth = {priority: 0 for priority in RequestPriority}
+        self._credits = dict(self.weights)
+
+        self.registry.describe("llm_queue_depth", "gauge", "Requests waiting for a generation slot")
+        self.registry.describe("llm_in_flight", "gauge", "Generations currently running")
+        self.registry.describe("llm_queue_wait_seconds", "histogram", "Time spent waiting for a generation slot")
+        self.registry.describe("llm_rejected_total", "counter", "Requests rejected by admission control")
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(self._depth.values())
+
+    def _labels(self, priority: RequestPriority) -> Dict[str, str]:
+        return {"model": self.model_name, "priority": str(priority)}
+
+    def _publish(self) -> None:
+        for priority, depth in self._depth.items():
+            self.registry.set("llm_queue_depth", depth, self._labels(priority))
+        self.registry.set("llm_in_flight", self.in_flight, {"model": self.model_name})
+
+    def _enqueue(self, waiter: _Waiter) -> None:
+        self._queues[waiter.priority].setdefault(waiter.tenant, deque()).append(waiter)
+        self._depth[waiter.priority] += 1
+
+    def _discard(self, waiter: _Waiter) -> None:
+        tenants = self._queues[waiter.priority]
+        queue = tenants.get(waiter.tenant)
+        if queue is not None and waiter in queue:
+            queue.remove(waiter)
+            self._depth[waiter.priority] -= 1
+            if not queue:
+                del tenants[waiter.tenant]
+
+    def _next_priority(self) -> Optional[RequestPriority]:
+        waiting = [priority for priority in RequestPriority if self._depth[priority]]
+        if not waiting:
+            return None
+        if len(waiting) == 1:
+            return waiting[0]
+        for priority in waiting:
+            if self._credits[priority] > 0:
+                self._credits[priority] -= 1
+                return priority
+        # Every waiting class has used its share of this round; start a new one
+        self._credits = dict(self.weights)
+        return self._next_priority()
+
+    def _pop_next(self) -> Optional[_Waiter]:
+        priority = self._next_priority()
+        if priority is None:
+            return None
+        tenants = self._queues[priority]
+        tenant, queue = next(iter(tenants.items()))
+        waiter = queue.popleft()
+        self._depth[priority] -= 1
+        # Rotate the tenant to the back so others in the same class go next
+        del tenants[tenant]
+        if queue:
+            tenants[tenant] = queue
+        return waiter
+
+    def _dispatch(self) -> None:
+        while self.in_flight < self.max_in_flight:
+            waiter = self._pop_next()
+            if waiter is None:
+                break
+            if waiter.future.done():
+                continue
+            self.in_flight += 1
+            waiter.future.set_result(None)
+        self._publish()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    async def _acquire(self, priority: RequestPriority, tenant: str, queue_timeout: Optional[float]) -> float:
+        start = time.perf_counter()
+        if self.in_flight < self.max_in_flight and self.queue_depth == 0:
+            self.in_flight += 1
+            self._publish()
+            return 0.0
+
+        if self.queue_depth >= self.max_queue:
+            self.registry.inc("llm_rejected_total", labels={**self._labels(priority), "reason": "queue_full"})
+            raise QueueFullError(f"LLM queue for {self.model_name} is full", self.queue_depth)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority, tenant)
+        self._enqueue(waiter)
+        self._publish()
+        try:
+            await asyncio.wait({waiter.future}, timeout=queue_timeout)
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            else:
+                waiter.future.cancel()
+                self._discard(waiter)
+                self._publish()
+            raise
+
+        waited = time.perf_counter() - start
+        if not waiter.future.done():
+            waiter.future.cancel()
+            self._discard(waiter)
+            self._publish()
+            self.registry.inc("llm_rejected_total", labels={**self._labels(priority), "reason": "timeout"})
+            raise QueueTimeoutError(f"Timed out after {waited:.2f}s waiting for {self.model_name}", waited)
+
+        self.registry.observe("llm_queue_wait_seconds", waited, self._labels(priority))
+        return waited
+
+    async def __call__(self,
+                       llm_request: TVRequest,
+                       on_chunk: Callable[[str], None] = None,
+                       json_response: bool = True,
+                       priority: RequestPriority = RequestPriority.INTERACTIVE,
+                       tenant: str = "default",
+                       queue_timeout: Optional[float] = None) -> TVResponse:
+        waited = await self._acquire(priority, tenant, queue_timeout if queue_timeout is not None else self.queue_timeout)
+        try:
+            response = await self.client(llm_request, on_chunk=on_chunk, json_response=json_response)
+        finally:
+            self._release()
+
+        if response.metrics is not None:
+            response.metrics.queue_seconds = waited
+        return response
+
+    async def aclose(self) -> None:
+        if hasattr(self.client, "aclose"):
+            await self.client.aclose()
+
+    async def __aenter__(self) -> "LLMScheduler":
+        if hasattr(self.client, "__aenter__"):
+            await self.client.__aenter__()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+def create_scheduled_client(client: Callable, **settings) -> LLMScheduler:
+    """Put admission control and priority queuing in front of an LLM client (one per model)."""
+    return LLMScheduler(client, **settings)
@@ -0,0 +1,451 @@
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from .clip_store import (
+    MULTI_VALUED_FIELDS, ClipColumns, build_clip_columns, open_clip_store, write_clip_store
+)
+from .data_types import (
+    AvailableEntities, CameraFilter, ContributorFilter, DeltaOp, EntityRef, IndexDelta, LocationFilter,
+    SearchAPI, SearchFilters, SearchParams, SearchResponse, SearchSubject
+)
+from .delta_log import DeltaCursor, delta_log
+from .entity_index import ENTITIES_CACHE, AvailableEntitiesCache, EntitiesView
+
+SUBJECT_FIELDS = {
+    SearchSubject.CONTRIBUTOR: "contributors",
+    SearchSubject.LOCATION: "locations",
+    SearchSubject.CAMERA: "cameras",
+}
+CATALOGUE_FIELDS = ("contributors", "locations", "cameras")
+
+class DeltaGapError(Exception):
+    """The delta log skipped entries (it was compacted underneath a reader); reload the base."""
+
+class ClipSegment:
+    """One block of clip columns, minus the rows that later changes removed or replaced."""
+
+    def __init__(self, columns: ClipColumns, deleted: Optional[np.ndarray] = None):
+        self.clip_ids = columns.clip_ids
+        self.durations = columns.durations
+        self.fields = columns.fields
+        self.columns = columns
+        self.deleted = deleted
+
+    def __len__(self) -> int:
+        return len(self.clip_ids)
+
+    def _field_rows(self, filters: SearchFilters) -> List[np.ndarray]:
+        """One sorted row array per active filter; the clips matching all filters are their intersection."""
+        selections = []
+        if filters.clip_id is not None:
+            row = self.clip_ids.get(filters.clip_id)
+            selections.append(np.array([] if row is None else [row], dtype=np.int32))
+
+        contributors = filters.contributors
+        if isinstance(contributors, ContributorFilter):
+            field = "spoke" if contributors.spoke else "seen" if contributors.seen else "contributors"
+            selections.append(self.fields[field].match(contributors.contributors, contributors.match_type))
+        elif contributors:
+            selections.append(self.fields["contributors"].match(contributors))
+
+        for field, value, filter_type in (("locations", filters.locations, LocationFilter),
+                                          ("cameras", filters.cameras, CameraFilter)):
+            if isinstance(value, filter_type):
+                selections.append(self.fields[field].match(getattr(value, field), value.match_type))
+            elif value:
+                selections.append(self.fields[field].match(value))
+
+        clip_types = (filters.clip_types or []) + (filters.type or [])
+        if clip_types:
+            selections.append(self.fields["type"].match(clip_types))
+        if filters.shoot_dates:
+            selections.append(self.fields["shoot_date"].match(filters.shoot_dates))
+        return selections
+
+    def match_rows(self, filters: SearchFilters) -> Optional[np.ndarray]:
+        """Sorted rows of the live clips matching every filter, or None for every row."""
+        selections = self._field_rows(filters)
+        rows = None
+        if selections:
+            selections.sort(key=len)
+            rows = selections[0]
+            for selection in selections[1:]:
+                if not len(rows):
+                    break
+                rows = np.intersect1d(rows, selection, assume_unique=True)
+        if self.deleted is None:
+            return rows
+        if rows is None:
+            return np.flatnonzero(~self.deleted)
+        return rows[~self.deleted[rows]]
+
+    def mask(self, rows: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if rows is None:
+            return None
+        mask = np.zeros(len(self), dtype=bool)
+        mask[rows] = True
+        return mask
+
+    def clip_refs(self, rows: np.ndarray) -> List[EntityRef]:
+        types, dates = self.fields["type"], self.fields["shoot_date"]
+        return [
+            EntityRef(
+                type=SearchSubject.CLIP,
+                id=self.clip_ids[row],
+                duration=int(self.durations[row]),
+                metadata={"type": types.first(row), "shoot_date": dates.first(row)}
+            )
+            for row in rows.tolist()
+        ]
+
+    def records(self) -> Iterator[Dict]:
+        """Live clips in the index.json "clips" layout."""
+        for row in range(len(self)):
+            if self.deleted is not None and self.deleted[row]:
+                continue
+            record = {"id": self.clip_ids[row], "duration": int(self.durations[row])}
+            for field in ("type", "shoot_date"):
+                value = self.fields[field].first(row)
+                if value is not None:
+                    record[field] = value
+            for field in MULTI_VALUED_FIELDS:
+                values = self.fields[field].row_values(row)
+                if values or field in CATALOGUE_FIELDS:
+                    record[field] = values
+            yield record
+
+class ProjectIndex:
+    """Inverted index over one project's clips plus its entity catalogue.
+
+    The base clips come from index.json or a memory-mapped clip store. Changes from the delta
+    log are layered on top by `apply`: replaced or removed base clips are masked out and new
+    or updated clips live in a small in-memory segment, so queries see them without a rebuild.
+    """
+
+    def __init__(self, project_id: str, catalogue: Dict, columns: ClipColumns, version: Optional[str] = None):
+        self.project_id = project_id
+        self.base_version = version
+        self.version = version
+        self.info = {key: catalogue[key] for key in ("id", "name") if key in catalogue}
+        self.name = catalogue.get("name", project_id)
+        self.catalogue = {
+            field: {item["id"]: item for item in catalogue.get(field, [])}
+            for field in CATALOGUE_FIELDS
+        }
+        self.shoot_dates = list(catalogue.get("shoot_dates", []))
+        self.clip_types = list(catalogue.get("clip_types", []))
+        self.base_seq = self.seq = catalogue.get("delta_seq", 0)
+        self.segments = [ClipSegment(columns)]
+        self.delta_clips: Dict[str, Dict] = {}
+
+    @classmethod
+    def from_json(cls, project_id: str, data: Dict, version: Optional[str] = None) -> "ProjectIndex":
+        return cls(project_id, data, build_clip_columns(data.get("clips", [])), version=version)
+
+    @property
+    def clip_count(self) -> int:
+        return sum(len(segment) for segment in self.segments)
+
+    def available_entities(self) -> AvailableEntities:
+        return AvailableEntities(
+            project_id=self.project_id,
+            contributors={entity_id: item["name"] for entity_id, item in self.catalogue["contributors"].items()},
+            locations={entity_id: item["name"] for entity_id, item in self.catalogue["locations"].items()},
+            cameras={entity_id: item["name"] for entity_id, item in self.catalogue["cameras"].items()},
+            clip_types=set(self.clip_types),
+            shoot_dates=set(self.shoot_dates),
+            aliases={
+                entity_id: item["aliases"]
+                for items in self.catalogue.values() for entity_id, item in items.items() if item.get("aliases")
+            },
+            version=self.version,
+        )
+
+    def apply(self, deltas: Sequence[IndexDelta]) -> "ProjectIndex":
+        """A new index with the deltas applied; this one is left untouched for concurrent readers.
+
+        Costs O(catalogue + changed clips), plus one copy of the base deletion mask when a
+        base clip is replaced or removed.
+        """
+        if not deltas:
+            return self
+        if deltas[0].seq != self.seq + 1:
+            raise DeltaGapError(f"Expected delta {self.seq + 1} for {self.project_id}, got {deltas[0].seq}")
+
+        updated = object.__new__(ProjectIndex)
+        updated.__dict__.update(self.__dict__)
+        updated.catalogue = {field: dict(items) for field, items in self.catalogue.items()}
+        updated.shoot_dates = list(self.shoot_dates)
+        updated.clip_types = list(self.clip_types)
+        updated.delta_clips = dict(self.delta_clips)
+        base = self.segments[0]
+        deleted = None
+
+        def mask_base(clip_id: str) -> None:
+            nonlocal deleted
+            row = base.clip_ids.get(clip_id)
+            if row is not None:
+                if deleted is None:
+                    deleted = np.zeros(len(base), dtype=bool) if base.deleted is None else base.deleted.copy()
+                deleted[row] = True
+
+        for delta in deltas:
+            if delta.op in (DeltaOp.UPSERT_ENTITY, DeltaOp.REMOVE_ENTITY):
+                values = {"shoot_dates": updated.shoot_dates, "clip_types": updated.clip_types}.get(delta.kind)
+                if values is not None:
+                    value = delta.entity if delta.op == DeltaOp.UPSERT_ENTITY else delta.id
+                    if delta.op == DeltaOp.UPSERT_ENTITY and value not in values:
+                        values.append(value)
+                    elif delta.op == DeltaOp.REMOVE_ENTITY and value in values:
+                        values.remove(value)
+                elif delta.op == DeltaOp.UPSERT_ENTITY:
+                    updated.catalogue[delta.kind][delta.entity["id"]] = delta.entity
+                else:
+                    updated.catalogue[delta.kind].pop(delta.id, None)
+            elif delta.op == DeltaOp.UPSERT_CLIP:
+                mask_base(delta.clip["id"])
+                updated.delta_clips[delta.clip["id"]] = delta.clip
+                # New footage makes its shoot date and clip type available straight away
+                if delta.clip.get("shoot_date") and delta.clip["shoot_date"] not in updated.shoot_dates:
+                    updated.shoot_dates.append(delta.clip["shoot_date"])
+                if delta.clip.get("type") and delta.clip["type"] not in updated.clip_types:
+                    updated.clip_types.append(delta.clip["type"])
+            elif delta.op == DeltaOp.REMOVE_CLIP:
+                mask_base(delta.id)
+                updated.delta_clips.pop(delta.id, None)
+
+        if deleted is not None:
+            base = ClipSegment(base.columns, deleted)
+        updated.segments = [base]
+        if updated.delta_clips:
+            updated.segments.append(ClipSegment(build_clip_columns(list(updated.delta_clips.values()))))
+        updated.seq = deltas[-1].seq
+        updated.version = f"{self.base_version}+{updated.seq}"
+        return updated
+
+    def snapshot(self) -> Dict:
+        """The whole index, deltas included, in the index.json layout."""
+        return {
+            **self.info,
+            **{field: list(items.values()) for field, items in self.catalogue.items()},
+            "shoot_dates": list(self.shoot_dates),
+            "clip_types": list(self.clip_types),
+            "clips": [record for segment in self.segments for record in segment.records()],
+            "delta_seq": self.seq,
+        }
+
+    def _clip_page(self, params: SearchParams, matches: List[Tuple[ClipSegment, Optional[np.ndarray]]]) -> SearchResponse:
+        total, skip, refs = 0, params.offset, []
+        for segment, rows in matches:
+            if rows is None:
+                rows = np.arange(len(segment), dtype=np.int32)
+            total += len(rows)
+            page = rows[skip:] if params.limit is None else rows[skip:skip + params.limit - len(refs)]
+            skip = max(0, skip - len(rows))
+            refs.extend(segment.clip_refs(page))
+        return SearchResponse(request=params, entities=refs, total=total)
+
+    def search(self, params: SearchParams) -> SearchResponse:
+        matches = [(segment, segment.match_rows(params.filters)) for segment in self.segments]
+        end = None if params.limit is None else params.offset + params.limit
+
+        if params.subject == SearchSubject.CLIP:
+            return self._clip_page(params, matches)
+
+        if params.subject == SearchSubject.SUMMARY:
+            duration, clip_count = 0, 0
+            for segment, rows in matches:
+                selected = segment.durations if rows is None else segment.durations[rows]
+                duration += int(selected.sum())
+                clip_count += len(selected)
+            summary = EntityRef(
+                type=SearchSubject.SUMMARY,
+                id=self.project_id,
+                duration=duration,
+                metadata={"name": self.name, "clip_count": clip_count}
+            )
+            return SearchResponse(request=params, entities=[summary], total=1)
+
+        field_name = "shoot_date" if params.subject == SearchSubject.SHOOT_DATE else SUBJECT_FIELDS[params.subject]
+        catalogue = self.catalogue.get(field_name, {})
+
+        if not self.clip_count:
+            # Catalogue-only index: report the precomputed per-entity totals, which cannot be filtered
+            if params.filters.model_dump(exclude_none=True):
+                raise ValueError(f"Project {self.project_id} has no clip records, so {params.subject.value} "
+                                 f"searches cannot be filtered")
+            if catalogue:
+                refs = [
+                    EntityRef(type=params.subject, id=entity_id, duration=item.get("duration"),
+                              metadata={"name": item.get("name"), "count": item.get("count")})
+                    for entity_id, item in catalogue.items()
+                ]
+            elif params.subject == SearchSubject.SHOOT_DATE:
+                refs = [EntityRef(type=params.subject, id=date) for date in self.shoot_dates]
+            else:
+                refs = []
+            return SearchResponse(request=params, entities=refs[params.offset:end], total=len(refs))
+
+        totals: Dict[str, List[float]] = {}
+        for segment, rows in matches:
+            field = segment.fields[field_name]
+            counts, durations = field.totals(segment.mask(rows), segment.durations)
+            for code in np.flatnonzero(counts).tolist():
+                entry = totals.setdefault(field.vocab[code], [0, 0.0])
+                entry[0] += int(counts[code])
+                entry[1] += durations[code]
+        ranked = sorted(totals.items(), key=lambda item: -item[1][1])
+        refs = [
+            EntityRef(
+                type=params.subject,
+                id=entity_id,
+                duration=int(duration),
+                metadata={"name": catalogue.get(entity_id, {}).get("name"), "count": count}
+            )
+            for entity_id, (count, duration) in ranked[params.offset:end]
+        ]
+        return SearchResponse(request=params, entities=refs, total=len(ranked))
+
+def load_project_index(path: str, project_id: Optional[str] = None) -> ProjectIndex:
+    """Load a project's index.json; the version is its modification time."""
+    with open(path, "r") as f:
+        data = json.load(f)
+    project_id = project_id or os.path.basename(os.path.dirname(os.path.abspath(path)))
+    return ProjectIndex.from_json(project_id, data, version=str(os.stat(path).st_mtime_ns))
+
+def load_clip_store(store_dir: str, project_id: str) -> ProjectIndex:
+    """Open a memory-mapped clip store (see src.clip_store); the version is its meta.json mtime."""
+    version = str(os.stat(os.path.join(store_dir, "meta.json")).st_mtime_ns)
+    catalogue, columns = open_clip_store(store_dir)
+    return ProjectIndex(project_id, catalogue, columns, version=version)
+
+def _base_path(project_dir: str) -> str:
+    """The file that versions the project's base snapshot: the clip store if built, else index.json."""
+    store_meta = os.path.join(project_dir, "clips", "meta.json")
+    return store_meta if os.path.exists(store_meta) else os.path.join(project_dir, "index.json")
+
+def _load_base(project_dir: str, project_id: str) -> ProjectIndex:
+    path = _base_path(project_dir)
+    if path.endswith("meta.json"):
+        return load_clip_store(os.path.dirname(path), project_id)
+    return load_project_index(path, project_id)
+
+class _ProjectState:
+    __slots__ = ("index", "cursor", "base_path", "base_mtime", "checked_at")
+
+    def __init__(self, project_dir: str, project_id: str):
+        self.base_path = _base_path(project_dir)
+        self.base_mtime = os.stat(self.base_path).st_mtime_ns
+        base = _load_base(project_dir, project_id)
+        self.cursor = DeltaCursor(project_dir, after_seq=base.seq)
+        self.index = base.apply(self.cursor.read_new())
+        self.checked_at = time.monotonic()
+
+def compact_project(project_dir: str, project_id: Optional[str] = None) -> int:
+    """Fold the project's delta log into a new base snapshot; returns the last sequence folded in.
+
+    The log is rotated first, so appends carry on into a fresh segment while the snapshot is
+    written. The snapshot goes to the clip store if the project has one (its meta.json is
+    replaced atomically), otherwise to index.json, and the folded segments are then deleted.
+    """
+    project_id = project_id or os.path.basename(os.path.abspath(project_dir))
+    log = delta_log(project_dir)
+    upto = log.rotate()
+    base = _load_base(project_dir, project_id)
+    deltas = [delta for delta in DeltaCursor(project_dir, after_seq=base.seq).read_new() if delta.seq <= upto]
+    if not deltas:
+        log.truncate(base.seq)
+        return base.seq
+
+    snapshot = base.apply(deltas).snapshot()
+    if _base_path(project_dir).endswith("meta.json"):
+        write_clip_store(snapshot, os.path.join(project_dir, "clips"))
+    else:
+        path = os.path.join(project_dir, "index.json")
+        with open(path + ".tmp", "w") as f:
+            json.dump(snapshot, f, indent=2)
+        os.replace(path + ".tmp", path)
+    log.truncate(upto)
+    return upto
+
+class DeltaCompactor:
+    """Background thread that compacts every project whose delta log has grown past `min_entries`."""
+
+    def __init__(self, indexes_dir: str, interval_seconds: float = 60.0, min_entries: int = 1000):
+        self.indexes_dir = indexes_dir
+        self.interval_seconds = interval_seconds
+        self.min_entries = min_entries
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def run_once(self) -> Dict[str, int]:
+        compacted = {}
+        for project_id in sorted(os.listdir(self.indexes_dir)):
+            project_dir = os.path.join(self.indexes_dir, project_id)
+            if os.path.isdir(os.path.join(project_dir, "deltas")) and delta_log(project_dir).pending >= self.min_entries:
+                compacted[project_id] = compact_project(project_dir, project_id)
+        return compacted
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            self.run_once()
+
+    def start(self) -> "DeltaCompactor":
+        self._thread = threading.Thread(target=self._run, name="delta-compactor", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+def create_search_api(indexes_dir: str = "./training/entity_recognition/indexes",
+                      refresh_seconds: float = 1.0,
+                      entities_cache: Optional[AvailableEntitiesCache] = None) -> SearchAPI:
+    """Factory function to create a SearchAPI over the projects in `indexes_dir`.
+
+    A project is served from its memory-mapped clip store at `<project_id>/clips` when one has
+    been built, otherwise from `<project_id>/index.json`, with its delta log applied on top.
+    At most every `refresh_seconds` a project picks up new log entries, applied incrementally,
+    or a new base snapshot, which is reloaded.
+
+    get_available_entities returns an EntitiesView from the process-wide versioned cache, so
+    the catalogue is only rebuilt when the project changes and can go straight to an extractor.
+    """
+    entities_cache = entities_cache or ENTITIES_CACHE
+    projects: Dict[str, _ProjectState] = {}
+    lock = threading.Lock()
+
+    def project_index(project_id: str) -> ProjectIndex:
+        state = projects.get(project_id)
+        if state is not None and time.monotonic() - state.checked_at < refresh_seconds:
+            return state.index
+        with lock:
+            project_dir = os.path.join(indexes_dir, project_id)
+            state = projects.get(project_id)
+            if state is None:
+                state = projects[project_id] = _ProjectState(project_dir, project_id)
+            elif time.monotonic() - state.checked_at >= refresh_seconds:
+                base_path = _base_path(project_dir)
+                if base_path != state.base_path or os.stat(base_path).st_mtime_ns != state.base_mtime:
+                    state = projects[project_id] = _ProjectState(project_dir, project_id)
+                else:
+                    try:
+                        state.index = state.index.apply(state.cursor.read_new())
+                    except DeltaGapError:
+                        state = projects[project_id] = _ProjectState(project_dir, project_id)
+                    state.checked_at = time.monotonic()
+            return state.index
+
+    def get_available_entities(project_id: str) -> EntitiesView:
+        index = project_index(project_id)
+        return entities_cache.get(project_id, index.version, index.available_entities)
+
+    def search(params: SearchParams) -> SearchResponse:
+        return project_index(params.project_id).search(params)
+
+    return SearchAPI(get_available_entities=get_available_entities, search=search)
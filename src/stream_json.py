@@ -0,0 +1,145 @@
+import re
+from .prompt import RESPONSE_FORMAT
+
+# The field the TV model is asked to put its answer in, per RESPONSE_FORMAT
+ANSWER_KEY = next(iter(RESPONSE_FORMAT))
+
+# Text a model may emit before the JSON object, e.g. a ```json fence
+_PREAMBLE = re.compile(r"\s*(```[a-zA-Z]*\s*|`{1,2})?")
+
+_SIMPLE_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+class AnswerStreamParser:
+    """Incrementally decode one string field of a streamed JSON object.
+
+    Feed raw model chunks in as they arrive; each call returns the newly decoded text of the
+    answer field (escapes resolved, no JSON syntax), which may be empty. Escape sequences and
+    surrogate pairs split across chunks are held back until complete. If the output turns out
+    not to be a JSON object at all, the raw text is passed straight through instead.
+    """
+
+    def __init__(self, key: str = ANSWER_KEY):
+        self.key = key
+        self.mode = "preamble"  # preamble -> json -> answer -> done, or preamble -> passthrough
+        self._preamble = ""
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = False
+        self._reading_key = False
+        self._key_chars: list[str] = []
+        self._last_key = None
+        self._awaiting_value = False
+        self._pending = ""  # incomplete escape sequence inside the answer
+        self._high_surrogate = None
+
+    def feed(self, chunk: str) -> str:
+        out: list[str] = []
+        for index, char in enumerate(chunk):
+            if self.mode == "answer":
+                self._answer_char(char, out)
+            elif self.mode == "json":
+                self._json_char(char)
+            elif self.mode == "preamble":
+                if char == "{":
+                    self.mode = "json"
+                    self._depth = 1
+                    self._expect_key = True
+                    continue
+                self._preamble += char
+                if not _PREAMBLE.fullmatch(self._preamble):
+                    self.mode = "passthrough"
+                    out.append(self._preamble)
+                    out.append(chunk[index + 1:])
+                    break
+            elif self.mode == "passthrough":
+                out.append(chunk[index:])
+                break
+            else:
+                break
+        return "".join(out)
+
+    def _json_char(self, char: str) -> None:
+        """Track structure outside the answer so only the top-level answer key is matched."""
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+                if self._reading_key:
+                    self._key_chars.append(char)
+            elif char == "\\":
+                self._escape = True
+            elif char == '"':
+                self._in_string = False
+                if self._reading_key:
+                    self._reading_key = False
+                    self._last_key = "".join(self._key_chars)
+            elif self._reading_key:
+                self._key_chars.append(char)
+            return
+
+        if char.isspace():
+            return
+        if self._awaiting_value:
+            self._awaiting_value = False
+            if char == '"' and self._depth == 1 and self._last_key == self.key:
+                self.mode = "answer"
+                return
+        if char == '"':
+            self._in_string = True
+            if self._depth == 1 and self._expect_key:
+                self._expect_key = False
+                self._reading_key = True
+                self._key_chars = []
+        elif char == ":" and self._depth == 1:
+            self._awaiting_value = True
+        elif char == "," and self._depth == 1:
+            self._expect_key = True
+        elif char in "{[":
+            self._depth += 1
+        elif char in "}]":
+            self._depth -= 1
+            if self._depth == 0:
+                self.mode = "done"
+
+    def _answer_char(self, char: str, out: list[str]) -> None:
+        if not self._pending:
+            if char == "\\":
+                self._pending = char
+            elif char == '"':
+                self._flush_surrogate(out)
+                self.mode = "done"
+            else:
+                self._flush_surrogate(out)
+                out.append(char)
+            return
+
+        self._pending += char
+        if self._pending[1] != "u":
+            self._flush_surrogate(out)
+            out.append(_SIMPLE_ESCAPES.get(self._pending[1], self._pending[1]))
+            self._pending = ""
+        elif len(self._pending) == 6:
+            code = int(self._pending[2:], 16)
+            self._pending = ""
+            if 0xD800 <= code <= 0xDBFF:
+                self._flush_surrogate(out)
+                self._high_surrogate = code
+            elif 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+                out.append(chr(0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)))
+                self._high_surrogate = None
+            else:
+                self._flush_surrogate(out)
+                out.append(chr(code))
+
+    def _flush_surrogate(self, out: list[str]) -> None:
+        """Emit a lone high surrogate as the replacement character rather than dropping it."""
+        if self._high_surrogate is not None:
+            out.append("�")
+            self._high_surrogate = None
+
+    def finish(self) -> str:
+        """Return any text still held back once the stream has ended."""
+        if self.mode == "preamble" and self._preamble.strip():
+            self.mode = "passthrough"
+            return self._preamble
+        return ""
@@ -0,0 +1,145 @@
+import asyncio
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+from .data_types import (
+    AgentType, ExtractedEntities, SearchAPI, SearchFilters, SearchParams, SearchSubject,
+    TVRequest, WorkflowResult
+)
+from .memory import ConversationMemoryManager
+from .prompt import create_prompt_parts
+
+async def _call(fn: Callable, *args) -> Any:
+    """Await async callables; run synchronous (CPU-bound) ones in the default executor."""
+    if inspect.iscoroutinefunction(fn) or inspect.iscoroutinefunction(getattr(fn, "__call__", None)):
+        return await fn(*args)
+    return await asyncio.get_running_loop().run_in_executor(None, fn, *args)
+
+async def _timed(timings: Dict[str, float], stage: str, awaitable: Awaitable) -> Any:
+    start = time.perf_counter()
+    try:
+        return await awaitable
+    finally:
+        timings[stage] = round(time.perf_counter() - start, 4)
+
+def build_search_params(project_id: str, entities: ExtractedEntities) -> SearchParams:
+    """Turn extracted entities into a clip search over the project."""
+    found = entities.entities
+    return SearchParams(
+        project_id=project_id,
+        subject=SearchSubject.CLIP,
+        filters=SearchFilters(
+            contributors=found.get("contributors") or None,
+            locations=found.get("locations") or None,
+            cameras=found.get("cameras") or None,
+            clip_types=found.get("clip_types") or None,
+        )
+    )
+
+def create_workflow(project_id: str,
+                    detect_agent: Callable,
+                    extract_entities: Callable,
+                    search_api: SearchAPI,
+                    generate_tv_response: Optional[Callable] = None,
+                    on_chunk: Optional[Callable[[str], None]] = None,
+                    memory: Optional[ConversationMemoryManager] = None,
+                    entities_by_project_id: bool = False) -> Callable[[str], Awaitable[WorkflowResult]]:
+    """Factory function to create the end-to-end workflow for one project.
+
+    Intent detection and entity extraction start together. As soon as the intent is known every
+    selected agent's branch starts at once: a TV_POST_PRODUCTION generation does not wait for
+    entity extraction, and a PRODUCTION search starts as soon as the entities are ready. Total
+    latency is therefore close to the slowest branch rather than the sum of the stages.
+
+    `detect_agent` and `extract_entities(query, available_entities)` may be synchronous (they are
+    run in an executor) or async, e.g. create_async_intent from src.microbatch. With
+    `entities_by_project_id`, `extract_entities` is called as (query, project_id) instead, which
+    is the signature of create_async_entity_extraction's front; it looks up the project's
+    entities itself. TANOOKI has no knowledge base yet, so it selects no branch.
+
+    With a `memory`, TV generations see the conversation so far (trimmed to its token budget)
+    and each successful one is appended to it. A generation whose raw response carries an "error"
+    (the Ollama client's way of reporting failure) counts as a failed branch.
+    """
+
+    async def run_workflow(query: str) -> WorkflowResult:
+        start = time.perf_counter()
+        timings: Dict[str, float] = {}
+        errors: Dict[str, str] = {}
+
+        async def extract() -> ExtractedEntities:
+            if entities_by_project_id:
+                return await _call(extract_entities, query, project_id)
+            available_entities = await _call(search_api.get_available_entities, project_id)
+            return await _call(extract_entities, query, available_entities)
+
+        intent_task = asyncio.create_task(_timed(timings, "intent", _call(detect_agent, query)))
+        entity_task = asyncio.create_task(_timed(timings, "entities", extract()))
+
+        try:
+            agent_result = await intent_task
+        except Exception as e:
+            entity_task.cancel()
+            timings["total"] = round(time.perf_counter() - start, 4)
+            return WorkflowResult(query=query, error=f"Intent detection failed: {e}",
+                                  timings=timings, errors={"intent": str(e)})
+
+        branches: Dict[str, asyncio.Task] = {}
+        if AgentType.TV_POST_PRODUCTION in agent_result.agents:
+            if generate_tv_response is None:
+                errors["tv_generation"] = "No TV generation client configured"
+            else:
+                context = memory.context() if memory is not None else None
+                system, prompt = create_prompt_parts(query, context)
+                request = TVRequest(query=query, prompt=prompt, as_json=True, system=system, context=context or None)
+                branches["tv_generation"] = asyncio.create_task(
+                    _timed(timings, "tv_generation", generate_tv_response(request, on_chunk))
+                )
+
+        if AgentType.PRODUCTION in agent_result.agents:
+            async def search():
+                entities = await entity_task
+                return await _call(search_api.search, build_search_params(project_id, entities))
+            branches["search"] = asyncio.create_task(_timed(timings, "search", search()))
+
+        results = dict(zip(branches, await asyncio.gather(*branches.values(), return_exceptions=True)))
+        for stage, result in results.items():
+            if isinstance(result, Exception):
+                errors[stage] = str(result)
+
+        tv_response = results.get("tv_generation")
+        if isinstance(tv_response, Exception):
+            tv_response = None
+        elif tv_response is not None and isinstance(tv_response.raw_response, dict) and "error" in tv_response.raw_response:
+            # The Ollama client reports failures (server down, timeouts) as an error response rather than raising
+            errors["tv_generation"] = str(tv_response.raw_response["error"])
+        elif memory is not None and tv_response is not None:
+            memory.append(tv_response)
+
+        entities = None
+        try:
+            entities = await entity_task
+        except Exception as e:
+            errors.setdefault("entities", str(e))
+
+        error = None
+        if AgentType.INVALID_QUERY in agent_result.agents:
+            error = "Query is not authorised for this project"
+        elif not agent_result.agents:
+            error = "No agent selected for query"
+        elif errors:
+            error = "; ".join(f"{stage}: {message}" for stage, message in errors.items())
+
+        timings["total"] = round(time.perf_counter() - start, 4)
+        return WorkflowResult(
+            query=query,
+            error=error,
+            agent_result=agent_result,
+            entities=entities,
+            search_result=None if isinstance(results.get("search"), Exception) else results.get("search"),
+            tv_response=tv_response,
+            timings=timings,
+            errors=errors,
+        )
+
+    return run_workflow
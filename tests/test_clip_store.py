@@ -0,0 +1,112 @@
+import json
+import numpy as np
+import pytest
+from src.clip_store import StringColumn, convert_index, open_clip_store, write_clip_store
+from src.search import create_search_api
+from src.data_types import ContributorFilter, SearchFilters, SearchParams, SearchSubject
+
+PROJECT = {
+    "name": "project_1",
+    "contributors": [{"id": "john_id", "name": "John"}, {"id": "sarah_id", "name": "Sarah"}],
+    "locations": [{"id": "beach_id", "name": "Beach"}],
+    "cameras": [{"id": "red_id", "name": "RED"}],
+    "shoot_dates": ["2024-03-15", "2024-03-16"],
+    "clip_types": ["rush", "review"],
+    "clips": [
+        {"id": "c2", "duration": 200, "type": "rush", "shoot_date": "2024-03-15",
+         "contributors": ["john_id", "sarah_id"], "locations": ["beach_id"], "cameras": ["red_id"]},
+        {"id": "c1", "duration": 100, "type": "review", "shoot_date": "2024-03-16",
+         "contributors": ["john_id"], "locations": [], "cameras": ["red_id"], "spoke": ["john_id"]},
+        {"id": "c3", "duration": 50, "contributors": ["sarah_id"]},
+    ]
+}
+
+@pytest.fixture
+def indexes_dir(tmp_path):
+    """Fixture with one project as both index.json and a converted clip store."""
+    project_dir = tmp_path / "project_1"
+    project_dir.mkdir()
+    (project_dir / "index.json").write_text(json.dumps(PROJECT))
+    convert_index(str(project_dir / "index.json"))
+    return tmp_path
+
+def test_string_column_lookup():
+    """Test id -> row lookups over the sorted permutation."""
+    column = StringColumn.build(["b", "a", "ç", "c"])
+    assert [column[row] for row in range(len(column))] == ["b", "a", "ç", "c"]
+    assert column.get("c") == 3
+    assert column.get("ç") == 2
+    assert column.get("missing") is None
+
+def test_store_is_memory_mapped(indexes_dir):
+    """Test that columns are read-only memory maps and the catalogue round-trips."""
+    catalogue, columns = open_clip_store(str(indexes_dir / "project_1" / "clips"))
+    assert isinstance(columns.durations, np.memmap)
+    assert isinstance(columns.fields["contributors"].posting_rows, np.memmap)
+    assert not columns.durations.flags.writeable
+    assert catalogue["contributors"] == PROJECT["contributors"]
+    assert columns.clip_ids[1] == "c1"
+    assert columns.durations.tolist() == [200, 100, 50]
+
+def test_store_matches_json(indexes_dir, tmp_path):
+    """Test that the clip store and the JSON index answer queries identically."""
+    store_api = create_search_api(str(indexes_dir))
+    json_dir = tmp_path / "json_only" / "project_1"
+    json_dir.mkdir(parents=True)
+    (json_dir / "index.json").write_text(json.dumps(PROJECT))
+    json_api = create_search_api(str(tmp_path / "json_only"))
+
+    queries = [
+        (SearchSubject.CLIP, SearchFilters(contributors=["john_id"])),
+        (SearchSubject.CLIP, SearchFilters(contributors=ContributorFilter(contributors=["john_id"], spoke=True))),
+        (SearchSubject.CLIP, SearchFilters(clip_id="c3")),
+        (SearchSubject.CONTRIBUTOR, SearchFilters(cameras=["red_id"])),
+        (SearchSubject.SHOOT_DATE, SearchFilters()),
+        (SearchSubject.SUMMARY, SearchFilters(clip_types=["rush", "review"])),
+    ]
+    for subject, filters in queries:
+        params = SearchParams(project_id="project_1", subject=subject, filters=filters)
+        assert store_api.search(params) == json_api.search(params)
+
+    clip = store_api.search(SearchParams(project_id="project_1", subject=SearchSubject.CLIP,
+                                         filters=SearchFilters(clip_id="c1"))).entities[0]
+    assert clip.duration == 100
+    assert clip.metadata == {"type": "review", "shoot_date": "2024-03-16"}
+    assert store_api.get_available_entities("project_1").contributors == {"john_id": "John", "sarah_id": "Sarah"}
+
+def test_empty_store(tmp_path):
+    """Test that a project without clip records converts and opens."""
+    write_clip_store({"name": "empty", "contributors": []}, str(tmp_path / "clips"))
+    catalogue, columns = open_clip_store(str(tmp_path / "clips"))
+    assert len(columns.clip_ids) == 0
+    assert catalogue["name"] == "empty"
+
+def test_rewrite_keeps_previous_generation(tmp_path):
+    """Test that a reader holding the previous meta.json can still map its files after a rewrite."""
+    store_dir = tmp_path / "clips"
+    generations = []
+    for _ in range(3):
+        write_clip_store(PROJECT, str(store_dir))
+        generations.append(json.loads((store_dir / "meta.json").read_text())["generation"])
+
+    def files(generation):
+        return [path for path in store_dir.iterdir() if path.name.endswith(f".{generation}.npy")]
+
+    assert files(generations[0]) == []
+    assert files(generations[1]) and files(generations[2])
+
+def test_open_retries_when_generation_disappears(tmp_path, monkeypatch):
+    """Test that an open racing a rewrite re-reads meta.json instead of failing."""
+    store_dir = str(tmp_path / "clips")
+    write_clip_store(PROJECT, store_dir)
+    real_load, calls = np.load, []
+
+    def racing_load(path, *args, **kwargs):
+        if not calls:
+            calls.append(path)
+            raise FileNotFoundError(path)
+        return real_load(path, *args, **kwargs)
+
+    monkeypatch.setattr(np, "load", racing_load)
+    catalogue, columns = open_clip_store(store_dir)
+    assert len(columns.clip_ids) == 3 and calls
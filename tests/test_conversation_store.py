@@ -0,0 +1,111 @@
+import datetime
+import os
+import threading
+import pytest
+from src.conversation_store import ConversationStore
+from src.data_types import LLMRequest, LLMResponse, TVRequest, TVResponse
+
+def make_turn(i, kind="tv"):
+    if kind == "llm":
+        return LLMResponse(generated_at="now", agents=None, search_result=None,
+                           request=LLMRequest(query=f"question {i}", prompt="p", as_json=False),
+                           raw_response=f"answer {i}", model_name="fake", model_provider="fake", time_in_seconds=0.1)
+    return TVResponse(generated_at=datetime.datetime.now().isoformat(),
+                      request=TVRequest(query=f"question {i}", prompt="p", as_json=True),
+                      raw_response={"Answer": f"answer {i}"}, model_name="fake", model_provider="fake",
+                      time_in_seconds=0.1)
+
+def queries(turns):
+    return [turn.request.query for turn in turns]
+
+def test_turns_survive_a_restart(tmp_path):
+    """Test that flushed turns of both kinds are read back in order by a new store."""
+    with ConversationStore(str(tmp_path)) as store:
+        numbers = [store.append("s1", make_turn(i, "llm" if i % 3 == 0 else "tv")) for i in range(10)]
+        store.append("s2", make_turn(99))
+    assert numbers == list(range(10))
+
+    with ConversationStore(str(tmp_path)) as store:
+        assert store.sessions() == ["s1", "s2"]
+        assert store.turn_count("s1") == 10
+        turns = store.turns("s1", 0, 10)
+        assert queries(turns) == [f"question {i}" for i in range(10)]
+        assert isinstance(turns[0], LLMResponse) and isinstance(turns[1], TVResponse)
+        assert turns[1].raw_response == {"Answer": "answer 1"}
+
+def test_pending_turns_are_readable_before_they_are_durable(tmp_path):
+    """Test that reads merge queued turns with durable ones without shifting turn numbers."""
+    store = ConversationStore(str(tmp_path))
+    for i in range(50):
+        assert store.append("s", make_turn(i)) == i
+        assert queries(store.recent("s", 2))[-1] == f"question {i}"
+    store.flush(timeout=5)
+    assert queries(store.page("s", before=20, size=5)) == [f"question {i}" for i in range(15, 20)]
+    assert queries(store.page("s", before=3, size=5)) == ["question 0", "question 1", "question 2"]
+    store.close()
+
+def test_segments_roll_over_and_pages_cross_them(tmp_path):
+    """Test that small segments split the session and range reads span segment boundaries."""
+    with ConversationStore(str(tmp_path), segment_bytes=1024) as store:
+        for i in range(40):
+            store.append("s", make_turn(i))
+    segments = [name for name in os.listdir(tmp_path / "s") if name.endswith(".jsonl")]
+    assert len(segments) > 3
+
+    with ConversationStore(str(tmp_path), segment_bytes=1024) as store:
+        assert queries(store.turns("s", 5, 35)) == [f"question {i}" for i in range(5, 35)]
+        store.append("s", make_turn(40))
+        store.flush()
+        assert queries(store.recent("s", 1)) == ["question 40"]
+
+def test_interrupted_write_is_dropped_on_open(tmp_path):
+    """Test that bytes past the last index entry (a torn batch) are truncated on open."""
+    with ConversationStore(str(tmp_path)) as store:
+        for i in range(3):
+            store.append("s", make_turn(i))
+    segment = tmp_path / "s" / f"{0:012d}.jsonl"
+    with open(segment, "ab") as f:
+        f.write(b'{"kind":"tv","turn":{"generated')
+    with open(tmp_path / "s" / f"{0:012d}.idx", "ab") as f:
+        f.write(b"\x01\x02")
+
+    with ConversationStore(str(tmp_path)) as store:
+        assert store.turn_count("s") == 3
+        store.append("s", make_turn(3))
+    with ConversationStore(str(tmp_path)) as store:
+        assert queries(store.turns("s", 0, 10)) == [f"question {i}" for i in range(4)]
+
+def test_concurrent_appends_keep_every_turn(tmp_path):
+    """Test that appends from several threads are all written, each once."""
+    with ConversationStore(str(tmp_path)) as store:
+        def worker(offset):
+            for i in range(50):
+                store.append("s", make_turn(offset + i))
+        threads = [threading.Thread(target=worker, args=(offset,)) for offset in range(0, 200, 50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    with ConversationStore(str(tmp_path)) as store:
+        assert sorted(queries(store.turns("s", 0, 500))) == sorted(f"question {i}" for i in range(200))
+
+def test_open_memory_loads_only_recent_turns_and_persists_new_ones(tmp_path):
+    """Test that a memory opened from the store holds the newest turns within budget."""
+    with ConversationStore(str(tmp_path)) as store:
+        for i in range(100):
+            store.append("s", make_turn(i))
+
+    with ConversationStore(str(tmp_path)) as store:
+        memory = store.open_memory("s", budget_tokens=60)
+        assert 0 < len(memory) < 100 and memory.token_count <= 60
+        assert memory.memory.history[-1].request.query == "question 99"
+        memory.append(make_turn(100))
+        store.flush()
+        assert store.turn_count("s") == 101
+
+def test_invalid_session_ids_are_rejected(tmp_path):
+    with ConversationStore(str(tmp_path)) as store:
+        for session_id in ("../x", ".hidden", "a/b", ""):
+            with pytest.raises(ValueError):
+                store.append(session_id, make_turn(0))
@@ -0,0 +1,68 @@
+import json
+import os
+import random
+import spacy
+from src.corpus import ShardedCorpus, build_corpus, in_dev_split, read_records, record_to_doc
+
+def write_jsonl(path, records):
+    with open(path, "w") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+
+def intent_records(count):
+    return [{"text": f"How much footage for project {i}?", "cats": {"PRODUCTION": 1.0, "TANOOKI": 0.0}}
+            for i in range(count)]
+
+def test_unchanged_shards_are_skipped(tmp_path):
+    """Test that a rebuild only re-tokenises shards whose records changed."""
+    source = str(tmp_path / "data.jsonl")
+    write_jsonl(source, intent_records(25))
+    first = build_corpus([source], str(tmp_path / "corpus"), shard_size=10)
+    assert (first["built"], first["skipped"], first["total"]) == (3, 0, 25)
+
+    again = build_corpus([source], str(tmp_path / "corpus"), shard_size=10)
+    assert (again["built"], again["skipped"]) == (0, 3)
+
+    write_jsonl(source, intent_records(27))
+    appended = build_corpus([source], str(tmp_path / "corpus"), shard_size=10)
+    assert (appended["built"], appended["skipped"], appended["total"]) == (1, 2, 27)
+
+    write_jsonl(source, intent_records(5))
+    shrunk = build_corpus([source], str(tmp_path / "corpus"), shard_size=10)
+    assert sorted(name for name in os.listdir(tmp_path / "corpus") if name.endswith(".spacy")) == ["shard-00000.spacy"]
+    assert shrunk["total"] == 5
+
+def test_examples_stream_with_annotations(tmp_path):
+    """Test that cats and entity offsets survive the DocBin round trip and the dev split is held out."""
+    source = str(tmp_path / "ner.json")
+    with open(source, "w") as f:
+        json.dump([{"text": "Show me the Sony A7S footage with John", "entities": [[12, 20, "CAMERA"], [34, 38, "CONTRIBUTOR"]]},
+                   ["Grade the rushes", {"cats": {"TV_POST_PRODUCTION": 1.0}}]], f)
+    assert [record["text"] for record in read_records(source)] == ["Show me the Sony A7S footage with John", "Grade the rushes"]
+    build_corpus([source], str(tmp_path / "corpus"))
+
+    nlp = spacy.blank("en")
+    examples = list(ShardedCorpus(str(tmp_path / "corpus")).train_examples(nlp, random.Random(0)))
+    by_text = {example.reference.text: example for example in examples}
+    ner = by_text["Show me the Sony A7S footage with John"]
+    assert [(ent.text, ent.label_) for ent in ner.reference.ents] == [("Sony A7S", "CAMERA"), ("John", "CONTRIBUTOR")]
+    assert not ner.predicted.ents and ner.predicted.text == ner.reference.text
+    assert by_text["Grade the rushes"].reference.cats == {"TV_POST_PRODUCTION": 1.0}
+
+def test_dev_split_is_disjoint_from_training(tmp_path):
+    source = str(tmp_path / "data.jsonl")
+    write_jsonl(source, intent_records(200))
+    build_corpus([source], str(tmp_path / "corpus"), shard_size=50)
+
+    nlp = spacy.blank("en")
+    corpus = ShardedCorpus(str(tmp_path / "corpus"), dev_fraction=0.2, max_cached_examples=0)
+    dev = {example.reference.text for example in corpus.dev_examples(nlp)}
+    train = {example.reference.text for example in corpus.train_examples(nlp)}
+    assert dev and train and not dev & train and len(dev | train) == 200
+    assert all(in_dev_split(text, 0.2) for text in dev)
+
+def test_entities_inside_tokens_are_split_out():
+    """Test that an entity ending inside a token ("A7S.") is kept whole rather than contracted."""
+    doc = record_to_doc(spacy.blank("en"), {"text": "Shot on the Sony A7S.", "entities": [[12, 20, "CAMERA"]]})
+    assert [(ent.text, ent.label_) for ent in doc.ents] == [("Sony A7S", "CAMERA")]
+    assert doc.text == "Shot on the Sony A7S."
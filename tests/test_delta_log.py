@@ -0,0 +1,175 @@
+import json
+import os
+import pytest
+from src.clip_store import convert_index
+from src.data_types import DeltaOp, IndexDelta, SearchFilters, SearchParams, SearchSubject
+from src.delta_log import DeltaCursor, DeltaLog, DeltaLogCorruptError, delta_log
+from src.search import DeltaCompactor, DeltaGapError, compact_project, create_search_api, load_project_index
+
+PROJECT = {
+    "name": "project_1",
+    "contributors": [{"id": "john_id", "name": "John"}],
+    "locations": [{"id": "beach_id", "name": "Beach"}],
+    "cameras": [],
+    "shoot_dates": ["2024-03-15"],
+    "clip_types": ["rush"],
+    "clips": [
+        {"id": "c1", "duration": 100, "type": "rush", "shoot_date": "2024-03-15",
+         "contributors": ["john_id"], "locations": ["beach_id"], "cameras": []},
+        {"id": "c2", "duration": 200, "type": "rush", "shoot_date": "2024-03-15",
+         "contributors": ["john_id"], "locations": [], "cameras": []},
+    ]
+}
+
+NEW_FOOTAGE = [
+    {"op": "upsert_entity", "kind": "contributors", "entity": {"id": "sarah_id", "name": "Sarah"}},
+    {"op": "upsert_clip", "clip": {"id": "c3", "duration": 50, "type": "review", "shoot_date": "2024-03-16",
+                                   "contributors": ["sarah_id"], "locations": ["beach_id"], "cameras": []}},
+    {"op": "upsert_clip", "clip": {"id": "c1", "duration": 150, "type": "rush", "shoot_date": "2024-03-15",
+                                   "contributors": ["john_id", "sarah_id"], "locations": ["beach_id"], "cameras": []}},
+    {"op": "remove_clip", "id": "c2"},
+]
+
+@pytest.fixture
+def project_dir(tmp_path):
+    """Fixture with one project in index.json form."""
+    project_dir = tmp_path / "project_1"
+    project_dir.mkdir()
+    (project_dir / "index.json").write_text(json.dumps(PROJECT))
+    return project_dir
+
+def clips(api):
+    response = api.search(SearchParams(project_id="project_1", subject=SearchSubject.CLIP, filters=SearchFilters()))
+    return {entity.id: entity.duration for entity in response.entities}
+
+def test_append_and_tail(project_dir):
+    """Test that appends get sequence numbers and a cursor only returns unseen, complete lines."""
+    log = DeltaLog(str(project_dir))
+    assert log.append(*NEW_FOOTAGE[:2]) == 2
+    cursor = DeltaCursor(str(project_dir))
+    assert [delta.seq for delta in cursor.read_new()] == [1, 2]
+    assert cursor.read_new() == []
+
+    segment = os.path.join(log.deltas_dir, sorted(os.listdir(log.deltas_dir))[-1])
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "remove_clip", "id": "c1", "se')
+    assert cursor.read_new() == []
+
+    assert DeltaLog(str(project_dir)).next_seq == 3
+
+def test_append_after_torn_line(project_dir):
+    """Test that reopening a log with a torn last line drops it before the next append."""
+    DeltaLog(str(project_dir)).append(NEW_FOOTAGE[3])
+    deltas_dir = os.path.join(str(project_dir), "deltas")
+    segment = os.path.join(deltas_dir, sorted(os.listdir(deltas_dir))[-1])
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "remove_clip", "id": "c1", "se')
+
+    api = create_search_api(str(project_dir.parent), refresh_seconds=0)
+    assert DeltaLog(str(project_dir)).append({"op": "remove_clip", "id": "c1"}) == 2
+    assert [delta.seq for delta in DeltaCursor(str(project_dir)).read_new()] == [1, 2]
+    assert clips(api) == {}
+    assert api.get_available_entities("project_1") is not None
+
+def test_cursor_reports_corrupt_line(project_dir):
+    """Test that an undecodable complete line fails clearly, after the entries before it."""
+    DeltaLog(str(project_dir)).append(*NEW_FOOTAGE[:2])
+    deltas_dir = os.path.join(str(project_dir), "deltas")
+    segment = os.path.join(deltas_dir, sorted(os.listdir(deltas_dir))[-1])
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "remove_clip", "id": "c1", "se{"op":"remove_clip","id":"b","seq":3}\n')
+
+    cursor = DeltaCursor(str(project_dir))
+    assert [delta.seq for delta in cursor.read_new()] == [1, 2]
+    with pytest.raises(DeltaLogCorruptError, match="at byte"):
+        cursor.read_new()
+
+def test_open_leaves_torn_line_to_the_writer(project_dir):
+    """Test that opening a log does not truncate a line another writer may still be appending."""
+    DeltaLog(str(project_dir)).append(NEW_FOOTAGE[3])
+    deltas_dir = os.path.join(str(project_dir), "deltas")
+    segment = os.path.join(deltas_dir, sorted(os.listdir(deltas_dir))[-1])
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "remove_clip", "id": "c1", "se')
+    size = os.path.getsize(segment)
+
+    log = DeltaLog(str(project_dir))
+    assert log.next_seq == 2
+    assert os.path.getsize(segment) == size
+
+def test_open_reports_corrupt_line(project_dir):
+    """Test that an undecodable complete line in the newest segment fails with its byte offset."""
+    DeltaLog(str(project_dir)).append(NEW_FOOTAGE[3])
+    deltas_dir = os.path.join(str(project_dir), "deltas")
+    segment = os.path.join(deltas_dir, sorted(os.listdir(deltas_dir))[-1])
+    offset = os.path.getsize(segment)
+    with open(segment, "ab") as f:
+        f.write(b'{"op": "remove_clip", "id": "c1", "se\n')
+
+    with pytest.raises(DeltaLogCorruptError, match=f"at byte {offset}"):
+        DeltaLog(str(project_dir))
+
+def test_rejects_invalid_deltas(project_dir):
+    """Test that malformed deltas are rejected before anything is written."""
+    log = DeltaLog(str(project_dir))
+    with pytest.raises(ValueError):
+        log.append({"op": "upsert_entity", "kind": "lenses", "entity": {"id": "x", "name": "X"}})
+    with pytest.raises(ValueError):
+        log.append({"op": "upsert_clip", "clip": {"duration": 1}})
+    assert log.next_seq == 1
+
+def test_search_sees_deltas_incrementally(project_dir):
+    """Test that new, updated and removed clips and entities show up without a rebuild."""
+    api = create_search_api(str(project_dir.parent), refresh_seconds=0)
+    before = api.get_available_entities("project_1")
+    assert clips(api) == {"c1": 100, "c2": 200}
+
+    DeltaLog(str(project_dir)).append(*NEW_FOOTAGE)
+    after = api.get_available_entities("project_1")
+    assert after.version != before.version
+    assert after.contributors["sarah_id"] == "Sarah"
+    assert after.shoot_dates == {"2024-03-15", "2024-03-16"}
+    assert after.clip_types == {"rush", "review"}
+    assert clips(api) == {"c1": 150, "c3": 50}
+
+    sarah = api.search(SearchParams(project_id="project_1", subject=SearchSubject.CLIP,
+                                    filters=SearchFilters(contributors=["sarah_id"]), limit=1, offset=1))
+    assert sarah.total == 2
+    # Changed clips follow the base clips, in the order they were first written
+    assert [entity.id for entity in sarah.entities] == ["c1"]
+
+    contributors = api.search(SearchParams(project_id="project_1", subject=SearchSubject.CONTRIBUTOR,
+                                           filters=SearchFilters(locations=["beach_id"])))
+    assert [(e.id, e.duration) for e in contributors.entities] == [("sarah_id", 200), ("john_id", 150)]
+
+def test_apply_detects_gaps(project_dir):
+    """Test that a reader that missed entries asks for a reload instead of applying out of order."""
+    index = load_project_index(str(project_dir / "index.json"))
+    with pytest.raises(DeltaGapError):
+        index.apply([IndexDelta(op=DeltaOp.REMOVE_CLIP, id="c1", seq=5)])
+
+@pytest.mark.parametrize("clip_store", [False, True])
+def test_compaction(project_dir, clip_store):
+    """Test that compaction folds the log into the base and readers carry on seamlessly."""
+    if clip_store:
+        convert_index(str(project_dir / "index.json"))
+    api = create_search_api(str(project_dir.parent), refresh_seconds=0)
+    log = delta_log(str(project_dir))
+    log.append(*NEW_FOOTAGE)
+    expected = clips(api)
+
+    assert compact_project(str(project_dir)) == 4
+    assert log.pending == 0
+    assert clips(api) == expected
+    assert api.get_available_entities("project_1").contributors["sarah_id"] == "Sarah"
+
+    log.append({"op": "remove_clip", "id": "c3"})
+    assert clips(api) == {"c1": 150}
+    assert create_search_api(str(project_dir.parent)).get_available_entities("project_1").version.endswith("+5")
+
+def test_background_compactor(project_dir):
+    """Test that the compactor only compacts projects past the entry threshold."""
+    delta_log(str(project_dir)).append(*NEW_FOOTAGE)
+    assert DeltaCompactor(str(project_dir.parent), min_entries=5).run_once() == {}
+    assert DeltaCompactor(str(project_dir.parent), min_entries=4).run_once() == {"project_1": 4}
+    assert json.loads((project_dir / "index.json").read_text())["delta_seq"] == 4
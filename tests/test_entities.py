@@ -2,8 +2,9 @@ import sys
 import os
 import pytest
 import json
-from src.extract_entities import entity_extraction_factory
+from src.extract_entities import entity_extraction_factory, batch_entity_extraction_factory
 from src.data_types import AvailableEntities, ExtractedEntities
+from src.entity_index import AvailableEntitiesCache
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -53,4 +54,86 @@ def test_query_extracts_entities(extract_entities):
                 log_file.write(f"  {entity_type}: {entity_list}\n")
             
             # Example assertion: Check if at least one entity is extracted
-            assert any(extracted_entities.entities.values()), f"Query '{query}' did not extract any entities." 
\ No newline at end of file
+            assert any(extracted_entities.entities.values()), f"Query '{query}' did not extract any entities." 
+
+def test_lean_model_matches_full_model(extract_entities):
+    """Test that the lean loading mode extracts the same entities as the full pipeline."""
+    lean_extract_entities = entity_extraction_factory(lean=True)
+    queries = load_queries_from_json("tests/fixtures/json_entity_files/clip_search.json")
+    available_entities = {
+        "contributors": {"john_id": "John", "david_id": "David", "sarah_id": "Sarah"},
+        "locations": {"beach_id": "Beach", "kitchen_id": "Kitchen"},
+        "clip_types": ["rush", "review"]
+    }
+
+    for query in queries:
+        assert lean_extract_entities(query, available_entities) == extract_entities(query, available_entities), \
+            f"Query '{query}' extracted different entities in lean mode."
+
+
+def test_batch_extraction_matches_single_query(extract_entities):
+    """Test that batch extraction yields the same entities as the single-query extractor, in order."""
+    queries = load_queries_from_json("tests/fixtures/json_entity_files/clip_search.json")
+    available_entities = AvailableEntities(
+        project_id="project_123",
+        contributors={"john_id": "John", "david_id": "David", "sarah_id": "Sarah"},
+        locations={"beach_id": "Beach", "kitchen_id": "Kitchen"},
+        cameras={"sony_id": "Sony A7S", "canon_id": "Canon 5D"},
+        clip_types={"rush"},
+        shoot_dates={"2023-10-01"},
+        version="1"
+    )
+    extract_entities_batch = batch_entity_extraction_factory(lambda project_id: available_entities)
+
+    results = list(extract_entities_batch(((query, "project_123") for query in queries), batch_size=2))
+
+    assert results == [extract_entities(query, available_entities) for query in queries]
+
+def test_multi_process_batch_matches_in_process():
+    """Test that worker processes return the same entities as the in-process path, in input order."""
+    queries = load_queries_from_json("tests/fixtures/json_entity_files/clip_search.json") * 3
+    projects = {
+        "project_123": AvailableEntities(
+            project_id="project_123",
+            contributors={"john_id": "John", "david_id": "David", "sarah_id": "Sarah"},
+            locations={"beach_id": "Beach", "kitchen_id": "Kitchen"},
+            cameras={"sony_id": "Sony A7S"},
+            clip_types={"rush"},
+            shoot_dates=set(),
+            version="1"
+        ),
+        "project_456": AvailableEntities(
+            project_id="project_456",
+            contributors={"sarah_id": "Sarah"},
+            locations={"kitchen_id": "Kitchen"},
+            cameras={},
+            clip_types={"review"},
+            shoot_dates=set(),
+            version="1"
+        ),
+    }
+    pairs = [(query, "project_123" if position % 2 else "project_456") for position, query in enumerate(queries)]
+    extract_entities_batch = batch_entity_extraction_factory(projects.__getitem__)
+
+    in_process = list(extract_entities_batch(pairs, batch_size=3))
+    multi_process = list(extract_entities_batch(iter(pairs), batch_size=3, n_process=2))
+
+    assert len(multi_process) == len(pairs)
+    assert multi_process == in_process
+
+def test_entities_view_matches_model_dump(extract_entities):
+    """Test that passing the cached EntitiesView gives the same entities as the model_dump() dict."""
+    queries = load_queries_from_json("tests/fixtures/json_entity_files/clip_search.json")
+    available_entities = AvailableEntities(
+        project_id="project_123",
+        contributors={"john_id": "John", "david_id": "David", "sarah_id": "Sarah"},
+        locations={"beach_id": "Beach", "kitchen_id": "Kitchen"},
+        cameras={"sony_id": "Sony A7S", "canon_id": "Canon 5D"},
+        clip_types={"rush"},
+        shoot_dates={"2023-10-01"},
+        version="1"
+    )
+    view = AvailableEntitiesCache().get("project_123", "1", lambda: available_entities)
+
+    for query in queries:
+        assert extract_entities(query, view) == extract_entities(query, available_entities.model_dump())
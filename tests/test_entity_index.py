@@ -0,0 +1,146 @@
+import pytest
+from src.entity_index import (
+    AvailableEntitiesCache, EntityIndexCache, cached_entities_getter, compile_entity_index, entities_view,
+    normalise_name
+)
+from src.data_types import AvailableEntities
+
+
+@pytest.fixture
+def available_entities():
+    """Fixture with a small project catalogue, including a multi-word name and an alias."""
+    return AvailableEntities(
+        project_id="project_123",
+        contributors={
+            "john_id": "John",
+            "david_id": "David Smith",
+            "sarah_id": "Sarah"
+        },
+        locations={
+            "beach_id": "Beach",
+            "kitchen_id": "Kitchen"
+        },
+        cameras={
+            "sony_id": "Sony A7S",
+            "canon_id": "Canon 5D"
+        },
+        clip_types={"rush", "review"},
+        shoot_dates={"2023-10-01", "2023-10-02"},
+        aliases={"david_id": ["Dave"]},
+        version="1"
+    )
+
+def test_normalise_name():
+    """Test that case, punctuation, possessives and leading articles are normalised away."""
+    assert normalise_name("The Beach") == "beach"
+    assert normalise_name("  BEACH. ") == "beach"
+    assert normalise_name("John's") == "john"
+    assert normalise_name("Sony  A7S") == "sony a7s"
+    assert normalise_name("The") == "the"
+
+def test_index_resolves_names_and_aliases(available_entities):
+    """Test that multi-word names and aliases resolve to their ids."""
+    index = compile_entity_index(available_entities)
+
+    assert index.contributors[normalise_name("david smith")] == ("david_id",)
+    assert index.contributors[normalise_name("Dave")] == ("david_id",)
+    assert index.locations[normalise_name("the beach")] == ("beach_id",)
+    assert index.cameras[normalise_name("sony a7s")] == ("sony_id",)
+    assert normalise_name("David") not in index.contributors
+
+def test_index_accepts_plain_dicts(available_entities):
+    """Test that the plain dict form callers pass today compiles to the same index."""
+    assert compile_entity_index(available_entities.model_dump()) == compile_entity_index(available_entities)
+
+def test_cache_reuses_index_until_version_changes(available_entities):
+    """Test that the cache returns the same compiled index until the project version changes."""
+    cache = EntityIndexCache()
+    first = cache.get(available_entities)
+
+    assert cache.get(available_entities) is first
+
+    updated = available_entities.model_copy(update={
+        "contributors": {**available_entities.contributors, "maria_id": "Maria"},
+        "version": "2"
+    })
+    rebuilt = cache.get(updated)
+
+    assert rebuilt is not first
+    assert rebuilt.contributors["maria"] == ("maria_id",)
+
+def test_cache_reuses_unversioned_index_for_the_same_catalogue(available_entities):
+    """Test that an unversioned catalogue is cached on the object itself, not its content."""
+    cache = EntityIndexCache()
+    unversioned = available_entities.model_copy(update={"version": None}).model_dump()
+    first = cache.get(unversioned)
+
+    assert cache.get(unversioned) is first
+
+    # An equal copy is a different catalogue as far as the cache knows
+    copied = cache.get(dict(unversioned))
+    assert copied is not first and copied == first
+
+    unversioned["contributors"]["maria_id"] = "Maria"
+    cache.invalidate(unversioned["project_id"])
+    rebuilt = cache.get(unversioned)
+    assert rebuilt.contributors["maria"] == ("maria_id",)
+
+def test_cache_evicts_least_recently_used_project(available_entities):
+    """Test that the cache stays bounded across many projects."""
+    cache = EntityIndexCache(max_projects=2)
+    for project_id in ("a", "b", "c"):
+        cache.get(available_entities.model_copy(update={"project_id": project_id}))
+
+    assert list(cache._indexes) == ["b", "c"]
+
+def test_entities_view_is_read_only(available_entities):
+    """Test that the view round-trips, cannot be mutated and carries its compiled index."""
+    view = entities_view(available_entities)
+
+    assert view.to_available_entities() == available_entities
+    assert view.index == compile_entity_index(available_entities)
+    assert EntityIndexCache().get(view) is view.index
+    with pytest.raises(TypeError):
+        view.contributors["maria_id"] = "Maria"
+
+def test_entities_cache_loads_once_per_version(available_entities):
+    """Test that the loader only runs when the version changes, and the stats count hits."""
+    cache = AvailableEntitiesCache()
+    loads = []
+
+    def load():
+        loads.append(1)
+        return available_entities
+
+    first = cache.get("project_123", "1", load)
+    assert cache.get("project_123", "1", load) is first
+    assert cache.get("project_123", "2", load) is not first
+    assert len(loads) == 2
+    assert (cache.stats.hits, cache.stats.misses) == (1, 2)
+    assert cache.stats.hit_rate == pytest.approx(1 / 3)
+
+    # Unversioned entities are loaded every time
+    cache.get("project_123", None, load)
+    cache.get("project_123", None, load)
+    assert len(loads) == 4
+
+def test_entities_cache_hits_when_loader_has_no_version(available_entities):
+    """Test that entries are matched on the version they were cached under, not the loaded one."""
+    cache = AvailableEntitiesCache()
+    unversioned = available_entities.model_copy(update={"version": None})
+    get_entities = cached_entities_getter(lambda project_id: unversioned, lambda project_id: "7", cache)
+    first = get_entities("project_123")
+    for _ in range(4):
+        assert get_entities("project_123") is first
+    assert (cache.stats.hits, cache.stats.misses) == (4, 1)
+
+def test_entities_cache_evicts_least_recently_used(available_entities):
+    """Test that the cache stays bounded across many projects and counts evictions."""
+    cache = AvailableEntitiesCache(max_projects=2)
+    get_entities = cached_entities_getter(lambda project_id: available_entities, lambda project_id: "1", cache)
+    for project_id in ("a", "b", "a", "c"):
+        get_entities(project_id)
+
+    assert list(cache._views) == ["a", "c"]
+    assert cache.stats.evictions == 1
+    assert cache.stats.entries == 2
@@ -0,0 +1,87 @@
+import random
+from src.fuzzy import FuzzyMatcher, brute_force_best, edit_distance
+from src.entity_index import compile_entity_index
+from src.extract_entities import link_entities
+from src.data_types import AvailableEntities
+
+def reference_distance(a, b):
+    """Full-table optimal string alignment distance."""
+    table = [[i + j if i * j == 0 else 0 for j in range(len(b) + 1)] for i in range(len(a) + 1)]
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            table[i][j] = min(table[i - 1][j] + 1, table[i][j - 1] + 1,
+                              table[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                table[i][j] = min(table[i][j], table[i - 2][j - 2] + 1)
+    return table[-1][-1]
+
+def test_edit_distance_matches_reference():
+    """Test the banded, capped distance against the full table on random short strings."""
+    rng = random.Random(0)
+    for _ in range(5000):
+        a = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+        b = "".join(rng.choice("abc") for _ in range(rng.randint(0, 7)))
+        cap = rng.randint(0, 3)
+        assert edit_distance(a, b, cap) == min(reference_distance(a, b), cap + 1)
+
+def test_matcher_agrees_with_brute_force():
+    """Test that the trigram candidates never miss the closest name a full scan finds."""
+    rng = random.Random(1)
+    names = ["".join(rng.choice("abcdefghij ") for _ in range(rng.randint(4, 14))).strip() for _ in range(2000)]
+    matcher = FuzzyMatcher(names)
+    for _ in range(300):
+        query = list(rng.choice(matcher.names))
+        for _ in range(rng.randint(0, 2)):
+            position = rng.randrange(len(query) - 1)
+            if rng.random() < 0.5:
+                query[position] = rng.choice("abcdefghij")
+            else:
+                query[position], query[position + 1] = query[position + 1], query[position]
+        query = "".join(query)
+        expected, found = brute_force_best(matcher.names, query), matcher.best(query)
+        assert (found and found.distance) == (expected and expected.distance)
+
+def test_matcher_scores_and_limits():
+    """Test scores, the length-based typo allowance and misses."""
+    matcher = FuzzyMatcher(["sony a7s", "canon 5d", "david", "jon"])
+    assert matcher.best("sony a7sii") == ("sony a7s", 2, 0.8)
+    assert matcher.best("davdi").name == "david"
+    # Names of three characters or fewer must match exactly
+    assert matcher.best("jan") is None
+    assert matcher.best("completely different") is None
+
+def test_link_entities_falls_back_to_fuzzy():
+    """Test that misspelt spans link to the closest entity with a score below 1.0."""
+    index = compile_entity_index(AvailableEntities(
+        project_id="project_123",
+        contributors={"john_id": "John", "david_id": "David"},
+        locations={"beach_id": "Beach", "kitchen_id": "Kitchen"},
+        cameras={"sony_id": "Sony A7S"},
+        clip_types={"rush"},
+        shoot_dates=set()
+    ))
+    spans = [("CONTRIBUTOR", "Davdi"), ("CONTRIBUTOR", "John"), ("LOCATION", "the Kitchn"), ("CAMERA", "sony a7sii")]
+
+    result = link_entities(spans, index)
+    assert result.entities["contributors"] == ["david_id", "john_id"]
+    assert result.entities["locations"] == ["kitchen_id"]
+    assert result.entities["cameras"] == ["sony_id"]
+    assert result.scores["john_id"] == 1.0
+    assert 0.0 < result.scores["david_id"] < 1.0
+
+    exact_only = link_entities(spans, index, fuzzy=False)
+    assert exact_only.entities["contributors"] == ["john_id"]
+    assert exact_only.entities["locations"] == []
+    assert exact_only.entities["cameras"] == []
+
+def test_fuzzy_matchers_are_built_on_first_miss():
+    """Test that exact matches never build a trigram matcher, and a miss builds only its field's."""
+    index = compile_entity_index({"contributors": {"john_id": "John"}, "locations": {"beach_id": "Beach"}})
+    link_entities([("CONTRIBUTOR", "John")], index)
+    assert dict(index.fuzzy) == {}
+
+    link_entities([("CONTRIBUTOR", "Jonh")], index)
+    matcher = index.fuzzy["contributors"]
+    assert list(index.fuzzy) == ["contributors"]
+    link_entities([("CONTRIBUTOR", "Jhon")], index)
+    assert index.fuzzy["contributors"] is matcher
@@ -0,0 +1,67 @@
+import json
+import spacy
+from spacy.tokens import DocBin
+from src.corpus import ShardedCorpus, load_manifest
+from training.entity_recognition.generate_offsets import OffsetMatcher, generate_offsets, write_offsets
+
+SENTENCES = [
+    ("Shot on the Sony A7S.", [("Sony A7S", "CAMERA")]),
+    ("John and Johnny met at the beach", [("John", "CONTRIBUTOR"), ("Beach", "LOCATION")]),
+    ("Sarah Jones filmed Sarah at the Kitchen, twice.", [("Sarah Jones", "CONTRIBUTOR"), ("Sarah", "CONTRIBUTOR"),
+                                                        ("Kitchen", "LOCATION")]),
+    ("Nothing annotated here", []),
+]
+
+def entities(record):
+    return [(record["text"][start:end], label) for start, end, label in record["entities"]]
+
+def test_multi_word_names_before_punctuation():
+    """Test that a name ending inside a token ("A7S.") matches whole and gets an aligned span."""
+    (doc, spans), = OffsetMatcher().match([SENTENCES[0]])
+    assert [(span.text, span.label_) for span in spans] == [("Sony A7S", "CAMERA")]
+    assert [token.text for token in doc][-2:] == ["A7S", "."]
+    assert doc.text == SENTENCES[0][0]
+
+def test_whole_words_and_overlaps():
+    """Test that names only match whole words, case-insensitively, and the longest overlap wins."""
+    records = list(generate_offsets(SENTENCES[1:]))
+    assert entities(records[0]) == [("John", "CONTRIBUTOR"), ("beach", "LOCATION")]
+    assert entities(records[1]) == [("Sarah Jones", "CONTRIBUTOR"), ("Sarah", "CONTRIBUTOR"), ("Kitchen", "LOCATION")]
+    assert records[2] == {"text": "Nothing annotated here", "entities": []}
+
+def test_processes_keep_input_order():
+    """Test that worker processes produce the same records, in order, as a single process."""
+    sentences = SENTENCES * 5
+    expected = list(generate_offsets(sentences))
+    assert list(generate_offsets(sentences, processes=2, chunk_size=3)) == expected
+
+    nlp = spacy.blank("en")
+    docs = [doc for data in generate_offsets(sentences, processes=2, chunk_size=3, as_doc_bin=True)
+            for doc in DocBin().from_bytes(data).get_docs(nlp.vocab)]
+    assert [[(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents] for doc in docs] == \
+        [[tuple(entity) for entity in record["entities"]] for record in expected]
+
+def test_write_offsets_formats(tmp_path):
+    """Test that JSONL and JSON outputs hold the same records."""
+    source = tmp_path / "sentences.jsonl"
+    source.write_text("".join(json.dumps({"text": text, "entities": [{"text": t, "label": l} for t, l in annotations]}) + "\n"
+                              for text, annotations in SENTENCES))
+    assert write_offsets(str(source), str(tmp_path / "out.jsonl")) == 4
+    assert write_offsets(str(source), str(tmp_path / "out.json")) == 4
+    lines = [json.loads(line) for line in (tmp_path / "out.jsonl").read_text().splitlines()]
+    assert lines == json.loads((tmp_path / "out.json").read_text())
+    assert entities(lines[0]) == [("Sony A7S", "CAMERA")]
+
+def test_write_offsets_corpus_shards(tmp_path):
+    """Test that DocBin output is written one shard per chunk, readable as a sharded corpus."""
+    source = tmp_path / "sentences.jsonl"
+    source.write_text("".join(json.dumps({"text": text, "entities": [{"text": t, "label": l} for t, l in annotations]}) + "\n"
+                              for text, annotations in SENTENCES))
+    corpus_dir = tmp_path / "corpus"
+    assert write_offsets(str(source), str(corpus_dir), chunk_size=3) == 4
+
+    manifest = load_manifest(str(corpus_dir))
+    assert [(shard["path"], shard["count"]) for shard in manifest["shards"]] == \
+        [("shard-00000.spacy", 3), ("shard-00001.spacy", 1)]
+    examples = list(ShardedCorpus(str(corpus_dir)).train_examples(spacy.blank("en")))
+    assert sorted(example.reference.text for example in examples) == sorted(text for text, _ in SENTENCES)
@@ -0,0 +1,28 @@
+from benchmarks.harness import compare, flatten
+
+BASELINE = {
+    "intent": {"cold_start_seconds": 1.0, "requests": 100, "latency_ms": {"p50": 2.0, "p95": 4.0},
+               "throughput_per_second": 500.0},
+    "ollama": {"concurrency": 8, "latency_ms": {"p50": 20.0}, "throughput_per_second": 100.0},
+}
+
+def test_flatten():
+    """Test that nested results become dotted numeric metrics."""
+    assert flatten({"intent": {"latency_ms": {"p95": 1.5}, "note": "x", "ok": True}}) == {"intent.latency_ms.p95": 1.5}
+
+def test_compare_flags_regressions_beyond_tolerance():
+    """Test that slower latencies and lower throughput fail, within-noise changes do not."""
+    results = {
+        "intent": {"cold_start_seconds": 1.1, "requests": 50, "latency_ms": {"p50": 2.4, "p95": 9.0},
+                   "throughput_per_second": 300.0},
+        "ollama": {"concurrency": 32, "latency_ms": {"p50": 21.0}, "throughput_per_second": 120.0},
+    }
+    regressions = compare(results, BASELINE, tolerance=0.25, noise_floor_ms=1.0)
+    assert [line.split(":")[0] for line in regressions] == ["intent.latency_ms.p95", "intent.throughput_per_second"]
+
+def test_compare_fails_on_skipped_baseline_component():
+    """Test that a component in the baseline that this run skipped fails the gate."""
+    results = {"ollama": BASELINE["ollama"]}
+    assert compare(results, BASELINE, 0.25) == []
+    regressions = compare(results, BASELINE, 0.25, skipped={"intent": "model not found", "entities": "model not found"})
+    assert regressions == ["intent: skipped (model not found)"]
@@ -2,7 +2,7 @@ import sys
 import os
 import pytest
 import json
-from src.intent import intent_recognition
+from src.intent import intent_recognition, batch_intent_recognition
 from src.data_types import AgentType
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -80,3 +80,18 @@ def test_query_selects_multi_agent(detect_agent):
             assert AgentType.PRODUCTION in agent_result.agents, f"Query '{query}' did not select the PRODUCTION agent."
             assert AgentType.TV_POST_PRODUCTION in agent_result.agents, f"Query '{query}' did not select the TV_POST_PRODUCTION agent."
 
+
+def test_batch_matches_single_query_results(detect_agent):
+    """Test that detect_agents_batch returns the same agents as detect_agent, in input order."""
+    detect_agents_batch = batch_intent_recognition()
+    queries = load_queries_from_json("tests/fixtures/json_intent_files/multi_agent_queries.json")
+
+    batch_result = detect_agents_batch(queries, batch_size=4)
+
+    assert len(batch_result) == len(queries)
+    for query, agent_result in zip(queries, batch_result.to_agent_results()):
+        expected = detect_agent(query)
+        assert agent_result.text == query
+        assert agent_result.agents == expected.agents, f"Query '{query}' selected different agents in batch mode."
+        for agent, probability in expected.all_scores.items():
+            assert agent_result.all_scores[agent] == pytest.approx(probability, abs=1e-5)
@@ -0,0 +1,55 @@
+import datetime
+from src.data_types import ConversationMemory, LLMRequest, LLMResponse, TVRequest, TVResponse
+from src.memory import ConversationMemoryManager, estimate_tokens, format_turn
+
+def make_turn(query, answer):
+    return TVResponse(generated_at=datetime.datetime.now().isoformat(),
+                      request=TVRequest(query=query, prompt=query, as_json=True),
+                      raw_response={"Answer": answer}, model_name="fake", model_provider="fake", time_in_seconds=0.1)
+
+def test_token_count_is_updated_incrementally():
+    """Test that each appended turn adds its own tokens to the running total."""
+    manager = ConversationMemoryManager(budget_tokens=10_000)
+    turns = [make_turn(f"Question {i}?", "An answer. With detail.") for i in range(3)]
+    for turn in turns:
+        manager.append(turn)
+
+    expected = [estimate_tokens(format_turn(turn)) for turn in turns]
+    assert manager.memory.turn_tokens == expected
+    assert manager.token_count == sum(expected)
+    assert manager.context() == "\n\n".join(format_turn(turn) for turn in turns)
+
+def test_oldest_turns_are_summarised_when_over_budget():
+    """Test that eviction keeps the total within budget and replaces old turns with summary lines."""
+    manager = ConversationMemoryManager(budget_tokens=120, summary_budget_tokens=40)
+    for i in range(20):
+        manager.append(make_turn(f"How do I grade shot {i}?", f"Use a LUT for shot {i}. " + "More detail. " * 5))
+        assert manager.token_count <= 120
+
+    assert manager.evicted > 0
+    assert manager.memory.history[-1].request.query == "How do I grade shot 19?"
+    assert manager.memory.summary[-1] == f"- How do I grade shot {19 - len(manager)}? -> Use a LUT for shot {19 - len(manager)}."
+    assert manager.memory.summary_tokens <= 40
+    assert manager.token_count == sum(manager.memory.turn_tokens) + manager.memory.summary_tokens
+    context = manager.context()
+    assert context.startswith("Earlier in this conversation:\n- ")
+    assert context.endswith(format_turn(manager.memory.history[-1]))
+
+def test_latest_turn_is_kept_even_if_over_budget():
+    """Test that min_turns recent turns are never evicted."""
+    manager = ConversationMemoryManager(budget_tokens=5)
+    manager.append(make_turn("A long question about audio sync", "A long answer about audio sync."))
+
+    assert len(manager) == 1 and manager.memory.summary == []
+
+def test_loaded_memory_is_counted_once_and_trimmed():
+    """Test that a memory without accounting is counted and trimmed on construction."""
+    history = [LLMResponse(generated_at="now", agents=None, search_result=None,
+                           request=LLMRequest(query=f"q{i}", prompt="p", as_json=False),
+                           raw_response=f"plain answer {i}", model_name="fake", model_provider="fake",
+                           time_in_seconds=0.1) for i in range(10)]
+    manager = ConversationMemoryManager(ConversationMemory(history=history, token_limit=30))
+
+    assert manager.token_count <= 30
+    assert manager.memory.history[-1].request.query == "q9"
+    assert "Assistant: plain answer 9" in manager.context()
@@ -0,0 +1,37 @@
+from src.metrics import MetricsRegistry, percentile
+
+
+def test_percentile_nearest_rank():
+    """Test nearest-rank percentiles, including the empty case."""
+    values = [0.1 * i for i in range(1, 101)]
+    assert percentile(values, 50) == values[49]
+    assert percentile(values, 99) == values[98]
+    assert percentile([], 50) is None
+
+def test_counters_and_gauges_by_label():
+    """Test that series with different labels are kept apart."""
+    registry = MetricsRegistry()
+    registry.inc("requests_total", labels={"model": "a"})
+    registry.inc("requests_total", 2, labels={"model": "a"})
+    registry.inc("requests_total", labels={"model": "b"})
+    registry.set("queue_depth", 4)
+    registry.add("queue_depth", -1)
+
+    assert registry.get("requests_total", {"model": "a"}) == 3
+    assert registry.get("requests_total", {"model": "b"}) == 1
+    assert registry.get("queue_depth") == 3
+
+def test_histogram_renders_cumulative_buckets():
+    """Test the Prometheus exposition of a histogram."""
+    registry = MetricsRegistry()
+    registry.describe("latency_seconds", "histogram", "Request latency", buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 2.0):
+        registry.observe("latency_seconds", value)
+
+    text = registry.render()
+
+    assert "# TYPE latency_seconds histogram" in text
+    assert 'latency_seconds_bucket{le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{le="1.0"} 3' in text
+    assert 'latency_seconds_bucket{le="+Inf"} 4' in text
+    assert "latency_seconds_count 4" in text
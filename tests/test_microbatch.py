@@ -0,0 +1,87 @@
+import asyncio
+import threading
+from src.microbatch import MicroBatcher
+
+
+def test_concurrent_callers_share_one_batch():
+    """Test that concurrent submissions are grouped and each caller gets its own result."""
+    batches = []
+
+    def double(items):
+        batches.append(list(items))
+        return [item * 2 for item in items]
+
+    async def main():
+        batcher = MicroBatcher(double, max_batch_size=8, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.aclose()
+        return results
+
+    assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+def test_batches_are_capped_at_max_batch_size():
+    """Test that a burst larger than max_batch_size is split."""
+    batches = []
+
+    def identity(items):
+        batches.append(len(items))
+        return list(items)
+
+    async def main():
+        batcher = MicroBatcher(identity, max_batch_size=3, max_wait_ms=20)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(7)))
+        await batcher.aclose()
+        return results
+
+    assert asyncio.run(main()) == list(range(7))
+    assert batches == [3, 3, 1]
+
+def test_batch_errors_reach_every_caller():
+    """Test that an exception in the batch function is raised to each waiting caller."""
+    def fail(items):
+        raise ValueError("model not loaded")
+
+    async def main():
+        batcher = MicroBatcher(fail, max_wait_ms=5)
+        results = await asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True)
+        await batcher.aclose()
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_wrong_result_count_fails_every_caller():
+    """Test that a batch function returning too few results fails the whole batch instead of hanging."""
+    async def main():
+        batcher = MicroBatcher(lambda items: items[:-1], max_wait_ms=5)
+        results = await asyncio.wait_for(asyncio.gather(batcher.submit(1), batcher.submit(2), return_exceptions=True), 1)
+        await batcher.aclose()
+        return results
+
+    results = asyncio.run(main())
+
+    assert all(isinstance(result, ValueError) for result in results)
+
+def test_aclose_fails_pending_callers():
+    """Test that closing the batcher fails callers whose items are running or still queued."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(items):
+        started.set()
+        release.wait(1)
+        return list(items)
+
+    async def main():
+        batcher = MicroBatcher(slow, max_batch_size=1, max_wait_ms=0)
+        calls = [asyncio.ensure_future(batcher.submit(i)) for i in range(3)]
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 1)
+        await batcher.aclose()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(*calls, return_exceptions=True), 1)
+
+    results = asyncio.run(main())
+
+    assert len(results) == 3 and all(isinstance(result, RuntimeError) for result in results)
@@ -0,0 +1,64 @@
+import threading
+import numpy as np
+import spacy
+from src.models import ModelRegistry
+
+def save_model(path, component, vectors_seed):
+    """A tiny untrained pipeline whose tok2vec reads a 10-word static vector table."""
+    nlp = spacy.blank("en")
+    table = np.random.default_rng(vectors_seed).random((10, 8), dtype=np.float32)
+    for row, word in enumerate(["john", "david", "beach", "kitchen", "rush", "review", "clips", "find", "show", "me"]):
+        nlp.vocab.set_vector(word, table[row])
+    nlp.add_pipe("tok2vec", config={"model": {"@architectures": "spacy.HashEmbedCNN.v2", "width": 8, "depth": 1,
+                                              "embed_size": 100, "window_size": 1, "maxout_pieces": 2,
+                                              "subword_features": True, "pretrained_vectors": True}})
+    pipe = nlp.add_pipe(component)
+    pipe.add_label("PRODUCTION" if component == "textcat_multilabel" else "CONTRIBUTOR")
+    nlp.initialize()
+    nlp.to_disk(path)
+    return str(path)
+
+def test_pipelines_share_one_vocab(tmp_path):
+    """Test that models with the same vectors load once each, against a single Vocab."""
+    intent_path = save_model(tmp_path / "intent", "textcat_multilabel", vectors_seed=0)
+    ner_path = save_model(tmp_path / "ner", "ner", vectors_seed=0)
+    registry = ModelRegistry()
+
+    intent = registry.get(intent_path, "textcat_multilabel")
+    ner = registry.get(ner_path, "ner")
+    assert intent.vocab is ner.vocab is registry.vocab
+    assert registry.get(ner_path, "ner") is ner
+    assert [stats.shared_vocab for stats in registry.stats()] == [True, True]
+
+    # Strings each pipeline adds are visible to the other, and the vectors were not reloaded
+    ner("Find clips of Zanzibar")
+    assert "Zanzibar" in intent.vocab.strings
+    separate = spacy.load(ner_path)
+    assert ner.vocab.vectors.shape == separate.vocab.vectors.shape
+    assert np.allclose(ner("show me john at the beach").tensor, separate("show me john at the beach").tensor)
+
+def test_different_vectors_get_their_own_vocab(tmp_path):
+    """Test that a model whose static vectors differ is not loaded into the shared Vocab."""
+    intent_path = save_model(tmp_path / "intent", "textcat_multilabel", vectors_seed=0)
+    ner_path = save_model(tmp_path / "ner", "ner", vectors_seed=1)
+    registry = ModelRegistry()
+
+    intent = registry.get(intent_path, "textcat_multilabel")
+    ner = registry.get(ner_path, "ner")
+    assert intent.vocab is not ner.vocab
+    assert not np.allclose(intent.vocab.get_vector("john"), ner.vocab.get_vector("john"))
+    assert [stats.shared_vocab for stats in registry.stats()] == [True, False]
+
+def test_concurrent_gets_load_once(tmp_path):
+    """Test that threads asking for the same model at once all receive one instance."""
+    ner_path = save_model(tmp_path / "ner", "ner", vectors_seed=0)
+    registry = ModelRegistry()
+    results = []
+
+    threads = [threading.Thread(target=lambda: results.append(registry.get(ner_path, "ner"))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(results) == 8 and all(nlp is results[0] for nlp in results)
+    assert len(registry.stats()) == 1
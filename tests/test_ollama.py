@@ -0,0 +1,132 @@
+import asyncio
+from benchmarks.ollama_stub import start_stub
+from src.ollama import create_ollama_client, make_ollama_request
+from src.metrics import MetricsRegistry
+from src.prompt import create_prompt_parts
+from src.data_types import TVRequest
+
+
+def run_with_stub(scenario, **settings):
+    """Run an async scenario against a fresh local stand-in server."""
+    async def main():
+        runner, url = await start_stub(**settings)
+        try:
+            return await scenario(url)
+        finally:
+            await runner.cleanup()
+    return asyncio.run(main())
+
+def test_client_reuses_pooled_session():
+    """Test that consecutive generations share one session and parse the JSON answer."""
+    async def scenario(url):
+        async with create_ollama_client("tv_model:latest", url=url) as client:
+            request = TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True)
+            first = await client(request)
+            session = client._session
+            second = await client(request)
+            assert client._session is session
+            return first, second
+
+    first, second = run_with_stub(scenario, tokens=3)
+
+    assert first.raw_response == {"Answer": "token token token"}
+    assert second.raw_response == first.raw_response
+
+def test_client_closes_session_on_exit():
+    """Test that leaving the context manager closes the pooled session."""
+    async def scenario(url):
+        async with create_ollama_client("tv_model:latest", url=url) as client:
+            session = client._session
+        return session, client
+
+    session, client = run_with_stub(scenario)
+
+    assert session.closed
+    assert client._session is None
+
+def test_on_chunk_receives_decoded_answer_text():
+    """Test that JSON generations stream the answer text, not raw JSON fragments, to on_chunk."""
+    received = []
+
+    async def scenario(url):
+        async with create_ollama_client("tv_model:latest", url=url) as client:
+            request = TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True)
+            return await client(request, on_chunk=received.append)
+
+    response = run_with_stub(scenario, tokens=4)
+
+    assert "".join(received) == response.raw_response["Answer"] == "token token token token"
+    assert len(received) > 1
+
+def test_warm_prefix_limits_prefill_to_the_query():
+    """Test that after warming the system prompt only the per-query tokens are prefilled."""
+    async def scenario(url):
+        system, user = create_prompt_parts("What is ADR?")
+        async with create_ollama_client("tv_model:latest", url=url, keep_alive="5m") as client:
+            cold = await client.warm_prefix(system)
+            warm = {}
+            async for _ in make_ollama_request(url, "tv_model:latest", user, None, client._session,
+                                               system=system, on_done=warm.update):
+                pass
+        return cold, warm, len(user.split())
+
+    cold, warm, user_tokens = run_with_stub(scenario)
+
+    assert cold["prompt_eval_count"] > user_tokens
+    assert warm["prompt_eval_count"] <= user_tokens
+
+def test_generation_metrics_are_attached_and_recorded():
+    """Test that responses carry timing metrics and the registry records them per model."""
+    registry = MetricsRegistry()
+
+    async def scenario(url):
+        async with create_ollama_client("tv_model:latest", url=url, registry=registry) as client:
+            return await client(TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True))
+
+    response = run_with_stub(scenario, tokens=10, token_delay=0.001, prefill_delay=0.0001)
+    metrics = response.metrics
+
+    assert metrics.time_to_first_token >= metrics.connect_seconds > 0
+    assert metrics.chunk_count > 1 and metrics.inter_token_p50 is not None
+    assert metrics.prompt_eval_count == 3 and metrics.prompt_eval_seconds > 0
+    assert metrics.eval_count == metrics.chunk_count
+    assert registry.get("ollama_generations_total", {"model": "tv_model:latest", "status": "ok"}) == 1
+    assert registry.get("ollama_prompt_tokens_total", {"model": "tv_model:latest"}) == 3
+    assert 'ollama_time_to_first_token_seconds_count{model="tv_model:latest"} 1' in registry.render()
+
+def test_stub_keeps_models_resident_for_keep_alive():
+    """Test that the stand-in only pays the load delay when the model is not resident."""
+    async def scenario(url):
+        loads = []
+        async with create_ollama_client("tv_model:latest", url=url, keep_alive="5m") as resident, \
+                create_ollama_client("tv_model:latest", url=url, keep_alive="0") as unloading:
+            request = TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True)
+            for client in (resident, resident, unloading, resident):
+                response = await client(request)
+                loads.append(response.metrics.load_seconds)
+        return loads
+
+    # Loaded once, reused, reused then unloaded (keep_alive 0), so the last request loads again
+    assert run_with_stub(scenario, load_delay=0.05) == [0.05, 0.0, 0.0, 0.05]
+
+def test_stub_loads_once_under_concurrent_requests():
+    """Test that concurrent first requests share one model load and queue for parallel slots."""
+    async def scenario(url):
+        async with create_ollama_client("tv_model:latest", url=url) as client:
+            request = TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True)
+            return await asyncio.gather(*(client(request) for _ in range(4)))
+
+    responses = run_with_stub(scenario, load_delay=0.05, num_parallel=2, tokens=2)
+
+    assert sorted(response.metrics.load_seconds for response in responses) == [0.0, 0.0, 0.0, 0.05]
+    assert all(response.raw_response == {"Answer": "token token"} for response in responses)
+
+def test_stub_injects_errors():
+    """Test that injected failures and disconnects surface as error responses."""
+    async def scenario(url):
+        async with create_ollama_client("tv_model:latest", url=url) as client:
+            request = TVRequest(query="What is ADR?", prompt="What is ADR?", as_json=True)
+            return await client(request)
+
+    assert "error" in run_with_stub(scenario, error_rate=1.0).raw_response
+    assert "error" in run_with_stub(scenario, disconnect_rate=1.0, tokens=20).raw_response
@@ -6,7 +6,7 @@ import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.ollama import create_ollama_client
-from src.prompt import create_prompt as create_tv_prompt
+from src.prompt import create_prompt as create_tv_prompt, create_prompt_parts as create_tv_prompt_parts
 from src.data_types import LLMGenerateFn, TVRequest, TVResponse
 
 def parse_arguments():
@@ -20,26 +20,33 @@ def parse_arguments():
     parser.add_argument(
         "--model", type=str, help="The model to use for the query"
     )
+    parser.add_argument(
+        "--reuse-prefix", action="store_true", help="Send the static preamble as a reusable system prompt"
+    )
     
     return parser.parse_args()
 
-async def complete_prompt(query: str, model_name: str, provider: str) -> TVResponse:
+async def complete_prompt(query: str, model_name: str, provider: str, reuse_prefix: bool = False) -> TVResponse:
     if provider == "ollama":
-        generate_llm_response: LLMGenerateFn = create_ollama_client(model_name)
+        generate_llm_response: LLMGenerateFn = create_ollama_client(model_name, keep_alive="30m" if reuse_prefix else None)
     else:
         raise ValueError(f"Invalid provider: {provider}")
     
-    prompt = create_tv_prompt(query)
+    if reuse_prefix:
+        system, prompt = create_tv_prompt_parts(query)
+    else:
+        system, prompt = None, create_tv_prompt(query)
 
-    llm_response: TVResponse = await generate_llm_response(
-        llm_request=TVRequest(query=query, prompt=prompt, as_json=True)
-    )
+    async with generate_llm_response:
+        llm_response: TVResponse = await generate_llm_response(
+            llm_request=TVRequest(query=query, prompt=prompt, as_json=True, system=system)
+        )
     return llm_response
 
 async def main():
     args = parse_arguments()
     llm_response: TVResponse = await complete_prompt(
-        query=args.query, model_name=args.model, provider=args.provider
+        query=args.query, model_name=args.model, provider=args.provider, reuse_prefix=args.reuse_prefix
     )
 
     # Save response to a file in the root of the tmp directory
@@ -0,0 +1,102 @@
+import asyncio
+import datetime
+from src.response_cache import create_cached_client, normalise_query
+from src.data_types import TVRequest, TVResponse
+
+
+class FakeClient:
+    """Stands in for the Ollama client: streams two chunks and counts generations."""
+    model_name = "tv_model:latest"
+
+    def __init__(self, raw_response=None):
+        self.calls = 0
+        self.raw_response = raw_response
+
+    async def __call__(self, llm_request, on_chunk=None, json_response=True):
+        self.calls += 1
+        for chunk in ("ADR is ", "dialogue replacement"):
+            if on_chunk:
+                on_chunk(chunk)
+        return TVResponse(
+            generated_at=datetime.datetime.now().isoformat(),
+            request=llm_request,
+            raw_response=self.raw_response or {"Answer": "ADR is dialogue replacement"},
+            model_name=self.model_name,
+            model_provider="ollama",
+            time_in_seconds=1.5
+        )
+
+def ask(client, query, on_chunk=None):
+    return asyncio.run(client(TVRequest(query=query, prompt=query, as_json=True), on_chunk=on_chunk))
+
+def test_normalise_query():
+    """Test that case, spacing and trailing punctuation do not change the cache key."""
+    assert normalise_query("  What is   ADR?? ") == normalise_query("what is adr") == "what is adr"
+
+def test_hit_replays_stream_and_skips_generation(tmp_path):
+    """Test that a normalised-identical question is served from disk with the same chunks."""
+    fake = FakeClient()
+    client = create_cached_client(fake, str(tmp_path))
+    ask(client, "What is ADR?")
+
+    received = []
+    response = ask(client, "what is adr", on_chunk=received.append)
+
+    assert fake.calls == 1
+    assert received == ["ADR is ", "dialogue replacement"]
+    assert response.raw_response == {"Answer": "ADR is dialogue replacement"}
+    assert response.request.query == "what is adr"
+    assert (client.stats.hits, client.stats.misses) == (1, 1)
+
+def test_entries_survive_restart(tmp_path):
+    """Test that a new cache over the same directory serves earlier generations."""
+    ask(create_cached_client(FakeClient(), str(tmp_path)), "What is ADR?")
+
+    fake = FakeClient()
+    ask(create_cached_client(fake, str(tmp_path)), "What is ADR?")
+
+    assert fake.calls == 0
+
+def test_lru_eviction_by_entry_count(tmp_path):
+    """Test that the least recently used entry is evicted first."""
+    fake = FakeClient()
+    client = create_cached_client(fake, str(tmp_path), max_entries=2)
+    ask(client, "first")
+    ask(client, "second")
+    ask(client, "first")
+    ask(client, "third")
+
+    ask(client, "first")
+    assert fake.calls == 3
+    ask(client, "second")
+    assert fake.calls == 4
+    assert client.stats.evictions >= 1
+
+def test_expired_entries_are_regenerated(tmp_path):
+    """Test that entries older than the TTL are treated as misses."""
+    fake = FakeClient()
+    client = create_cached_client(fake, str(tmp_path), ttl_seconds=0)
+    ask(client, "What is ADR?")
+    ask(client, "What is ADR?")
+
+    assert fake.calls == 2
+    assert client.stats.expirations == 1
+
+def test_errors_are_not_cached(tmp_path):
+    """Test that failed generations are retried rather than replayed."""
+    fake = FakeClient({"error": "connection refused"})
+    client = create_cached_client(fake, str(tmp_path))
+    ask(client, "What is ADR?")
+    ask(client, "What is ADR?")
+
+    assert fake.calls == 2
+
+def test_unparsed_answers_are_not_cached(tmp_path):
+    """Test that an answer the client could not parse as JSON is regenerated, not replayed."""
+    fake = FakeClient({"raw_text": "ADR is {dialogue"})
+    client = create_cached_client(fake, str(tmp_path))
+    ask(client, "What is ADR?")
+    ask(client, "What is ADR?")
+
+    assert fake.calls == 2
+    assert client.stats.entries == 0
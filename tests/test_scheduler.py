@@ -0,0 +1,105 @@
+import asyncio
+import datetime
+import pytest
+from src.scheduler import create_scheduled_client
+from src.metrics import MetricsRegistry
+from src.data_types import QueueFullError, QueueTimeoutError, RequestPriority, TVRequest, TVResponse
+
+
+class SlowClient:
+    """Fake LLM client that takes a fixed time per generation and records start order."""
+    model_name = "tv_model:latest"
+
+    def __init__(self, seconds=0.01):
+        self.seconds = seconds
+        self.started = []
+        self.running = 0
+        self.max_running = 0
+
+    async def __call__(self, llm_request, on_chunk=None, json_response=True):
+        self.started.append(llm_request.query)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        await asyncio.sleep(self.seconds)
+        self.running -= 1
+        return TVResponse(
+            generated_at=datetime.datetime.now().isoformat(),
+            request=llm_request,
+            raw_response={"Answer": llm_request.query},
+            model_name=self.model_name,
+            model_provider="ollama",
+            time_in_seconds=self.seconds
+        )
+
+def request(query):
+    return TVRequest(query=query, prompt=query, as_json=True)
+
+def test_in_flight_generations_are_bounded():
+    """Test that no more than max_in_flight generations run at once."""
+    fake = SlowClient()
+    scheduler = create_scheduled_client(fake, max_in_flight=2, registry=MetricsRegistry())
+
+    async def main():
+        return await asyncio.gather(*(scheduler(request(str(i))) for i in range(8)))
+
+    responses = asyncio.run(main())
+
+    assert fake.max_running == 2
+    assert [r.raw_response["Answer"] for r in responses] == [str(i) for i in range(8)]
+
+def test_interactive_requests_overtake_queued_batch_work():
+    """Test that interactive requests are served ahead of batch ones, without starving batch."""
+    fake = SlowClient()
+    scheduler = create_scheduled_client(fake, max_in_flight=1, registry=MetricsRegistry(),
+                                        weights={RequestPriority.INTERACTIVE: 2, RequestPriority.BATCH: 1})
+
+    async def main():
+        first = asyncio.create_task(scheduler(request("running")))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(scheduler(request(f"batch-{i}"), priority=RequestPriority.BATCH)) for i in range(3)]
+        tasks += [asyncio.create_task(scheduler(request(f"interactive-{i}"))) for i in range(4)]
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(main())
+
+    assert fake.started == ["running", "interactive-0", "interactive-1", "batch-0",
+                            "interactive-2", "interactive-3", "batch-1", "batch-2"]
+
+def test_tenants_take_turns_within_a_class():
+    """Test that one tenant's burst does not block another tenant in the same class."""
+    fake = SlowClient()
+    scheduler = create_scheduled_client(fake, max_in_flight=1, registry=MetricsRegistry())
+
+    async def main():
+        first = asyncio.create_task(scheduler(request("running")))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(scheduler(request(f"a-{i}"), tenant="a")) for i in range(3)]
+        tasks.append(asyncio.create_task(scheduler(request("b-0"), tenant="b")))
+        await asyncio.gather(first, *tasks)
+
+    asyncio.run(main())
+
+    assert fake.started == ["running", "a-0", "b-0", "a-1", "a-2"]
+
+def test_queue_timeout_and_full_queue_are_reported():
+    """Test backpressure: waiting too long times out and a full queue rejects immediately."""
+    registry = MetricsRegistry()
+    scheduler = create_scheduled_client(SlowClient(seconds=0.2), max_in_flight=1, max_queue=1, registry=registry)
+
+    async def main():
+        running = asyncio.create_task(scheduler(request("running")))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(scheduler(request("waiting"), queue_timeout=0.01))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await scheduler(request("rejected"))
+        with pytest.raises(QueueTimeoutError):
+            await waiting
+        await running
+        assert scheduler.queue_depth == 0 and scheduler.in_flight == 0
+
+    asyncio.run(main())
+
+    labels = {"model": "tv_model:latest", "priority": "interactive"}
+    assert registry.get("llm_rejected_total", {**labels, "reason": "queue_full"}) == 1
+    assert registry.get("llm_rejected_total", {**labels, "reason": "timeout"}) == 1
@@ -0,0 +1,118 @@
+import json
+import os
+import pytest
+from src.search import create_search_api
+from src.data_types import (
+    ContributorFilter, LocationFilter, SearchFilters, SearchParams, SearchSubject
+)
+
+INDEXES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "training", "entity_recognition", "indexes")
+
+@pytest.fixture
+def search_api(tmp_path):
+    """Fixture with a small project index that includes per-clip records."""
+    project_dir = tmp_path / "project_1"
+    project_dir.mkdir()
+    index = {
+        "name": "project_1",
+        "contributors": [{"id": "john_id", "name": "John"}, {"id": "sarah_id", "name": "Sarah"}],
+        "locations": [{"id": "beach_id", "name": "Beach"}, {"id": "kitchen_id", "name": "Kitchen"}],
+        "cameras": [{"id": "red_id", "name": "RED"}],
+        "shoot_dates": ["2024-03-15", "2024-03-16"],
+        "clip_types": ["rush", "review"],
+        "clips": [
+            {"id": "c1", "duration": 100, "type": "rush", "shoot_date": "2024-03-15",
+             "contributors": ["john_id"], "locations": ["beach_id"], "cameras": ["red_id"], "spoke": ["john_id"]},
+            {"id": "c2", "duration": 200, "type": "rush", "shoot_date": "2024-03-15",
+             "contributors": ["john_id", "sarah_id"], "locations": ["kitchen_id"], "cameras": ["red_id"], "spoke": ["sarah_id"]},
+            {"id": "c3", "duration": 50, "type": "review", "shoot_date": "2024-03-16",
+             "contributors": ["sarah_id"], "locations": ["beach_id"], "cameras": []},
+        ]
+    }
+    (project_dir / "index.json").write_text(json.dumps(index))
+    return create_search_api(str(tmp_path), refresh_seconds=0)
+
+def search(api, subject, limit=None, offset=0, **filters):
+    return api.search(SearchParams(project_id="project_1", subject=subject, filters=SearchFilters(**filters),
+                                   limit=limit, offset=offset))
+
+def test_clip_filters(search_api):
+    """Test any/all matching within a field and AND across fields."""
+    assert [e.id for e in search(search_api, SearchSubject.CLIP, contributors=["john_id", "sarah_id"]).entities] == ["c1", "c2", "c3"]
+    all_of = ContributorFilter(contributors=["john_id", "sarah_id"], match_type="all")
+    assert [e.id for e in search(search_api, SearchSubject.CLIP, contributors=all_of).entities] == ["c2"]
+    assert [e.id for e in search(search_api, SearchSubject.CLIP, contributors=["sarah_id"],
+                                 locations=LocationFilter(locations=["beach_id"])).entities] == ["c3"]
+    assert search(search_api, SearchSubject.CLIP, clip_types=["review"]).entities[0].metadata == {
+        "type": "review", "shoot_date": "2024-03-16"
+    }
+    assert search(search_api, SearchSubject.CLIP, contributors=["unknown_id"]).total == 0
+
+def test_spoke_filter(search_api):
+    """Test that the spoke flag uses the speaking postings rather than all appearances."""
+    spoke = ContributorFilter(contributors=["john_id"], spoke=True)
+    assert [e.id for e in search(search_api, SearchSubject.CLIP, contributors=spoke).entities] == ["c1"]
+
+def test_pagination(search_api):
+    """Test that limit/offset page the entities while total counts every match."""
+    response = search(search_api, SearchSubject.CLIP, limit=1, offset=1)
+    assert [e.id for e in response.entities] == ["c2"]
+    assert response.total == 3
+
+def test_aggregations(search_api):
+    """Test per-entity durations and the summary over the matching clips."""
+    contributors = search(search_api, SearchSubject.CONTRIBUTOR, locations=["beach_id"])
+    assert [(e.id, e.duration, e.metadata["count"]) for e in contributors.entities] == [("john_id", 100, 1), ("sarah_id", 50, 1)]
+    assert contributors.entities[0].metadata["name"] == "John"
+
+    dates = search(search_api, SearchSubject.SHOOT_DATE)
+    assert [(e.id, e.duration) for e in dates.entities] == [("2024-03-15", 300), ("2024-03-16", 50)]
+
+    summary = search(search_api, SearchSubject.SUMMARY, contributors=["john_id"]).entities[0]
+    assert summary.duration == 300
+    assert summary.metadata["clip_count"] == 2
+
+def test_reindexes_on_change(search_api, tmp_path):
+    """Test that available entities carry the index version and pick up edits."""
+    path = tmp_path / "project_1" / "index.json"
+    first = search_api.get_available_entities("project_1")
+    assert first.version is not None
+    assert first.contributors["john_id"] == "John"
+
+    index = json.loads(path.read_text())
+    index["contributors"][0]["name"] = "Johnny"
+    path.write_text(json.dumps(index))
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 1_000_000))
+
+    second = search_api.get_available_entities("project_1")
+    assert second.version != first.version
+    assert second.contributors["john_id"] == "Johnny"
+
+def test_catalogue_only_index():
+    """Test the bundled index, which has catalogue totals but no per-clip records."""
+    api = create_search_api(INDEXES_DIR)
+    entities = api.get_available_entities("project_123")
+    assert entities.locations["beach_id"] == "Beach"
+
+    response = api.search(SearchParams(project_id="project_123", subject=SearchSubject.CONTRIBUTOR, filters=SearchFilters()))
+    assert response.total == 3
+    assert response.entities[0].duration == 16200
+
+    dates = api.search(SearchParams(project_id="project_123", subject=SearchSubject.SHOOT_DATE, filters=SearchFilters()))
+    assert [e.id for e in dates.entities][:2] == ["2024-03-15", "2024-03-16"]
+    assert all(e.type == SearchSubject.SHOOT_DATE for e in dates.entities)
+
+    # Per-entity totals cannot be narrowed without clip records
+    with pytest.raises(ValueError, match="cannot be filtered"):
+        api.search(SearchParams(project_id="project_123", subject=SearchSubject.LOCATION,
+                                filters=SearchFilters(contributors=["john_id"])))
+
+def test_catalogue_only_empty_subject(tmp_path):
+    """Test that an empty catalogue returns no entities rather than the shoot dates."""
+    project_dir = tmp_path / "project_1"
+    project_dir.mkdir()
+    (project_dir / "index.json").write_text(json.dumps({"name": "project_1", "contributors": [],
+                                                        "shoot_dates": ["2024-03-15"]}))
+    api = create_search_api(str(tmp_path))
+    assert search(api, SearchSubject.CONTRIBUTOR).entities == []
+    assert [e.id for e in search(api, SearchSubject.SHOOT_DATE).entities] == ["2024-03-15"]
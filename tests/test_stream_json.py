@@ -0,0 +1,46 @@
+import json
+import pytest
+from src.stream_json import AnswerStreamParser
+
+
+def feed_in_pieces(text, size):
+    """Feed text to a new parser in fixed-size chunks and return every delta it emitted."""
+    parser = AnswerStreamParser()
+    deltas = [parser.feed(text[i:i + size]) for i in range(0, len(text), size)]
+    deltas.append(parser.finish())
+    return deltas
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_answer_is_decoded_across_chunk_boundaries(size):
+    """Test that escapes, unicode and surrogate pairs decode however the stream is split."""
+    answer = 'Line one\nStep "1": use -24 LKFS \\ café ✓ 🎬 done'
+    text = json.dumps({"Answer": answer})
+
+    assert "".join(feed_in_pieces(text, size)) == answer
+
+def test_answer_streams_before_the_object_is_complete():
+    """Test that text is emitted as soon as it arrives rather than at the end."""
+    parser = AnswerStreamParser()
+
+    assert parser.feed('{"Ans') == ""
+    assert parser.feed('wer": "ADR is') == "ADR is"
+    assert parser.feed(' dialogue replacement') == " dialogue replacement"
+    assert parser.feed('"}') == ""
+
+def test_other_keys_and_nested_answers_are_ignored():
+    """Test that only the top-level answer field is streamed."""
+    text = json.dumps({"Notes": {"Answer": "nested"}, "Title": "x\"y", "Answer": "top level", "After": "ignored"})
+
+    assert "".join(feed_in_pieces(text, 4)) == "top level"
+
+def test_fenced_json_is_parsed():
+    """Test that a markdown code fence before the object is skipped."""
+    text = '```json\n' + json.dumps({"Answer": "fenced"}) + '\n```'
+
+    assert "".join(feed_in_pieces(text, 5)) == "fenced"
+
+def test_plain_text_is_passed_through():
+    """Test that output that is not a JSON object is streamed unchanged."""
+    text = "Sure! ADR stands for Automated Dialogue Replacement."
+
+    assert "".join(feed_in_pieces(text, 6)) == text
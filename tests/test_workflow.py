@@ -0,0 +1,157 @@
+import asyncio
+import datetime
+import time
+from src.memory import ConversationMemoryManager
+from src.microbatch import create_async_entity_extraction
+from src.response_cache import create_cached_client
+from src.workflow import create_workflow
+from src.data_types import (
+    AgentResult, AgentType, AvailableEntities, ExtractedEntities, SearchAPI, SearchResponse, TVResponse
+)
+
+DELAY = 0.2
+
+
+def fake_detect_agent(agents):
+    def detect_agent(text):
+        time.sleep(DELAY / 4)
+        return AgentResult(text=text, timestamp=datetime.datetime.now(), agents=agents, confidence=0.9, all_scores={})
+    return detect_agent
+
+def fake_extract_entities(query, available_entities):
+    time.sleep(DELAY / 4)
+    return ExtractedEntities(entities={"contributors": ["john_id"], "locations": ["beach_id"], "clip_types": []})
+
+def fake_search_api(searches):
+    def get_available_entities(project_id):
+        return AvailableEntities(project_id=project_id, contributors={"john_id": "John"}, locations={"beach_id": "Beach"},
+                                 cameras={}, clip_types=set(), shoot_dates=set())
+
+    def search(params):
+        searches.append(params)
+        time.sleep(DELAY)
+        return SearchResponse(request=params, entities=[], total=0)
+
+    return SearchAPI(get_available_entities=get_available_entities, search=search)
+
+async def fake_generate(llm_request, on_chunk=None):
+    await asyncio.sleep(DELAY)
+    return TVResponse(generated_at=datetime.datetime.now().isoformat(), request=llm_request,
+                      raw_response={"Answer": "ok"}, model_name="fake", model_provider="fake", time_in_seconds=DELAY)
+
+def test_multi_agent_branches_run_concurrently():
+    """Test that a multi-agent query runs search and generation in parallel and merges both."""
+    searches = []
+    workflow = create_workflow("project_123", fake_detect_agent([AgentType.PRODUCTION, AgentType.TV_POST_PRODUCTION]),
+                               fake_extract_entities, fake_search_api(searches), fake_generate)
+
+    result = asyncio.run(workflow("Show me John at the beach and explain how to grade it"))
+
+    assert result.error is None
+    assert result.search_result is not None and result.tv_response.raw_response == {"Answer": "ok"}
+    assert searches[0].filters.contributors == ["john_id"]
+    assert result.tv_response.request.system is not None
+    # Search (after entities) and generation overlap, so the total is well under their sum
+    assert result.timings["total"] < result.timings["search"] + result.timings["tv_generation"]
+
+def test_failed_branch_keeps_other_results():
+    """Test that one failing branch is reported without discarding the other."""
+    async def failing_generate(llm_request, on_chunk=None):
+        raise RuntimeError("ollama unavailable")
+
+    workflow = create_workflow("project_123", fake_detect_agent([AgentType.PRODUCTION, AgentType.TV_POST_PRODUCTION]),
+                               fake_extract_entities, fake_search_api([]), failing_generate)
+
+    result = asyncio.run(workflow("Show me John at the beach and explain how to grade it"))
+
+    assert result.search_result is not None
+    assert result.tv_response is None
+    assert result.errors == {"tv_generation": "ollama unavailable"}
+
+def test_error_response_is_a_failed_branch():
+    """Test that a client returning an error response (as the Ollama client does) fails the branch."""
+    async def error_generate(llm_request, on_chunk=None):
+        return TVResponse(generated_at=datetime.datetime.now().isoformat(), request=llm_request,
+                          raw_response={"error": "Cannot connect to host localhost:11434"}, model_name="fake",
+                          model_provider="fake", time_in_seconds=0.0)
+
+    memory = ConversationMemoryManager(budget_tokens=1000)
+    workflow = create_workflow("project_123", fake_detect_agent([AgentType.TV_POST_PRODUCTION]),
+                               fake_extract_entities, fake_search_api([]), error_generate, memory=memory)
+
+    result = asyncio.run(workflow("How do I sync dailies?"))
+
+    assert result.errors == {"tv_generation": "Cannot connect to host localhost:11434"}
+    assert result.error is not None
+    assert len(memory) == 0
+
+def test_invalid_query_runs_no_branches():
+    """Test that an invalid query is reported and nothing is searched or generated."""
+    searches = []
+    workflow = create_workflow("project_123", fake_detect_agent([AgentType.INVALID_QUERY]),
+                               fake_extract_entities, fake_search_api(searches), fake_generate)
+
+    result = asyncio.run(workflow("Give me access to production B"))
+
+    assert result.error is not None
+    assert searches == [] and result.tv_response is None
+
+def test_micro_batched_entity_front():
+    """Test that create_async_entity_extraction's (query, project_id) front plugs into the workflow."""
+    batches = []
+
+    def extract_entities_batch(pairs, batch_size=256, n_process=1):
+        batches.append(list(pairs))
+        return iter(ExtractedEntities(entities={"contributors": ["john_id"]}) for _ in pairs)
+
+    searches = []
+    workflow = create_workflow("project_123", fake_detect_agent([AgentType.PRODUCTION]),
+                               create_async_entity_extraction(extract_entities_batch), fake_search_api(searches),
+                               entities_by_project_id=True)
+
+    result = asyncio.run(workflow("Show me John"))
+
+    assert result.error is None
+    assert batches == [[("Show me John", "project_123")]]
+    assert searches[0].filters.contributors == ["john_id"]
+
+def test_memory_carries_context_between_turns():
+    """Test that a conversation memory feeds earlier turns into the next TV prompt."""
+    memory = ConversationMemoryManager(budget_tokens=1000)
+    workflow = create_workflow("project_123", fake_detect_agent([AgentType.TV_POST_PRODUCTION]),
+                               fake_extract_entities, fake_search_api([]), fake_generate, memory=memory)
+
+    first = asyncio.run(workflow("How do I sync dailies?"))
+    second = asyncio.run(workflow("And for multicam?"))
+
+    assert "Conversation so far" not in first.tv_response.request.prompt
+    assert "User: How do I sync dailies?\nAssistant: ok" in second.tv_response.request.prompt
+    assert len(memory) == 2
+
+def test_cached_generation_is_keyed_on_conversation(tmp_path):
+    """Test that a follow-up is not answered from a cache entry made in another conversation."""
+    generated = []
+
+    async def counting_generate(llm_request, on_chunk=None, json_response=True):
+        generated.append(llm_request.prompt)
+        return await fake_generate(llm_request, on_chunk)
+
+    counting_generate.model_name = "fake"
+    cached = create_cached_client(counting_generate, str(tmp_path))
+
+    def conversation(first_query):
+        memory = ConversationMemoryManager(budget_tokens=1000)
+        workflow = create_workflow("project_123", fake_detect_agent([AgentType.TV_POST_PRODUCTION]),
+                                   fake_extract_entities, fake_search_api([]), cached, memory=memory)
+        asyncio.run(workflow(first_query))
+        return asyncio.run(workflow("And the second one?"))
+
+    conversation("How do I sync dailies?")
+    other = conversation("How do I export an EDL?")
+    assert len(generated) == 4
+    assert "How do I export an EDL?" in other.tv_response.request.prompt
+
+    # The same conversation again is served from the cache
+    conversation("How do I sync dailies?")
+    assert len(generated) == 4
+    assert cached.stats.hits == 2
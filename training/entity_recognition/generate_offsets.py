@@ -1,43 +1,177 @@
-import spacy
+import argparse
+import hashlib
 import json
 import os
+import re
+import sys
+from itertools import islice
+from multiprocessing import Pool
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+import spacy
+from spacy.tokens import DocBin
+from spacy.util import filter_spans
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from src.corpus import shard_name, split_tokens_at, write_manifest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SENTENCES_PATH = os.path.join(HERE, "tmp", "sentences.json")
+OUTPUT_PATH = os.path.join(HERE, "tmp", "training_data.jsonl")
+
+# An annotated sentence: its text and the (entity text, label) pairs it mentions
+Sentence = Tuple[str, List[Tuple[str, str]]]
+
+# Load sentences from a JSON list or a JSONL file, one {"text", "entities": [{"text", "label"}]} per item
+def load_sentences(file_path: str) -> Iterator[Sentence]:
+    with open(file_path, "r") as file:
+        items = file if file_path.endswith(".jsonl") else json.load(file)
+        for item in items:
+            item = json.loads(item) if isinstance(item, str) else item
+            yield item["text"], [(ent["text"], ent["label"]) for ent in item["entities"]]
+
+class OffsetMatcher:
+    """Finds each sentence's annotated entity strings by character offset.
+
+    Only a sentence's own annotations can match, so each sentence is searched for just those
+    strings, case-insensitively and as whole words. Matching on characters rather than tokens
+    means "Sony A7S" is found in "Shot on the Sony A7S." although the tokenizer keeps "A7S." as
+    one token; tokens are then split at the match boundaries so every span aligns. Overlapping
+    matches are resolved in favour of the longest (then earliest) span.
+    """
+
+    def __init__(self, lang: str = "en"):
+        # Tokenizer only: no tagger, parser or vectors are needed to find offsets
+        self.nlp = spacy.blank(lang)
+        self._patterns: Dict[str, re.Pattern] = {}
+
+    def _pattern(self, text: str) -> re.Pattern:
+        pattern = self._patterns.get(text)
+        if pattern is None:
+            pattern = self._patterns[text] = re.compile(rf"(?<!\w){re.escape(text)}(?!\w)", re.IGNORECASE)
+        return pattern
+
+    def find(self, text: str, annotations: Iterable[Tuple[str, str]]) -> List[Tuple[int, int, str]]:
+        """(start, end, label) for every occurrence of the annotated entities, overlaps included."""
+        return sorted({
+            (match.start(), match.end(), label)
+            for entity, label in annotations if entity.strip()
+            for match in self._pattern(entity).finditer(text)
+        })
+
+    def match(self, sentences: Iterable[Sentence], batch_size: int = 256) -> Iterator[Tuple[object, List]]:
+        """(doc, entity spans) for each sentence, in order."""
+        sentences = list(sentences)
+        docs = self.nlp.tokenizer.pipe((text for text, _ in sentences), batch_size=batch_size)
+        for (text, annotations), doc in zip(sentences, docs):
+            found = self.find(text, annotations)
+            doc = split_tokens_at(doc, (offset for start, end, _ in found for offset in (start, end)))
+            spans = [doc.char_span(start, end, label=label) for start, end, label in found]
+            yield doc, filter_spans([span for span in spans if span is not None])
+
+def _chunks(sentences: Iterable[Sentence], size: int) -> Iterator[List[Sentence]]:
+    iterator = iter(sentences)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+_worker: Optional[OffsetMatcher] = None
+
+def _init_worker(lang: str) -> None:
+    global _worker
+    _worker = OffsetMatcher(lang)
+
+def _records(matcher: OffsetMatcher, chunk: List[Sentence]) -> List[Dict]:
+    return [{"text": doc.text, "entities": [(span.start_char, span.end_char, span.label_) for span in spans]}
+            for doc, spans in matcher.match(chunk)]
+
+def _doc_bin(matcher: OffsetMatcher, chunk: List[Sentence]) -> bytes:
+    doc_bin = DocBin()
+    for doc, spans in matcher.match(chunk):
+        doc.ents = spans
+        doc_bin.add(doc)
+    return doc_bin.to_bytes()
+
+def _worker_records(chunk: List[Sentence]) -> List[Dict]:
+    return _records(_worker, chunk)
+
+def _worker_doc_bin(chunk: List[Sentence]) -> bytes:
+    return _doc_bin(_worker, chunk)
+
+def generate_offsets(sentences: Iterable[Sentence], processes: int = 1, chunk_size: int = 1000,
+                     as_doc_bin: bool = False, lang: str = "en") -> Iterator:
+    """Character offsets of the annotated entities in each sentence, in input order.
+
+    Yields {"text", "entities": [(start, end, label)]} records, or with `as_doc_bin` one
+    serialised DocBin per chunk. Sentences are consumed `chunk_size` at a time (spread over
+    `processes` worker processes), so memory stays bounded by the chunks in flight.
+    """
+    chunks = _chunks(sentences, chunk_size)
+    if processes <= 1:
+        matcher = OffsetMatcher(lang)
+        for chunk in chunks:
+            if as_doc_bin:
+                yield _doc_bin(matcher, chunk)
+            else:
+                yield from _records(matcher, chunk)
+        return
+    with Pool(processes, initializer=_init_worker, initargs=(lang,)) as pool:
+        # imap keeps input order and only pulls chunks as workers free up
+        for result in pool.imap(_worker_doc_bin if as_doc_bin else _worker_records, chunks):
+            if as_doc_bin:
+                yield result
+            else:
+                yield from result
+
+def write_corpus(input_path: str, corpus_dir: str, processes: int = 1, chunk_size: int = 1000,
+                 lang: str = "en") -> int:
+    """Write one DocBin shard per chunk plus a manifest, in the src.corpus layout; returns the count.
+
+    Each chunk's shard goes to disk as it arrives, so memory stays bounded by the chunks in
+    flight. The corpus reads back with src.corpus.ShardedCorpus.
+    """
+    os.makedirs(corpus_dir, exist_ok=True)
+    shards = []
+    chunks = generate_offsets(load_sentences(input_path), processes, chunk_size, as_doc_bin=True, lang=lang)
+    for index, data in enumerate(chunks):
+        name = shard_name(index)
+        tmp_path = os.path.join(corpus_dir, name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, os.path.join(corpus_dir, name))
+        shards.append({"path": name, "hash": hashlib.sha256(data).hexdigest(), "count": len(DocBin().from_bytes(data))})
+    return write_manifest(corpus_dir, shards, lang)["total"]
+
+def write_offsets(input_path: str, output_path: str, processes: int = 1, chunk_size: int = 1000) -> int:
+    """Stream sentences from `input_path` to JSONL or JSON records, or to a sharded DocBin corpus
+    directory for any other `output_path`; returns the count."""
+    if not output_path.endswith((".jsonl", ".json")):
+        return write_corpus(input_path, output_path, processes, chunk_size)
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    count = 0
+    as_list = output_path.endswith(".json")
+    with open(output_path, "w") as f:
+        if as_list:
+            f.write("[\n")
+        for record in generate_offsets(load_sentences(input_path), processes, chunk_size):
+            if as_list and count:
+                f.write(",\n")
+            f.write(json.dumps(record))
+            if not as_list:
+                f.write("\n")
+            count += 1
+        if as_list:
+            f.write("\n]\n")
+    return count
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Generate entity offsets for NER training data.")
+    parser.add_argument("--input-path", type=str, default=SENTENCES_PATH, help="Annotated sentences (JSON or JSONL)")
+    parser.add_argument("--output-path", type=str, default=OUTPUT_PATH, help="Output .jsonl, .json, or a directory for sharded DocBin (.spacy) files")
+    parser.add_argument("--processes", type=int, default=1, help="Worker processes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Sentences per chunk")
+    return parser.parse_args()
 
-# Load the spaCy model
-nlp = spacy.load("en_core_web_lg")
-
-# Load sentences from JSON file
-def load_sentences(file_path):
-    with open(file_path, 'r') as file:
-        return json.load(file)
-
-# Path to the sentences JSON file
-sentences_file_path = os.path.join(os.path.dirname(__file__), "./tmp/sentences.json")
-sentences_data = load_sentences(sentences_file_path)
-
-# Convert loaded data to the required format
-sentences = [
-    (item["text"], {"entities": [(ent["text"], ent["label"]) for ent in item["entities"]]})
-    for item in sentences_data
-]
-
-def generate_offsets(sentences):
-    training_data = []
-    for text, annotations in sentences:
-        doc = nlp(text)
-        entities = []
-        for ent_text, label in annotations["entities"]:
-            for token in doc:
-                if token.text.lower() == ent_text.lower():
-                    start = token.idx
-                    end = token.idx + len(token.text)
-                    entities.append((start, end, label))
-        training_data.append({"text": text, "entities": entities})
-    return training_data
-
-# Generate and save the training data
-training_data = generate_offsets(sentences)
-output_file = "./entity_recognition/tmp/training_data.json"
-with open(output_file, "w") as f:
-    json.dump(training_data, f, indent=2)
-
-print(f"Training data generated and saved to {output_file}")
+if __name__ == "__main__":
+    args = parse_arguments()
+    count = write_offsets(args.input_path, args.output_path, args.processes, args.chunk_size)
+    print(f"Training data for {count} sentences generated and saved to {args.output_path}")
@@ -1,44 +1,44 @@
-import spacy
-from spacy.training.example import Example
-import json
+import argparse
 import os
+import random
+import sys
+import spacy
+from spacy.util import compounding, minibatch
 
-# Load the base model
-base_model = "en_core_web_lg"
-nlp = spacy.load(base_model)
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-# Add a new NER pipe if not already present
-if "ner" not in nlp.pipe_names:
-    ner = nlp.add_pipe("ner")
-else:
-    ner = nlp.get_pipe("ner")
+from src.corpus import ShardedCorpus, build_corpus
 
-# Load the dynamically generated training data
-with open("./entity_recognition/tmp/training_data.json", "r") as f:
-    TRAINING_DATA = json.load(f)
+# The base model
+BASE_MODEL = "en_core_web_lg"
+# Training data written by generate_offsets.py; built into CORPUS_PATH before training
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tmp", "training_data.jsonl")
+CORPUS_PATH = "./tmp/corpus/ner"
+OUTPUT_DIR = "./tmp/models/ner_model"
 
-# Add entity labels to the NER component
-labels = ["CONTRIBUTOR", "LOCATION", "CLIP_TYPE"]
-for label in labels:
-    ner.add_label(label)
+LABELS = ["CONTRIBUTOR", "LOCATION", "CAMERA", "CLIP_TYPE"]
 
 # Training the model
-def train_model(nlp, data, output_dir, n_iter=20):
-    # Create training examples
-    examples = []
-    for item in data:
-        text = item["text"]
-        entities = [(ent[0], ent[1], ent[2]) for ent in item["entities"]]
-        examples.append(Example.from_dict(nlp.make_doc(text), {"entities": entities}))
-
-    # Disable other pipes during training
-    unaffected_pipes = [pipe for pipe in nlp.pipe_names if pipe != "ner"]
-    with nlp.disable_pipes(*unaffected_pipes):
+def train_model(nlp, corpus, output_dir, n_iter=20, batch_start=4.0, batch_stop=32.0, batch_compound=1.001,
+                dropout=0.2, seed=0):
+    # Add a new NER pipe if not already present
+    if "ner" not in nlp.pipe_names:
+        ner = nlp.add_pipe("ner")
+    else:
+        ner = nlp.get_pipe("ner")
+    # Add entity labels to the NER component
+    for label in LABELS:
+        ner.add_label(label)
+
+    # Disable other pipes during training; examples stream from the corpus shards
+    rng = random.Random(seed)
+    with nlp.select_pipes(enable="ner"):
         optimizer = nlp.resume_training()
+        batch_sizes = compounding(batch_start, batch_stop, batch_compound)
         for i in range(n_iter):
             losses = {}
-            for example in examples:
-                nlp.update([example], sgd=optimizer, losses=losses)
+            for batch in minibatch(corpus.train_examples(nlp, rng), size=batch_sizes):
+                nlp.update(batch, sgd=optimizer, drop=dropout, losses=losses)
             print(f"Iteration {i + 1}/{n_iter}, Losses: {losses}")
 
     # Save the trained model
@@ -46,7 +46,21 @@ def train_model(nlp, data, output_dir, n_iter=20):
         os.makedirs(output_dir)
     nlp.to_disk(output_dir)
     print(f"Model saved to {output_dir}")
+    return nlp
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(description="Train the entity recognition model.")
+    parser.add_argument("--data-path", type=str, nargs="+", default=[DATA_PATH], help="JSON/JSONL training records")
+    parser.add_argument("--corpus-path", type=str, default=CORPUS_PATH, help="Where the DocBin shards are built")
+    parser.add_argument("--output-path", type=str, default=OUTPUT_DIR, help="Where the trained model is saved")
+    parser.add_argument("--iterations", type=int, default=20, help="Training iterations")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_arguments()
+    # Only shards whose records changed are re-tokenised
+    manifest = build_corpus(args.data_path, args.corpus_path)
+    print(f"Corpus: {manifest['total']} examples, {manifest['built']} shards built, {manifest['skipped']} unchanged")
 
-# Train and save the model
-output_dir = "./tmp/models/ner_model"
-train_model(nlp, TRAINING_DATA, output_dir)
+    # Train and save the model
+    train_model(spacy.load(BASE_MODEL), ShardedCorpus(args.corpus_path), args.output_path, n_iter=args.iterations)